@@ -0,0 +1,235 @@
+"""
+buildCounts @ benchmarks
+command and node count regression benchmarks of rig module builds
+
+each case builds one module in a fresh in-memory stand-in scene and
+records backend commands issued ( after batching ), calls by command, nodes
+and constraints created and wall time. Counts are compared to the
+committed baseline.json, any count above its baseline fails the run,
+wall time only fails when a time tolerance is given. Run from the
+characterRig folder :
+
+    python -m benchmarks.buildCounts
+    python -m benchmarks.buildCounts --update
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from rigLib.backend import memory
+from rigLib.backend import profiler
+from rigLib.backend import useBackend
+
+from rigLib.base import shapeCache
+
+from rigLib.rig import arm
+from rigLib.rig import ikChain
+from rigLib.rig import leg
+from rigLib.rig import neck
+from rigLib.rig import spine
+
+from . import standIn
+
+baselinePath = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'baseline.json' )
+
+constraintTypes = [ 'pointConstraint', 'orientConstraint', 'parentConstraint', 'scaleConstraint', 'poleVectorConstraint' ]
+
+countKeys = [ 'commands', 'nodes', 'constraints' ]
+
+# stand-in scene settings shared by all cases
+
+sceneArgs = { 'fingers': 5, 'fingerJoints': 3, 'toes': 3, 'toeJoints': 3, 'tailJoints': 8 }
+
+def buildSpine():
+
+    spine.Build( spineJoints = [ 'spine1_JNT', 'spine2_JNT', 'spine3_JNT' ], rootJoint = 'root_JNT',
+                 bodyLocator = 'body_LOC', chestLocator = 'chest_LOC', pelvisLocator = 'pelvis_LOC', prefix = 'spine' )
+
+def buildNeck():
+
+    neck.Build( neckJoints = [ 'neck1_JNT', 'neck2', 'head_JNT' ], headJoint = 'head_JNT', prefix = 'neck' )
+
+def buildArm():
+
+    fingerArgs = dict( ( 'topFingerJoints' + f, 'l_topFinger%s_JNT' % f ) for f in 'ABCDE' )
+
+    arm.Build( armJoints = [ 'l_arm1_JNT', 'l_arm2_JNT', 'l_hand_JNT' ], pvLocator = 'l_arm_poleVector_LOC',
+               scapulaJoint = 'l_scapula_JNT', prefix = 'l_arm', **fingerArgs )
+
+def buildLeg():
+
+    leg.Build( legJoints = [ 'l_leg1_JNT', 'l_leg2_JNT', 'l_foot_JNT', 'l_ball_JNT', 'l_toe_JNT' ],
+               topToeJoints = [ 'l_topToe%d_JNT' % ( t + 1 ) for t in range( sceneArgs[ 'toes' ] ) ],
+               additionnalToeJoints = True, pvLocator = 'l_leg_poleVector_LOC', prefix = 'l_leg' )
+
+def buildIkChain():
+
+    ikChain.build( chainJoints = [ 'tail%d_JNT' % ( i + 1 ) for i in range( sceneArgs[ 'tailJoints' ] ) ],
+                   chainCurve = 'tail_CRV', prefix = 'tail' )
+
+cases = [
+    ( 'spine', buildSpine ),
+    ( 'neck', buildNeck ),
+    ( 'arm', buildArm ),
+    ( 'leg', buildLeg ),
+    ( 'ikChain', buildIkChain )
+    ]
+
+def measure( buildFunction, repeat = 1 ):
+
+    """
+    build module in fresh stand-in scenes
+
+    @param buildFunction : function, building one module in active backend
+    @param repeat : int, number of builds, fastest wall time is kept
+    @return : dict, { 'commands', 'nodes', 'constraints', 'time', 'calls' }
+    """
+
+    result = None
+
+    for _ in range( repeat ):
+
+        scene = memory.MemoryScene()
+
+        with useBackend( scene ):
+
+            standIn.makeScene( **sceneArgs )
+
+            # templates cached by an earlier case belong to another scene
+
+            shapeCache.clear()
+            constraintsBefore = len( scene.ls( type = constraintTypes ) )
+
+            with profiler.profiling( buildFunction.__name__ ) as profile:
+
+                buildFunction()
+
+        calls = profile.root.totalCalls()
+        measures = {
+            'commands': sum( calls.values() ),
+            'nodes': profile.root.nodes,
+            'constraints': len( scene.ls( type = constraintTypes ) ) - constraintsBefore,
+            'time': profile.root.time,
+            'calls': dict( calls )
+            }
+
+        if result is None or measures[ 'time' ] < result[ 'time' ]:
+
+            result = measures
+
+    return result
+
+def run( repeat = 3 ):
+
+    """
+    @param repeat : int, number of builds per case, fastest wall time is kept
+    @return : dict, measures by case name
+    """
+
+    return dict( ( caseName, measure( buildFunction, repeat = repeat ) ) for caseName, buildFunction in cases )
+
+def compare( results, baseline, timeTolerance = 0.0 ):
+
+    """
+    compare results to baseline
+
+    @param results : dict, measures by case name
+    @param baseline : dict, baseline measures by case name
+    @param timeTolerance : float, fail when wall time is above this factor of baseline time, 0 to only report time
+    @return : tuple( list( str ), list( str ) ), report lines and failures
+    """
+
+    lines = [ '%-10s %18s %18s %18s %22s' % ( 'case', 'commands', 'nodes', 'constraints', 'time ms' ) ]
+    failures = []
+
+    for caseName, _ in cases:
+
+        result = results[ caseName ]
+        base = baseline.get( caseName )
+
+        if not base:
+
+            failures.append( '%s has no baseline, run with --update' % caseName )
+            continue
+
+        columns = [ '%7d / %-7d %s' % ( result[ k ], base[ k ], _mark( result[ k ], base[ k ] ) ) for k in countKeys ]
+        timeRatio = result[ 'time' ] / base[ 'time' ] if base[ 'time' ] else 0.0
+        columns.append( '%8.2f / %-8.2f x%.2f' % ( result[ 'time' ] * 1000.0, base[ 'time' ] * 1000.0, timeRatio ) )
+        lines.append( '%-10s %s' % ( caseName, ' '.join( columns ) ) )
+
+        for key in countKeys:
+
+            if result[ key ] > base[ key ]:
+
+                failures.append( '%s %s went from %d to %d' % ( caseName, key, base[ key ], result[ key ] ) )
+
+        for commandName, count in sorted( result[ 'calls' ].items() ):
+
+            baseCount = base[ 'calls' ].get( commandName, 0 )
+
+            if count > baseCount:
+
+                failures.append( '%s %s calls went from %d to %d' % ( caseName, commandName, baseCount, count ) )
+
+        if timeTolerance and timeRatio > timeTolerance:
+
+            failures.append( '%s wall time is %.2f times baseline' % ( caseName, timeRatio ) )
+
+    return lines, failures
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when a count went above baseline
+    """
+
+    parser = argparse.ArgumentParser( description = 'rig module build count benchmarks' )
+    parser.add_argument( '--update', action = 'store_true', help = 'write results as new baseline' )
+    parser.add_argument( '--repeat', type = int, default = 3, help = 'builds per case, fastest time is kept' )
+    parser.add_argument( '--time-tolerance', type = float, default = 0.0, help = 'fail when time is above this factor of baseline' )
+    parser.add_argument( '--baseline', default = baselinePath, help = 'path of baseline JSON' )
+    args = parser.parse_args( argv )
+
+    results = run( repeat = args.repeat )
+
+    if args.update:
+
+        with open( args.baseline, 'w' ) as baselineFile:
+
+            json.dump( results, baselineFile, indent = 2, sort_keys = True )
+            baselineFile.write( '\n' )
+
+        sys.stdout.write( 'baseline written to %s\n' % args.baseline )
+
+        return 0
+
+    with open( args.baseline ) as baselineFile:
+
+        baseline = json.load( baselineFile )
+
+    lines, failures = compare( results, baseline, timeTolerance = args.time_tolerance )
+
+    sys.stdout.write( '\n'.join( lines + [ '' ] + failures + [ '' ] ) )
+
+    return 1 if failures else 0
+
+def _mark( value, baseValue ):
+
+    if value > baseValue:
+
+        return '+'
+
+    if value < baseValue:
+
+        return '-'
+
+    return ' '
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
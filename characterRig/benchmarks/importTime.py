@@ -0,0 +1,92 @@
+"""
+importTime @ benchmarks
+import time of rigLib entry points measured in fresh interpreters
+
+each statement is run in a new python process, the fastest of a few runs
+is kept together with the number of rigLib modules it loaded. The run
+fails when an import loads maya, which must wait for the first scene
+command. Run from the characterRig folder :
+
+    python -m benchmarks.importTime
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+statements = [
+    'import rigLib',
+    'from rigLib.utils import name',
+    'from rigLib.build import spec',
+    'from rigLib.base import control',
+    'from rigLib.rig import arm',
+    'from charactertNameRig import characterName'
+    ]
+
+# run inside the child process, reports import time, loaded rigLib modules and whether maya was imported
+
+_probe = '''
+import json, sys, time
+startTime = time.perf_counter()
+%s
+importTime = time.perf_counter() - startTime
+modules = [ m for m in sys.modules if m.split( '.' )[0] in ( 'rigLib', 'charactertNameRig' ) ]
+print( json.dumps( { 'time': importTime, 'modules': len( modules ), 'maya': 'maya' in sys.modules } ) )
+'''
+
+def measure( statement, repeat = 5 ):
+
+    """
+    @param statement : str, import statement
+    @param repeat : int, number of fresh interpreters, fastest time is kept
+    @return : dict, { 'time', 'modules', 'maya' }
+    """
+
+    rootPath = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+    result = None
+
+    for _ in range( repeat ):
+
+        output = subprocess.check_output( [ sys.executable, '-c', _probe % statement ], cwd = rootPath )
+        measures = json.loads( output.decode( 'utf-8' ).strip().splitlines()[-1] )
+
+        if result is None or measures[ 'time' ] < result[ 'time' ]:
+
+            result = measures
+
+    return result
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when an import loaded maya
+    """
+
+    parser = argparse.ArgumentParser( description = 'rigLib import time benchmark' )
+    parser.add_argument( '--repeat', type = int, default = 5, help = 'fresh interpreters per statement, fastest time is kept' )
+    args = parser.parse_args( argv )
+
+    lines = [ '%10s %8s  %s' % ( 'time ms', 'modules', 'statement' ) ]
+    failures = []
+
+    for statement in statements:
+
+        result = measure( statement, repeat = args.repeat )
+        lines.append( '%10.2f %8d  %s' % ( result[ 'time' ] * 1000.0, result[ 'modules' ], statement ) )
+
+        if result[ 'maya' ]:
+
+            failures.append( '"%s" imported maya' % statement )
+
+    sys.stdout.write( '\n'.join( lines + [ '' ] + failures + [ '' ] ) )
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
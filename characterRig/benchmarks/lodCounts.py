@@ -0,0 +1,118 @@
+"""
+lodCounts @ benchmarks
+node and command counts of the characterName rig at each level of detail
+
+each level builds the whole rig of the stand-in character in a fresh
+in-memory scene and reports nodes below the rig top group, joints,
+controls, constraints, IK handles, backend commands issued and wall time,
+with nodes and commands relative to the full rig. Run from the
+characterRig folder :
+
+    python -m benchmarks.lodCounts
+"""
+
+import argparse
+import sys
+
+from rigLib.backend import memory
+from rigLib.backend import profiler
+from rigLib.backend import useBackend
+
+from rigLib.base import shapeCache
+
+from rigLib.build import lod
+
+from charactertNameRig import characterName
+
+from . import standIn
+
+characterArgs = { 'characterName': 'hero', 'fingers': 5, 'fingerJoints': 3 }
+
+countKeys = [ 'nodes', 'joints', 'controls', 'constraints', 'ikHandles', 'commands' ]
+
+def measure( level ):
+
+    """
+    build stand-in character rig at level of detail in a fresh stand-in scene
+
+    @param level : str, level of detail, one of build.lod.levels
+    @return : dict, { 'nodes', 'joints', 'controls', 'constraints', 'ikHandles', 'commands', 'time' }
+    """
+
+    with useBackend( memory.MemoryScene() ):
+
+        standIn.makeScene( **characterArgs )
+
+        # templates cached by an earlier level belong to another scene
+
+        shapeCache.clear()
+
+        with profiler.profiling( level ) as profile:
+
+            characterName.Build( characterArgs[ 'characterName' ], level = level )
+
+        result = lod.nodeCounts( characterArgs[ 'characterName' ] + '_rig_GRP' )
+
+    result[ 'commands' ] = sum( profile.root.totalCalls().values() )
+    result[ 'time' ] = profile.root.time
+
+    return result
+
+def run():
+
+    """
+    @return : dict, measures by level of detail
+    """
+
+    return dict( ( level, measure( level ) ) for level in lod.levels )
+
+def report( results ):
+
+    """
+    @param results : dict, measures by level of detail
+    @return : list( str ), report lines
+    """
+
+    full = results[ 'full' ]
+    lines = [ '%-10s %8s %8s %8s %12s %10s %9s %10s %9s %9s' % ( ( 'level', ) + tuple( countKeys ) + ( 'time ms', 'nodes %', 'cmds %' ) ) ]
+
+    for level in lod.levels:
+
+        result = results[ level ]
+        columns = [ '%8d' % result[ 'nodes' ], '%8d' % result[ 'joints' ], '%8d' % result[ 'controls' ],
+                    '%12d' % result[ 'constraints' ], '%10d' % result[ 'ikHandles' ], '%9d' % result[ 'commands' ],
+                    '%10.2f' % ( result[ 'time' ] * 1000.0 ),
+                    '%9.1f' % ( 100.0 * result[ 'nodes' ] / full[ 'nodes' ] ),
+                    '%9.1f' % ( 100.0 * result[ 'commands' ] / full[ 'commands' ] ) ]
+        lines.append( '%-10s %s' % ( level, ' '.join( columns ) ) )
+
+    return lines
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when a level has more nodes than the level above it
+    """
+
+    parser = argparse.ArgumentParser( description = 'rig node counts by level of detail' )
+    parser.parse_args( argv )
+
+    results = run()
+    failures = []
+
+    for upper, lower in zip( lod.levels, lod.levels[ 1: ] ):
+
+        if results[ lower ][ 'nodes' ] > results[ upper ][ 'nodes' ]:
+
+            failures.append( '%s has more nodes than %s' % ( lower, upper ) )
+
+    sys.stdout.write( '\n'.join( report( results ) + [ '' ] + failures + [ '' ] ) )
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
@@ -0,0 +1,140 @@
+"""
+poseCheck @ benchmarks
+pose graph evaluation of constrained IK start joints compared to the scene
+
+builds the stand-in character rig in an in-memory scene and reads it into
+an evaluate.poseGraph PoseGraph. For each IK chain whose start joint is
+constrained, like the scapula joint point constrained to its control, the
+constraint target is moved in the graph and in the scene. The in-memory
+scene applies constraints when they are made, so the constraint is made
+again after posing to evaluate it there. Start joint positions of graph
+and scene must match and the solved chain must still reach its handle.
+Run from the characterRig folder :
+
+    python -m benchmarks.poseCheck
+"""
+
+import argparse
+import math
+import sys
+
+from rigLib.backend import cmds as mc
+from rigLib.backend import memory
+from rigLib.backend import useBackend
+
+from rigLib.base import shapeCache
+
+from rigLib.evaluate import poseGraph
+
+from rigLib.utils import matrix
+
+from charactertNameRig import characterName
+
+from . import standIn
+
+characterArgs = { 'characterName': 'hero', 'fingers': 5, 'fingerJoints': 3 }
+
+# moves of constraint target channels
+
+targetMoves = { 'tx': 0.5, 'ty': 1.0, 'tz': -0.25 }
+
+tolerance = 1e-6
+
+def measure():
+
+    """
+    pose constraint targets of constrained IK start joints in pose graph and scene
+
+    @return : list( dict ), { 'chain', 'joint', 'target', 'startError', 'reachError' } of each constrained start joint
+    """
+
+    results = []
+
+    with useBackend( memory.MemoryScene() ):
+
+        standIn.makeScene( **characterArgs )
+        shapeCache.clear()
+        characterName.Build( characterArgs[ 'characterName' ], rigSpec = standIn.makeSpec( **characterArgs ) )
+
+        graph = poseGraph.PoseGraph.fromScene( characterArgs[ 'characterName' ] + '_rig_GRP' )
+
+        for chain in graph.ikChains:
+
+            start = chain[ 'joints' ][0]
+
+            if not chain[ 'solved' ] or start not in graph.constraints:
+
+                continue
+
+            constraintType, target = graph.constraints[ start ][ :2 ]
+            joint, targetName = graph.names[ start ], graph.names[ target ]
+
+            for channel, move in targetMoves.items():
+
+                graph.setValue( targetName, channel, graph.value( targetName, channel ) + move )
+                mc.setAttr( targetName + '.' + channel, mc.getAttr( targetName + '.' + channel ) + move )
+
+            getattr( mc, constraintType )( targetName, joint )
+
+            # end joint of single chain handles, end of rotate plane limbs, reaches handle
+
+            end = chain[ 'joints' ][-1] if 'limb' in chain else chain[ 'joints' ][1]
+            handlePosition = matrix.translation( graph.worldMatrix( chain[ 'name' ] ) )
+            restReach = _distance( matrix.translation( graph.restWorlds[ end ] ), matrix.translation( graph.restWorlds[ chain[ 'handle' ] ] ) )
+
+            results.append( {
+                'chain': chain[ 'name' ],
+                'joint': joint,
+                'target': targetName,
+                'startError': _distance( matrix.translation( graph.worldMatrix( joint ) ), mc.xform( joint, q = 1, ws = 1, t = 1 ) ),
+                'reachError': abs( _distance( matrix.translation( graph.worldMatrix( graph.names[ end ] ) ), handlePosition ) - restReach )
+                } )
+
+            graph.reset()
+
+    return results
+
+def _distance( a, b ):
+
+    return math.sqrt( sum( ( x - y ) ** 2 for x, y in zip( a, b ) ) )
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when graph and scene disagree or no constrained start joint is found
+    """
+
+    parser = argparse.ArgumentParser( description = 'pose graph against scene for constrained IK start joints' )
+    parser.parse_args( argv )
+
+    results = measure()
+    lines = [ '%-22s %-18s %-22s %12s %12s' % ( 'chain', 'start joint', 'target', 'start error', 'reach error' ) ]
+    failures = []
+
+    for result in results:
+
+        lines.append( '%-22s %-18s %-22s %12.2e %12.2e' % ( result[ 'chain' ], result[ 'joint' ], result[ 'target' ],
+                                                          result[ 'startError' ], result[ 'reachError' ] ) )
+
+        if result[ 'startError' ] > tolerance:
+
+            failures.append( '%s of %s does not follow %s like in the scene' % ( result[ 'joint' ], result[ 'chain' ], result[ 'target' ] ) )
+
+        if result[ 'reachError' ] > tolerance:
+
+            failures.append( '%s does not reach its handle' % result[ 'chain' ] )
+
+    if not results:
+
+        failures.append( 'no IK chain with a constrained start joint in rig' )
+
+    sys.stdout.write( '\n'.join( lines + [ '' ] + failures + [ '' ] ) )
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
@@ -0,0 +1,315 @@
+"""
+scaling @ benchmarks
+scaling stress tests of rig builds on synthetic stand-in skeletons
+
+each axis doubles one size of the stand-in skeleton over a number of
+steps ( joints per finger, toes, spine joints, neck joints, tail joints )
+and builds the rig modules reading it, and the control setup of
+characterName, in fresh in-memory scenes. Wall time, backend commands
+issued and peak Python memory allocated by the build are measured at
+each size.
+
+the growth exponent of a measure is the slope of its growth from the
+first size against the growth of size on log scales, 1 when the measure
+grows linearly with size whatever the fixed cost of the build, close to
+2 when it grows quadratically. Measures growing less than a quarter over
+the axis, like commands of spine builds as spine joints are added, are
+flat and have no exponent. Command and memory exponents above their limit
+fail the run. Time exponents of builds this small change from run to run,
+they are reported and only fail the run when a time limit is given. Run
+from the characterRig folder :
+
+    python -m benchmarks.scaling
+    python -m benchmarks.scaling --axis tailJoints --steps 7 -o scaling.json
+    python -m benchmarks.scaling --steps 7 --repeat 7 --time-limit 1.8
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+from rigLib.backend import cmds as mc
+from rigLib.backend import memory
+from rigLib.backend import profiler
+from rigLib.backend import useBackend
+
+from rigLib.base import module
+from rigLib.base import shapeCache
+
+from rigLib.rig import arm
+from rigLib.rig import ikChain
+from rigLib.rig import leg
+
+from charactertNameRig import characterName
+
+from . import standIn
+
+measureKeys = [ 'time', 'commands', 'memory' ]
+
+# stand-in sizes of all axes but the one growing
+
+sceneArgs = { 'fingers': 5, 'fingerJoints': 3, 'toes': 0, 'toeJoints': 3, 'tailJoints': 0, 'spineJoints': 3, 'neckJoints': 2 }
+
+def armCase( sizes ):
+
+    fingerArgs = dict( ( 'topFingerJoints' + f, 'l_topFinger%s_JNT' % f ) for f in 'ABCDE' )
+    fingerArgs.update( armJoints = [ 'l_arm1_JNT', 'l_arm2_JNT', 'l_hand_JNT' ], pvLocator = 'l_arm_poleVector_LOC',
+                       scapulaJoint = 'l_scapula_JNT', prefix = 'l_arm' )
+
+    return arm.Build, fingerArgs
+
+def legCase( sizes ):
+
+    return leg.Build, { 'legJoints': [ 'l_leg1_JNT', 'l_leg2_JNT', 'l_foot_JNT', 'l_ball_JNT', 'l_toe_JNT' ],
+                        'topToeJoints': [ 'l_topToe%d_JNT' % ( t + 1 ) for t in range( sizes[ 'toes' ] ) ],
+                        'additionnalToeJoints': True, 'pvLocator': 'l_leg_poleVector_LOC', 'prefix': 'l_leg' }
+
+def ikChainCase( sizes ):
+
+    return ikChain.build, { 'chainJoints': [ 'tail%d_JNT' % ( i + 1 ) for i in range( sizes[ 'tailJoints' ] ) ],
+                            'chainCurve': 'tail_CRV', 'prefix': 'tail' }
+
+def controlSetupCase( sizes ):
+
+    # base rig is made like characterName.Build does, only the control setup is measured
+
+    baseRig = module.Base( characterName = 'hero', scale = characterName.sceneScale, mainCtrlAttachObj = characterName.headJoint )
+    mc.parent( characterName.rootJoint, baseRig.jointsGrp )
+
+    return characterName.makeControlSetup, { 'baseRig': baseRig, 'rigSpec': standIn.makeSpec( **sizes ) }
+
+cases = {
+    'arm': armCase,
+    'leg': legCase,
+    'ikChain': ikChainCase,
+    'controlSetup': controlSetupCase
+    }
+
+# growing size, its first step and the cases building with it
+
+axes = [
+    ( 'fingerJoints', 2, [ 'arm', 'controlSetup' ] ),
+    ( 'toes', 1, [ 'leg', 'controlSetup' ] ),
+    ( 'spineJoints', 3, [ 'controlSetup' ] ),
+    ( 'neckJoints', 2, [ 'controlSetup' ] ),
+    ( 'tailJoints', 4, [ 'ikChain', 'controlSetup' ] )
+    ]
+
+def measure( caseName, sizes, repeat = 3 ):
+
+    """
+    build case in fresh stand-in scenes of given sizes
+
+    @param caseName : str, name of case in cases
+    @param sizes : dict, stand-in scene arguments
+    @param repeat : int, number of timed builds, fastest wall time is kept
+    @return : dict, { 'time', 'commands', 'nodes', 'memory' }
+    """
+
+    result = { 'time': None }
+
+    # timed builds run without profiler or allocation tracing, both slow builds down
+
+    for _ in range( repeat ):
+
+        with _scene( caseName, sizes ) as ( buildFunction, kwargs ):
+
+            startTime = time.time()
+            buildFunction( **kwargs )
+            buildTime = time.time() - startTime
+
+        if result[ 'time' ] is None or buildTime < result[ 'time' ]:
+
+            result[ 'time' ] = buildTime
+
+    with _scene( caseName, sizes ) as ( buildFunction, kwargs ):
+
+        with profiler.profiling( caseName ) as profile:
+
+            buildFunction( **kwargs )
+
+    result[ 'commands' ] = sum( profile.root.totalCalls().values() )
+    result[ 'nodes' ] = profile.root.nodes
+
+    with _scene( caseName, sizes ) as ( buildFunction, kwargs ):
+
+        tracemalloc.start()
+
+        try:
+
+            buildFunction( **kwargs )
+            result[ 'memory' ] = tracemalloc.get_traced_memory()[1]
+
+        finally:
+
+            tracemalloc.stop()
+
+    return result
+
+def run( axisNames = None, steps = 5, repeat = 3 ):
+
+    """
+    @param axisNames : list( str ), names of axes to run, all by default
+    @param steps : int, number of sizes per axis, each one twice the one before
+    @param repeat : int, number of timed builds per size, fastest wall time is kept
+    @return : list( dict ), { 'axis', 'case', 'sizes', 'measures', 'exponents' } of each axis and case
+    """
+
+    results = []
+
+    for axis, start, caseNames in axes:
+
+        if axisNames and axis not in axisNames:
+
+            continue
+
+        sizes = [ start * 2 ** i for i in range( steps ) ]
+
+        for caseName in caseNames:
+
+            # first build of a case fills caches of the session, it would slow the first size down
+
+            measure( caseName, dict( sceneArgs, **{ axis: sizes[0] } ), repeat = 1 )
+
+            measures = [ measure( caseName, dict( sceneArgs, **{ axis: size } ), repeat = repeat ) for size in sizes ]
+            exponents = dict( ( k, growthExponent( sizes, [ m[ k ] for m in measures ] ) ) for k in measureKeys )
+            results.append( { 'axis': axis, 'case': caseName, 'sizes': sizes, 'measures': measures, 'exponents': exponents } )
+
+    return results
+
+def growthExponent( sizes, values, minGrowth = 0.25 ):
+
+    """
+    slope of growth of values from first size against growth of size on log scales, the fixed cost at first size cancels out
+
+    @param sizes : list( int ), growing sizes
+    @param values : list( float ), measure at each size
+    @param minGrowth : float, measures growing less than this fraction of their first value are flat
+    @return : float, growth exponent, None for flat measures or with less than 3 sizes
+    """
+
+    if len( sizes ) < 3 or values[-1] - values[0] < minGrowth * values[0]:
+
+        return None
+
+    # noise can make small sizes measure below the first one, they are left out
+
+    points = [ ( math.log( size - sizes[0] ), math.log( value - values[0] ) )
+               for size, value in zip( sizes[ 1: ], values[ 1: ] ) if value > values[0] ]
+
+    if len( points ) < 2:
+
+        return None
+
+    meanX = sum( p[0] for p in points ) / len( points )
+    meanY = sum( p[1] for p in points ) / len( points )
+
+    return sum( ( x - meanX ) * ( y - meanY ) for x, y in points ) / sum( ( x - meanX ) ** 2 for x, _ in points )
+
+def report( results, width = 30 ):
+
+    """
+    @param results : list( dict ), results returned by run()
+    @param width : int, length of longest bar of time plots
+    @return : list( str ), report lines with time plotted against size for each axis and case
+    """
+
+    lines = []
+
+    for result in results:
+
+        exponents = result[ 'exponents' ]
+        lines.append( '%s / %s   growth exponents : %s' % ( result[ 'axis' ], result[ 'case' ], ', '.join(
+                            '%s %s' % ( k, '-' if exponents[ k ] is None else '%.2f' % exponents[ k ] ) for k in measureKeys ) ) )
+        lines.append( '    %6s %10s %9s %7s %11s' % ( 'size', 'time ms', 'commands', 'nodes', 'memory KB' ) )
+
+        longest = max( m[ 'time' ] for m in result[ 'measures' ] ) or 1.0
+
+        for size, m in zip( result[ 'sizes' ], result[ 'measures' ] ):
+
+            lines.append( '    %6d %10.2f %9d %7d %11.1f  %s' % ( size, m[ 'time' ] * 1000.0, m[ 'commands' ], m[ 'nodes' ],
+                                                                 m[ 'memory' ] / 1024.0, '#' * int( round( width * m[ 'time' ] / longest ) ) ) )
+
+        lines.append( '' )
+
+    return lines
+
+def check( results, limit = 1.2, timeLimit = None ):
+
+    """
+    @param results : list( dict ), results returned by run()
+    @param limit : float, highest growth exponent of commands and memory
+    @param timeLimit : float, optional highest growth exponent of wall time, time is not checked by default
+    @return : list( str ), failures
+    """
+
+    failures = []
+
+    for result in results:
+
+        for key in measureKeys:
+
+            exponent = result[ 'exponents' ][ key ]
+            keyLimit = timeLimit if key == 'time' else limit
+
+            if exponent is not None and keyLimit is not None and exponent > keyLimit:
+
+                failures.append( '%s of %s grows with %s to the power %.2f, above %.2f' % (
+                                        key, result[ 'case' ], result[ 'axis' ], exponent, keyLimit ) )
+
+    return failures
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when commands or memory, or time when a time limit is given, grow faster than their limit
+    """
+
+    parser = argparse.ArgumentParser( description = 'rig build scaling stress tests' )
+    parser.add_argument( '--axis', action = 'append', choices = [ a[0] for a in axes ], help = 'axis to run, all by default' )
+    parser.add_argument( '--steps', type = int, default = 5, help = 'number of doubling sizes per axis' )
+    parser.add_argument( '--repeat', type = int, default = 3, help = 'timed builds per size, fastest time is kept' )
+    parser.add_argument( '--limit', type = float, default = 1.2, help = 'highest growth exponent of commands and memory' )
+    parser.add_argument( '--time-limit', type = float, default = None,
+                         help = 'highest growth exponent of wall time, not checked by default, use with more steps and repeats' )
+    parser.add_argument( '-o', '--output', default = None, help = 'path of JSON results, for plotting' )
+    args = parser.parse_args( argv )
+
+    results = run( axisNames = args.axis, steps = args.steps, repeat = args.repeat )
+    failures = check( results, limit = args.limit, timeLimit = args.time_limit )
+
+    if args.output:
+
+        with open( args.output, 'w' ) as outputFile:
+
+            json.dump( results, outputFile, indent = 2, sort_keys = True )
+
+    sys.stdout.write( '\n'.join( report( results ) + failures + [ '' ] ) )
+
+    return 1 if failures else 0
+
+@contextlib.contextmanager
+def _scene( caseName, sizes ):
+
+    # fresh stand-in scene of given sizes, yields build function of case and its arguments
+
+    with useBackend( memory.MemoryScene() ):
+
+        standIn.makeScene( **sizes )
+
+        # templates cached by an earlier build belong to another scene
+
+        shapeCache.clear()
+
+        yield cases[ caseName ]( sizes )
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
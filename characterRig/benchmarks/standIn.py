@@ -0,0 +1,215 @@
+"""
+standIn @ benchmarks
+stand-in character skeleton with the joints and locators characterName rig spec expects
+
+joints are made in the active backend, build it in an empty in-memory scene
+for headless benchmarks :
+
+    with backend.useBackend( memory.MemoryScene() ):
+
+        standIn.makeScene()
+
+sizes of the skeleton can be changed to make synthetic characters, like
+a long tail or many toes, makeSpec gives the characterName rig spec of
+the same sizes :
+
+    sizes = { 'toes': 8, 'spineJoints': 12, 'tailJoints': 32 }
+    standIn.makeScene( **sizes )
+    characterName.Build( 'hero', rigSpec = standIn.makeSpec( **sizes ) )
+"""
+
+import copy
+
+from rigLib.backend import cmds as mc
+
+from rigLib.build import spec
+
+from charactertNameRig import characterName
+
+def makeScene( characterName = 'hero', fingers = 5, fingerJoints = 3, toes = 0, toeJoints = 3, tailJoints = 0,
+               spineJoints = 3, neckJoints = 2 ):
+
+    """
+    make stand-in skeleton, locators and model group of character
+
+    @param characterName : str, name of character, used for model group
+    @param fingers : int, number of finger chains per hand, up to 5
+    @param fingerJoints : int, number of joints per finger below its top joint
+    @param toes : int, number of toe chains per foot
+    @param toeJoints : int, number of joints per toe below its top joint
+    @param tailJoints : int, number of tail joints, with a tail_CRV curve through them when not 0
+    @param spineJoints : int, number of spine joints, at least 3
+    @param neckJoints : int, number of neck joints below head joint, at least 1
+    @return : None
+    """
+
+    if spineJoints < 3 or neckJoints < 1:
+
+        raise ValueError( 'stand-in needs at least 3 spine joints and 1 neck joint' )
+
+    spineNames = spineJointNames( spineJoints )
+
+    mc.select( cl = 1 )
+    mc.joint( n = 'root_JNT', p = ( 0, 10, 0 ) )
+    mc.joint( n = 'pelvis_JNT', p = ( 0, 10, 0 ) )
+
+    # spine from 11 to 13 and neck from 14 to head at 15, whatever their number of joints
+
+    mc.select( 'pelvis_JNT' )
+
+    for i, jointName in enumerate( spineNames ):
+
+        mc.joint( n = jointName, p = ( 0, 11 + 2.0 * i / ( spineJoints - 1 ), 0 ) )
+
+    for i, jointName in enumerate( neckJointNames( neckJoints ) ):
+
+        mc.joint( n = jointName, p = ( 0, 14 + float( i ) / neckJoints, 0 ) )
+
+    mc.joint( n = 'head_JNT', p = ( 0, 15, 0 ) )
+
+    for side, sx in [ ( 'l', 1 ), ( 'r', -1 ) ]:
+
+        # arm and fingers
+
+        mc.select( spineNames[-1] )
+        mc.joint( n = '%s_scapula_JNT' % side, p = ( sx * 0.5, 13, 0 ) )
+        mc.joint( n = '%s_arm1_JNT' % side, p = ( sx * 1, 13, 0 ) )
+        mc.joint( n = '%s_arm2_JNT' % side, p = ( sx * 3, 13, -0.2 ) )
+        mc.joint( n = '%s_hand_JNT' % side, p = ( sx * 5, 13, 0 ) )
+
+        for f, fingerLetter in enumerate( 'ABCDE'[ :fingers ] ):
+
+            fingerZ = 0.4 - 0.2 * f
+
+            mc.select( '%s_hand_JNT' % side )
+            mc.joint( n = '%s_topFinger%s_JNT' % ( side, fingerLetter ), p = ( sx * 5.2, 13, fingerZ ) )
+
+            for j in range( fingerJoints ):
+
+                mc.joint( n = '%s_finger%s%d_JNT' % ( side, fingerLetter, j + 1 ), p = ( sx * ( 5.5 + j * 0.3 ), 13, fingerZ ) )
+
+        # leg and toes
+
+        mc.select( 'pelvis_JNT' )
+        mc.joint( n = '%s_leg1_JNT' % side, p = ( sx, 9, 0 ) )
+        mc.joint( n = '%s_leg2_JNT' % side, p = ( sx, 5, 0.3 ) )
+        mc.joint( n = '%s_foot_JNT' % side, p = ( sx, 1, 0 ) )
+        mc.joint( n = '%s_ball_JNT' % side, p = ( sx, 0, 1 ) )
+        mc.joint( n = '%s_toe_JNT' % side, p = ( sx, 0, 2 ) )
+
+        for t in range( toes ):
+
+            toeX = sx * ( 0.6 + 0.2 * t )
+
+            mc.select( '%s_foot_JNT' % side )
+            mc.joint( n = '%s_topToe%d_JNT' % ( side, t + 1 ), p = ( toeX, 0.5, 0.6 ) )
+
+            for j in range( toeJoints ):
+
+                mc.joint( n = '%s_toe%d_%d_JNT' % ( side, t + 1, j + 1 ), p = ( toeX, 0, 1.2 + j * 0.3 ) )
+
+        # pole vector locators
+
+        for limb, position in [ ( 'arm', ( sx * 3, 13, -3 ) ), ( 'leg', ( sx, 5, 3 ) ) ]:
+
+            locator = mc.spaceLocator( n = '%s_%s_poleVector_LOC' % ( side, limb ) )[0]
+            mc.xform( locator, t = position, ws = 1 )
+
+    # tail
+
+    if tailJoints:
+
+        mc.select( 'pelvis_JNT' )
+        tailPoints = [ ( 0, 10, -0.5 - i * 0.5 ) for i in range( tailJoints ) ]
+
+        for i, point in enumerate( tailPoints ):
+
+            mc.joint( n = 'tail%d_JNT' % ( i + 1 ), p = point )
+
+        mc.curve( n = 'tail_CRV', d = 3, p = tailPoints )
+
+    # spine locators
+
+    for locatorName, height in [ ( 'body', 11 ), ( 'chest', 13 ), ( 'pelvis', 10 ) ]:
+
+        locator = mc.spaceLocator( n = '%s_LOC' % locatorName )[0]
+        mc.xform( locator, t = ( 0, height, 0 ), ws = 1 )
+
+    mc.select( cl = 1 )
+    mc.group( n = '%s_GEO_GRP' % characterName, em = 1 )
+
+def spineJointNames( count = 3 ):
+
+    """
+    @param count : int, number of spine joints
+    @return : list( str ), names of stand-in spine joints, from pelvis up
+    """
+
+    return [ 'spine%d_JNT' % ( i + 1 ) for i in range( count ) ]
+
+def neckJointNames( count = 2 ):
+
+    """
+    @param count : int, number of neck joints
+    @return : list( str ), names of stand-in neck joints below head joint, named like the characterName rig spec expects
+    """
+
+    return [ 'neck1_JNT' ] + [ 'neck%d' % ( i + 1 ) for i in range( 1, count ) ]
+
+def makeSpec( rigSpec = None, toes = 0, tailJoints = 0, spineJoints = 3, neckJoints = 2, **sceneArgs ):
+
+    """
+    characterName rig spec for a stand-in scene made with the same sizes
+
+    @param rigSpec : dict, rig spec to adapt, characterName spec by default
+    @param toes : int, number of toe chains per foot, leg modules get additional toe setups when not 0
+    @param tailJoints : int, number of tail joints, an ikChain tail module is added when not 0
+    @param spineJoints : int, number of spine joints
+    @param neckJoints : int, number of neck joints below head joint
+    @param sceneArgs : other arguments of makeScene, they do not change the spec
+    @return : dict, rig spec
+    """
+
+    if rigSpec is None:
+
+        rigSpec = spec.load( characterName.specPath )
+
+    rigSpec = copy.deepcopy( rigSpec )
+    spineNames = spineJointNames( spineJoints )
+
+    for moduleSpec in rigSpec[ 'modules' ]:
+
+        args = moduleSpec[ 'args' ]
+
+        if moduleSpec[ 'type' ] == 'spine':
+
+            args[ 'spineJoints' ] = spineNames
+
+        elif moduleSpec[ 'type' ] == 'neck':
+
+            args[ 'neckJoints' ] = neckJointNames( neckJoints ) + [ 'head_JNT' ]
+
+            for attachSpec in moduleSpec.get( 'attach', [] ):
+
+                if attachSpec[ 'grp' ] == 'baseAttachGrp':
+
+                    attachSpec[ 'driver' ] = spineNames[-1]
+
+        elif moduleSpec[ 'type' ] == 'leg':
+
+            side = moduleSpec[ 'name' ].split( '_' )[0]
+            args[ 'topToeJoints' ] = [ '%s_topToe%d_JNT' % ( side, t + 1 ) for t in range( toes ) ]
+            args[ 'additionnalToeJoints' ] = bool( toes )
+
+    if tailJoints:
+
+        rigSpec[ 'modules' ].append( {
+            'name': 'tail',
+            'type': 'ikChain',
+            'args': { 'chainJoints': [ 'tail%d_JNT' % ( i + 1 ) for i in range( tailJoints ) ], 'chainCurve': 'tail_CRV' },
+            'attach': [ { 'grp': 'baseAttachGrp', 'driver': 'pelvis_JNT' } ]
+            } )
+
+    spec.validate( rigSpec )
+
+    return rigSpec
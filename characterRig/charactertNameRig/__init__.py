@@ -1,2 +1,3 @@
-import characterName
-import project
\ No newline at end of file
+from rigLib import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'characterName', 'project' ] )
\ No newline at end of file
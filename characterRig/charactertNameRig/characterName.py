@@ -3,18 +3,20 @@ module for making rig setup for "characterName"
 main module 
 """
 
-from rigLib.base import control
-from rigLib.base import module
+import os
 
-from rigLib.rig import arm
-from rigLib.rig import ikChain
-from rigLib.rig import leg
-from rigLib.rig import neck
-from rigLib.rig import spine
+from rigLib.base import module
+from rigLib.base import shapeCache
 
-from rigLib.utils import joint
+from rigLib.build import cache
+from rigLib.build import incremental
+from rigLib.build import lod
+from rigLib.build import plan
+from rigLib.build import snapshot
+from rigLib.build import spec
 
-import maya.cmds as mc
+from rigLib.backend import cmds as mc
+from rigLib.backend import telemetry
 
 rootJoint = 'root_JNT'
 headJoint = 'head_JNT'
@@ -22,10 +24,20 @@ pelvisJoint = 'pelvis_JNT'
 
 sceneScale = 1.0
 
-def Build( characterName ):
+specPath = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'characterName.json' )
+
+@telemetry.reported
+def Build( characterName, rigSpec = None, modules = None, snapshotPath = None, level = 'full' ):
 
     """
     main function to build rig
+
+    @param characterName : str, name of character
+    @param rigSpec : dict, optional rig spec, loaded from specPath by default
+    @param modules : list( str ), optional names of modules to build with their dependencies, all by default
+    @param snapshotPath : str, optional path of binary rig snapshot written after build
+    @param level : str, level of detail, one of build.lod.levels
+    @return : None
     """
 
     # make base
@@ -34,131 +46,99 @@ def Build( characterName ):
 
     # parent model
 
-    modelGrp = '%d_GEO_GRP' % characterName
+    modelGrp = '%s_GEO_GRP' % characterName
     mc.parent( modelGrp, baseRig.modelGrp )
 
     # parent skeleton 
 
     mc.parent( rootJoint, baseRig.jointsGrp )
 
-    # control setup
+    # control setup, control shape templates are removed when it ends
+
+    makeControlSetup( baseRig, rigSpec = rigSpec, modules = modules, level = level )
 
-    makeControlSetup( baseRig )
+    # export rig snapshot
 
-def makeControlSetup( baseRig ):
+    if snapshotPath:
+
+        snapshot.export( baseRig.topGrp, snapshotPath )
+
+def DryRun( characterName, rigSpec = None, modules = None, level = 'full', workers = 1, verbose = False ):
 
     """
-    make control setup
+    print node and command counts of the rig Build would make, without touching the scene
+
+    @param characterName : str, name of character
+    @param rigSpec : dict, optional rig spec, loaded from specPath by default
+    @param modules : list( str ), optional names of modules to plan with their dependencies, all by default
+    @param level : str, level of detail, one of build.lod.levels
+    @param workers : int, number of worker processes planning modules, used outside of interactive Maya only
+    @param verbose : bool, list planned commands of each module
+    @return : dict, node, command, constraint, control and attach totals
     """
 
-    # spine 
-
-    spineJoints = [ 'spine1_JNT', 'spine2_JNT', 'spine3_JNT' ]
-
-    spineRig = spine.Build( 
-                            spineJoints = spineJoints,
-                            rootJoint = rootJoint,
-                            bodyLocator = 'body_LOC',
-                            chestLocator = 'chest_LOC',
-                            pelvisLocator = 'pelvis_LOC',
-                            prefix = 'spine',
-                            rigScale = sceneScale,
-                            baseRig = baseRig 
-                             )
-
-    # neck
-
-    neckJoints = [ 'neck1_JNT', 'neck2', 'head_JNT' ]
-
-    neckRig = neck.Build(
-                         neckJoints = neckJoints,
-                         headJoint = headJoint,
-                         prefix = 'neck',
-                         rigScale = sceneScale,
-                         baseRig = baseRig    
-                        )
-    
-    mc.parentConstraint( spineJoints[-1], neckRig['baseAttachGrp'], mo = 1 )
-    mc.parentConstraint( spineRig['body_CTRL'].C, neckRig['bodyAttachGrp'], mo = 1 )
-    
-    # left arm 
-
-    lArmJoints = [ 'l_arm1_JNT', 'l_arm2_JNT', 'l_hand_JNT' ]
-    lTopFingerJointA = 'l_topFingerA_JNT'
-    lTopFingerJointB = 'l_topFingerB_JNT'
-    lTopFingerJointC = 'l_topFingerC_JNT'
-    lTopFingerJointD = 'l_topFingerD_JNT'
-    lTopFingerJointE = 'l_topFingerE_JNT'
-
-    lArmRig = arm.Build( 
-                        armJoints = lArmJoints,
-                        topFingerJointsA = lTopFingerJointA,
-                        topFingerJointsB = lTopFingerJointB,
-                        topFingerJointsC = lTopFingerJointC,
-                        topFingerJointsD = lTopFingerJointD,
-                        topFingerJointsE = lTopFingerJointE,
-                        pvLocator = 'l_arm_poleVector_LOC',
-                        scapulaJoint = 'l_scapula_JNT',
-                        prefix = 'l_arm',
-                        rigScale = sceneScale,
-                        baseRig = baseRig
-                        ) 
-
-    mc.parentConstraint( spineJoints[-2], lArmRig['baseAttachGrp'], mo = 1 )
-    mc.parentConstraint( spineRig['body_CTRL'].C, lArmRig['bodyAttachGrp'], mo = 1 )
-
-    # right arm
-
-    rArmJoints = [ 'r_arm1_JNT', 'r_arm2_JNT', 'r_hand_JNT' ]
-    rTopFingerJointA = 'r_topFingerA_JNT'
-    rTopFingerJointB = 'r_topFingerB_JNT'
-    rTopFingerJointC = 'r_topFingerC_JNT'
-    rTopFingerJointD = 'r_topFingerD_JNT'
-    rTopFingerJointE = 'r_topFingerE_JNT'
-
-    rArmRig = arm.Build( 
-                        armJoints = rArmJoints,
-                        topFingerJointsA = rTopFingerJointA,
-                        topFingerJointsB = rTopFingerJointB,
-                        topFingerJointsC = rTopFingerJointC,
-                        topFingerJointsD = rTopFingerJointD,
-                        topFingerJointsE = rTopFingerJointE,
-                        pvLocator = 'r_arm_poleVector_LOC',
-                        scapulaJoint = 'r_scapula_JNT',
-                        prefix = 'r_arm',
-                        rigScale = sceneScale,
-                        baseRig = baseRig
-                        ) 
-
-    mc.parentConstraint( spineJoints[-2], rArmRig['baseAttachGrp'], mo = 1 )
-    mc.parentConstraint( spineRig['body_CTRL'].C, rArmRig['bodyAttachGrp'], mo = 1 )
-
-    # left leg
-
-    lLegJoints = [ 'l_leg1_JNT', 'l_leg2_JNT', 'l_foot_JNT', 'l_ball_JNT', 'l_toe_JNT' ]
-
-    lLegRig = leg.Build(
-                        legJoints = lLegJoints,
-                        pvLocator = 'l_leg_poleVector_LOC',
-                        prefix = 'l_leg',
-                        rigScale = sceneScale,
-                        baseRig = baseRig
-                        )
-    
-    mc.parentConstraint( spineJoints[0], lLegRig['baseAttachGrp'], mo = 1 )
-    mc.parentConstraint( spineRig['body_CTRL'], lLegRig['bodyAttachGrp'], mo = 1 )
-
-    # right leg
-
-    rLegJoints = [ 'r_leg1_JNT', 'r_leg2_JNT', 'r_foot_JNT', 'r_ball_JNT', 'r_toe_JNT' ]
-
-    rLegRig = leg.Build(
-                        legJoints = rLegJoints,
-                        pvLocator = 'r_leg_poleVector_LOC',
-                        prefix = 'r_leg',
-                        rigScale = sceneScale,
-                        baseRig = baseRig
-                        )
-    
-    mc.parentConstraint( spineJoints[0], rLegRig['baseAttachGrp'], mo = 1 )
-    mc.parentConstraint( spineRig['body_CTRL'], rLegRig['bodyAttachGrp'], mo = 1 )
+    if not rigSpec:
+
+        rigSpec = spec.load( specPath )
+
+    baseArgs = { 'characterName': characterName, 'scale': sceneScale, 'mainCtrlAttachObj': headJoint }
+    report = plan.dryRun( lod.apply( rigSpec, level ), baseArgs = baseArgs, rigScale = sceneScale, modules = modules,
+                          workers = workers, verbose = verbose )
+
+    return report[ 'totals' ]
+
+def makeControlSetup( baseRig, rigSpec = None, modules = None, level = 'full' ):
+
+    """
+    make control setup from rig spec, modules are built in dependency order,
+    control shape templates are removed when it ends
+
+    @param baseRig : instance of base.module.Base class
+    @param rigSpec : dict, optional rig spec, loaded from specPath by default
+    @param modules : list( str ), optional names of modules to build with their dependencies, all by default
+    @param level : str, level of detail, one of build.lod.levels
+    @return : dict, build results by module name
+    """
+
+    if not rigSpec:
+
+        rigSpec = spec.load( specPath )
+
+    rigSpec = lod.apply( rigSpec, level )
+
+    with shapeCache.building():
+
+        results = incremental.build( rigSpec, baseRig = baseRig, rigScale = sceneScale, modules = modules,
+                                     cache = cache.fromEnvironment() )[ 'results' ]
+
+    # skeleton of dropped modules follows the global controls
+
+    lod.constrainRoot( rigSpec, level, baseRig )
+
+    return results
+
+@telemetry.reported
+def Rebuild( characterName, rigSpec = None, modules = None ):
+
+    """
+    rebuild modules of rig made by Build whose joints, locators, spec or code changed,
+    other modules are kept and their attach constraints are rewired
+
+    @param characterName : str, name of character
+    @param rigSpec : dict, optional rig spec, loaded from specPath by default
+    @param modules : list( str ), optional names of modules to rebuild with their dependencies, all by default
+    @return : dict, names of built, kept and rewired modules
+    """
+
+    baseRig = module.ExistingBase( characterName = characterName )
+
+    if not rigSpec:
+
+        rigSpec = spec.load( specPath )
+
+    with shapeCache.building():
+
+        report = incremental.build( rigSpec, baseRig = baseRig, rigScale = sceneScale, modules = modules,
+                                    cache = cache.fromEnvironment() )
+
+    return dict( ( key, report[ key ] ) for key in [ 'built', 'kept', 'rewired' ] )
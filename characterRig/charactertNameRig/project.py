@@ -5,4 +5,4 @@ main project file with central variables
 """
 
 sceneScale = 1.0
-mainProjectPath = 
+mainProjectPath = ''
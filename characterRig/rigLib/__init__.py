@@ -1,3 +1,3 @@
-import base
-import rig
-import utils
\ No newline at end of file
+from . import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'backend', 'base', 'build', 'evaluate', 'rig', 'utils' ] )
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+backend @ rigLib
+pluggable scene backend behind the maya.cmds style calls used by rigLib
+
+rig modules import the command proxy instead of maya.cmds :
+
+    from ..backend import cmds as mc
+
+every call made on the proxy is forwarded to the active backend, which is
+maya.cmds by default or an in-memory scene for headless builds
+"""
+
+import contextlib
+import os
+
+_activeBackend = None
+
+class CommandProxy():
+
+    """
+    forwards maya.cmds style calls to the active backend
+    """
+
+    def __getattr__( self, commandName ):
+
+        if commandName.startswith( '__' ):
+
+            raise AttributeError( commandName )
+
+        return getattr( getBackend(), commandName )
+
+cmds = CommandProxy()
+
+def getBackend():
+
+    """
+    get active backend, create default one on first use
+
+    default backend is maya.cmds, set environment variable RIGLIB_BACKEND
+    to 'memory' to start with an empty in-memory scene instead
+
+    @return : active backend object
+    """
+
+    global _activeBackend
+
+    if _activeBackend is None:
+
+        if os.environ.get( 'RIGLIB_BACKEND', 'maya' ) == 'memory':
+
+            from . import memory
+            _activeBackend = memory.MemoryScene()
+
+        else:
+
+            from . import mayaCmds
+            _activeBackend = mayaCmds.MayaBackend()
+
+    return _activeBackend
+
+def setBackend( backend ):
+
+    """
+    set active backend
+
+    @param backend : object implementing maya.cmds style commands
+    @return : previous backend object
+    """
+
+    global _activeBackend
+
+    previousBackend = _activeBackend
+    _activeBackend = backend
+
+    return previousBackend
+
+@contextlib.contextmanager
+def useBackend( backend ):
+
+    """
+    temporarily use given backend
+
+    @param backend : object implementing maya.cmds style commands
+    @return : given backend, active inside the with block
+    """
+
+    previousBackend = setBackend( backend )
+
+    try:
+
+        yield backend
+
+    finally:
+
+        setBackend( previousBackend )
@@ -0,0 +1,342 @@
+"""
+batch @ backend
+command batching layer coalescing setAttr and hide calls during a build
+
+setAttr and hide calls are queued per node while a batch is active and
+flushed merged : repeated calls on the same plug become one call, matching
+per axis lock / keyable calls on t, r or s become one compound call and all
+hide calls become a single hide. The queue is flushed before any command
+that references a queued node, before queries and deletes, and at the end
+of the batch, so builds see the same scene state as without batching
+"""
+
+import contextlib
+import functools
+
+from . import getBackend
+from . import useBackend
+
+# attribute names are merged by canonical short name
+
+_canonicalAttrs = {
+    'translate': 't', 'translateX': 'tx', 'translateY': 'ty', 'translateZ': 'tz',
+    'rotate': 'r', 'rotateX': 'rx', 'rotateY': 'ry', 'rotateZ': 'rz',
+    'scale': 's', 'scaleX': 'sx', 'scaleY': 'sy', 'scaleZ': 'sz',
+    'visibility': 'v'
+    }
+
+_compoundAxes = { 't': [ 'tx', 'ty', 'tz' ], 'r': [ 'rx', 'ry', 'rz' ], 's': [ 'sx', 'sy', 'sz' ] }
+
+# transform values are read back implicitly by parenting, constraints and xform,
+# so setting them is never deferred
+
+_transformAttrs = set( [ 't', 'tx', 'ty', 'tz', 'r', 'rx', 'ry', 'rz', 's', 'sx', 'sy', 'sz',
+                         'rp', 'rpx', 'rpy', 'rpz', 'jo', 'jox', 'joy', 'joz', 'it', 'inheritsTransform',
+                         'rotatePivot', 'jointOrient' ] )
+
+_flagNames = { 'lock': 'l', 'keyable': 'k', 'channelBox': 'cb', 'type': 'type' }
+
+barrierCommands = [ 'delete', 'getAttr', 'file', 'attributeQuery', 'listAttr', 'undoInfo', 'refresh' ]
+
+totals = { 'recorded': 0, 'issued': 0 }
+
+class CommandBatch():
+
+    """
+    class queueing setAttr and hide calls and forwarding other commands to wrapped backend
+    """
+
+    def __init__( self, backend ):
+
+        """
+        @param backend : backend to issue commands to
+        @return : None
+        """
+
+        self.backend = backend
+        self.recorded = 0
+        self.issued = 0
+
+        self._ops = {}
+        self._nodeOrder = []
+        self._hidden = []
+
+    def __getattr__( self, commandName ):
+
+        if commandName.startswith( '_' ):
+
+            raise AttributeError( commandName )
+
+        command = getattr( self.backend, commandName )
+
+        def passThrough( *args, **kwargs ):
+
+            if self._ops or self._hidden:
+
+                if commandName in barrierCommands or kwargs.get( 'q' ) or kwargs.get( 'query' ) or self._references( args, kwargs ):
+
+                    self.flush()
+
+            return command( *args, **kwargs )
+
+        return passThrough
+
+    def _pendingNodes( self ):
+
+        return set( self._nodeOrder ) | set( self._hidden )
+
+    def _references( self, args, kwargs ):
+
+        pending = self._pendingNodes()
+
+        for value in _flatten( list( args ) + list( kwargs.values() ) ):
+
+            if _nodeName( value ) in pending:
+
+                return True
+
+        return False
+
+    def setAttr( self, plug, *values, **kwargs ):
+
+        """
+        queue setAttr call, transform values are issued straight away
+        """
+
+        self.recorded += 1
+
+        nodeName, _, at = plug.partition( '.' )
+        nodeName = _nodeName( nodeName )
+        at = _canonicalAttrs.get( at, at )
+        flags = dict( ( _flagNames.get( k, k ), v ) for k, v in kwargs.items() )
+
+        if ( values and at in _transformAttrs ) or '[' in at:
+
+            self._issue( 'setAttr', ( plug, ) + values, kwargs )
+
+            return
+
+        nodeOps = self._ops.get( nodeName, {} )
+
+        if self._conflicts( nodeName, nodeOps, at, values ):
+
+            self.flush()
+            nodeOps = {}
+
+        if nodeName not in self._ops:
+
+            self._ops[ nodeName ] = nodeOps
+            self._nodeOrder.append( nodeName )
+
+        op = nodeOps.setdefault( at, { 'values': (), 'flags': {} } )
+
+        if values:
+
+            op[ 'values' ] = values
+
+        op[ 'flags' ].update( flags )
+
+    def _conflicts( self, nodeName, nodeOps, at, values ):
+
+        # queued value set on hidden node visibility
+
+        if at == 'v' and nodeName in self._hidden:
+
+            return True
+
+        # setting value of attribute queued to be locked
+
+        if values and nodeOps.get( at, {} ).get( 'flags', {} ).get( 'l' ):
+
+            return True
+
+        # compound and child attribute queued together would be reordered
+
+        for compound, axes in _compoundAxes.items():
+
+            if ( at == compound and any( a in nodeOps for a in axes ) ) or ( at in axes and compound in nodeOps ):
+
+                return True
+
+        return False
+
+    def hide( self, *args ):
+
+        """
+        queue hide call
+        """
+
+        self.recorded += 1
+
+        for obj in _flatten( args ):
+
+            nodeName = _nodeName( obj )
+
+            if 'v' in self._ops.get( nodeName, {} ):
+
+                self.flush()
+
+            if nodeName not in self._hidden:
+
+                self._hidden.append( nodeName )
+
+    def flush( self ):
+
+        """
+        issue queued commands merged
+
+        @return : None
+        """
+
+        ops, nodeOrder, hidden = self._ops, self._nodeOrder, self._hidden
+        self._ops, self._nodeOrder, self._hidden = {}, [], []
+
+        for nodeName in nodeOrder:
+
+            for at, op in _mergeAxes( ops[ nodeName ] ):
+
+                self._issue( 'setAttr', ( nodeName + '.' + at, ) + tuple( op[ 'values' ] ), op[ 'flags' ] )
+
+        if hidden:
+
+            self._issue( 'hide', hidden, {} )
+
+    def _issue( self, commandName, args, kwargs ):
+
+        self.issued += 1
+        getattr( self.backend, commandName )( *args, **kwargs )
+
+    def stats( self ):
+
+        """
+        @return : dict, recorded and issued call counts and number of saved calls
+        """
+
+        return { 'recorded': self.recorded, 'issued': self.issued, 'saved': self.recorded - self.issued }
+
+def _mergeAxes( nodeOps ):
+
+    merged = []
+    skip = set()
+
+    for at, op in nodeOps.items():
+
+        if at in skip:
+
+            continue
+
+        compound = at[:-1] if len( at ) == 2 and at[:-1] in _compoundAxes and at[-1] in 'xyz' else None
+
+        if compound:
+
+            axisOps = [ nodeOps.get( a ) for a in _compoundAxes[ compound ] ]
+
+            if all( axisOps ) and all( not o[ 'values' ] and o[ 'flags' ] == op[ 'flags' ] for o in axisOps ):
+
+                merged.append( ( compound, op ) )
+                skip.update( _compoundAxes[ compound ] )
+
+                continue
+
+        merged.append( ( at, op ) )
+
+    return merged
+
+def _nodeName( value ):
+
+    if not isinstance( value, str ):
+
+        return None
+
+    return value.split( '.' )[0].split( '|' )[-1]
+
+def _flatten( values ):
+
+    result = []
+
+    for value in values:
+
+        if isinstance( value, ( list, tuple ) ):
+
+            result.extend( _flatten( value ) )
+
+        else:
+
+            result.append( value )
+
+    return result
+
+@contextlib.contextmanager
+def batched():
+
+    """
+    queue setAttr and hide calls issued inside the with block, nested blocks share outer batch
+
+    @return : CommandBatch active inside the with block
+    """
+
+    activeBackend = getBackend()
+
+    if isinstance( activeBackend, CommandBatch ):
+
+        yield activeBackend
+
+        return
+
+    commandBatch = CommandBatch( activeBackend )
+
+    try:
+
+        with useBackend( commandBatch ):
+
+            try:
+
+                yield commandBatch
+
+            finally:
+
+                commandBatch.flush()
+
+    finally:
+
+        totals[ 'recorded' ] += commandBatch.recorded
+        totals[ 'issued' ] += commandBatch.issued
+
+def batchedBuild( buildFunction ):
+
+    """
+    decorator running a module build inside a command batch
+
+    @param buildFunction : function, module build function
+    @return : function, wrapped build function
+    """
+
+    @functools.wraps( buildFunction )
+    def wrapper( *args, **kwargs ):
+
+        with batched():
+
+            return buildFunction( *args, **kwargs )
+
+    return wrapper
+
+def resetTotals():
+
+    """
+    reset session call counts
+    """
+
+    totals[ 'recorded' ] = 0
+    totals[ 'issued' ] = 0
+
+def report():
+
+    """
+    @return : str, summary of calls saved by batching in this session
+    """
+
+    recorded = totals[ 'recorded' ]
+    saved = recorded - totals[ 'issued' ]
+    percent = 100.0 * saved / recorded if recorded else 0.0
+
+    return 'batched %d setAttr/hide calls into %d, saved %d calls (%.1f%%)' % ( recorded, totals[ 'issued' ], saved, percent )
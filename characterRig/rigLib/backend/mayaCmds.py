@@ -0,0 +1,38 @@
+"""
+mayaCmds @ backend
+backend forwarding commands to maya.cmds
+"""
+
+class MayaBackend():
+
+    """
+    class forwarding commands to maya.cmds, maya is imported on first call
+    """
+
+    def __init__( self ):
+
+        self._cmds = None
+
+    def standalone( self ):
+
+        """
+        initialize maya standalone, used by processes running outside of maya like build workers
+
+        @return : None
+        """
+
+        import maya.standalone
+        maya.standalone.initialize( name = 'python' )
+
+    def __getattr__( self, commandName ):
+
+        if commandName.startswith( '_' ):
+
+            raise AttributeError( commandName )
+
+        if self._cmds is None:
+
+            import maya.cmds
+            self._cmds = maya.cmds
+
+        return getattr( self._cmds, commandName )
@@ -0,0 +1,1765 @@
+"""
+memory @ backend
+pure python in-memory scene graph implementing the subset of maya.cmds used by rigLib
+
+nodes are indexed by unique short name, new names clashing with existing
+ones get a number suffix the same way maya renames them
+
+world matrices are cached, edits of a node drop the cached matrices of
+its subtree, so querying world matrices along long joint chains does not
+walk the chain again for each joint. Edits of nodes driving connections
+drop all cached matrices
+"""
+
+import fnmatch
+import json
+import math
+import os
+import re
+
+from ..utils import matrix
+
+# attribute short names used by rigLib and their long names
+
+attrAliases = {
+    't': 'translate', 'tx': 'translateX', 'ty': 'translateY', 'tz': 'translateZ',
+    'r': 'rotate', 'rx': 'rotateX', 'ry': 'rotateY', 'rz': 'rotateZ',
+    's': 'scale', 'sx': 'scaleX', 'sy': 'scaleY', 'sz': 'scaleZ',
+    'rp': 'rotatePivot', 'rpx': 'rotatePivotX', 'rpy': 'rotatePivotY', 'rpz': 'rotatePivotZ',
+    'jo': 'jointOrient', 'jox': 'jointOrientX', 'joy': 'jointOrientY', 'joz': 'jointOrientZ',
+    'v': 'visibility', 'it': 'inheritsTransform', 'io': 'intermediateObject',
+    'ove': 'overrideEnabled', 'ovc': 'overrideColor', 'ovdt': 'overrideDisplayType',
+    'en': 'envelope', 'radi': 'radius'
+    }
+
+compoundAttrs = {
+    'translate': [ 'translateX', 'translateY', 'translateZ' ],
+    'rotate': [ 'rotateX', 'rotateY', 'rotateZ' ],
+    'scale': [ 'scaleX', 'scaleY', 'scaleZ' ],
+    'rotatePivot': [ 'rotatePivotX', 'rotatePivotY', 'rotatePivotZ' ],
+    'jointOrient': [ 'jointOrientX', 'jointOrientY', 'jointOrientZ' ]
+    }
+
+shapeTypes = [ 'nurbsCurve', 'locator' ]
+transformTypes = [ 'transform', 'joint', 'clusterHandle', 'ikHandle', 'ikEffector',
+                   'pointConstraint', 'orientConstraint', 'parentConstraint', 'scaleConstraint',
+                   'poleVectorConstraint' ]
+
+_displayAttrs = { 'visibility': 1, 'template': 0, 'overrideEnabled': 0, 'overrideColor': 0,
+                  'overrideDisplayType': 0 }
+
+_transformAttrs = { 'translateX': 0.0, 'translateY': 0.0, 'translateZ': 0.0,
+                    'rotateX': 0.0, 'rotateY': 0.0, 'rotateZ': 0.0,
+                    'scaleX': 1.0, 'scaleY': 1.0, 'scaleZ': 1.0,
+                    'rotatePivotX': 0.0, 'rotatePivotY': 0.0, 'rotatePivotZ': 0.0,
+                    'inheritsTransform': 1 }
+
+_keyableAttrs = [ 'translateX', 'translateY', 'translateZ', 'rotateX', 'rotateY', 'rotateZ',
+                  'scaleX', 'scaleY', 'scaleZ', 'visibility' ]
+
+_componentRe = re.compile( r'^(cv|controlPoints)\[(\*|\d+)(?::(\d+))?\]$' )
+
+# control points of a degree 3 periodic circle with 8 sections and radius 1
+
+_circleCvs = [ ( 0.783612, 0.783612 ), ( 0.0, 1.108194 ), ( -0.783612, 0.783612 ), ( -1.108194, 0.0 ),
+               ( -0.783612, -0.783612 ), ( 0.0, -1.108194 ), ( 0.783612, -0.783612 ), ( 1.108194, 0.0 ) ]
+
+class Node():
+
+    """
+    class holding one scene node
+    """
+
+    def __init__( self, name, nodeType, parent = None ):
+
+        """
+        @param name : str, unique node name
+        @param nodeType : str, maya node type
+        @param parent : Node, optional parent dag node
+        @return : None
+        """
+
+        self.name = name
+        self.type = nodeType
+        self.parent = parent
+        self.children = []
+        self.attrs = {}
+        self.attrTypes = {}
+        self.userAttrs = []
+        self.locked = set()
+        self.keyable = set()
+        self.channelBox = set()
+        self.inputs = {}
+        self.cvs = None
+        self.data = {}
+
+        if nodeType in shapeTypes or nodeType in transformTypes:
+
+            self.attrs.update( _displayAttrs )
+
+        if nodeType in transformTypes:
+
+            self.attrs.update( _transformAttrs )
+            self.keyable.update( _keyableAttrs )
+
+        if nodeType == 'joint':
+
+            self.attrs.update( { 'jointOrientX': 0.0, 'jointOrientY': 0.0, 'jointOrientZ': 0.0, 'radius': 1.0 } )
+
+        if nodeType == 'ikHandle':
+
+            self.attrs[ 'twist' ] = 0.0
+
+        if nodeType == 'cluster':
+
+            self.attrs[ 'envelope' ] = 1.0
+
+        if parent:
+
+            parent.children.append( self )
+
+    def isDag( self ):
+
+        return self.type in shapeTypes or self.type in transformTypes
+
+    def isShape( self ):
+
+        return self.type in shapeTypes
+
+class MemoryScene():
+
+    """
+    class implementing maya.cmds style commands on an in-memory scene graph
+    """
+
+    def __init__( self ):
+
+        self._nodes = {}
+        self._selection = []
+        self._sceneName = ''
+        self._worldMatrices = {}
+        self._drivers = set()
+
+    # node helpers
+
+    def _uniqueName( self, name ):
+
+        name = name.split( '|' )[-1].split( ':' )[-1]
+
+        if name not in self._nodes:
+
+            return name
+
+        match = re.match( r'^(.*?)(\d*)$', name )
+        stem = match.group( 1 )
+        number = int( match.group( 2 ) ) if match.group( 2 ) else 0
+
+        while True:
+
+            number += 1
+            candidate = stem + str( number )
+
+            if candidate not in self._nodes:
+
+                return candidate
+
+    def _createNode( self, name, nodeType, parent = None ):
+
+        node = Node( self._uniqueName( name ), nodeType, parent )
+        self._nodes[ node.name ] = node
+
+        return node
+
+    def _node( self, name ):
+
+        if isinstance( name, Node ):
+
+            return name
+
+        shortName = str( name ).split( '|' )[-1]
+
+        if shortName not in self._nodes:
+
+            raise ValueError( 'No object matches name: %s' % name )
+
+        return self._nodes[ shortName ]
+
+    def _flatten( self, args ):
+
+        result = []
+
+        for arg in args:
+
+            if arg is None:
+
+                continue
+
+            if isinstance( arg, ( list, tuple ) ):
+
+                result.extend( self._flatten( arg ) )
+
+            else:
+
+                result.append( str( arg ) )
+
+        return result
+
+    def _shapes( self, node ):
+
+        return [ c for c in node.children if c.isShape() ]
+
+    def _curveShape( self, node ):
+
+        if node.type == 'nurbsCurve':
+
+            return node
+
+        shapes = [ s for s in self._shapes( node ) if s.type == 'nurbsCurve' ]
+
+        if not shapes:
+
+            raise RuntimeError( '%s has no curve shape' % node.name )
+
+        return shapes[0]
+
+    def _descendants( self, node ):
+
+        result = []
+
+        for child in node.children:
+
+            result.append( child )
+            result.extend( self._descendants( child ) )
+
+        return result
+
+    def _removeNode( self, node ):
+
+        self._changed( node )
+
+        for child in list( node.children ):
+
+            self._removeNode( child )
+
+        if node.parent:
+
+            node.parent.children.remove( node )
+            node.parent = None
+
+        # only nodes that were connected as source drive other nodes
+
+        if node in self._drivers:
+
+            self._drivers.discard( node )
+
+            for other in self._nodes.values():
+
+                for at, ( srcNode, srcAt ) in list( other.inputs.items() ):
+
+                    if srcNode is node:
+
+                        del other.inputs[ at ]
+
+        self._nodes.pop( node.name, None )
+
+        if node in self._selection:
+
+            self._selection.remove( node )
+
+    def _setParent( self, node, parent, relative = False ):
+
+        worldMatrix = None
+
+        if not relative and node.type in transformTypes:
+
+            worldMatrix = self._worldMatrix( node )
+
+        if parent is not None:
+
+            ancestor = parent
+
+            while ancestor:
+
+                if ancestor is node:
+
+                    raise RuntimeError( 'Cannot parent %s under its own descendant %s' % ( node.name, parent.name ) )
+
+                ancestor = ancestor.parent
+
+        self._changed( node )
+
+        if node.parent:
+
+            node.parent.children.remove( node )
+
+        node.parent = parent
+
+        if parent:
+
+            parent.children.append( node )
+
+        if worldMatrix:
+
+            self._setWorldMatrix( node, worldMatrix )
+
+    # attribute helpers
+
+    def _splitPlug( self, plug ):
+
+        if '.' not in plug:
+
+            raise RuntimeError( 'Invalid attribute name: %s' % plug )
+
+        nodeName, at = plug.split( '.', 1 )
+
+        return self._node( nodeName ), at
+
+    def _longName( self, node, at ):
+
+        longName = attrAliases.get( at, at )
+
+        if longName not in node.attrs and longName not in compoundAttrs:
+
+            raise RuntimeError( 'No attribute %s on node %s' % ( at, node.name ) )
+
+        if longName in compoundAttrs and compoundAttrs[ longName ][0] not in node.attrs:
+
+            raise RuntimeError( 'No attribute %s on node %s' % ( at, node.name ) )
+
+        return longName
+
+    def _attrNames( self, node, longName ):
+
+        return compoundAttrs.get( longName, [ longName ] )
+
+    def _value( self, node, longName ):
+
+        if longName in compoundAttrs:
+
+            return tuple( self._value( node, a ) for a in compoundAttrs[ longName ] )
+
+        if longName in node.inputs:
+
+            srcNode, srcAt = node.inputs[ longName ]
+
+            return self._value( srcNode, srcAt )
+
+        return node.attrs[ longName ]
+
+    def _vector( self, node, longName ):
+
+        return [ float( v ) for v in self._value( node, longName ) ]
+
+    def _components( self, node, at ):
+
+        match = _componentRe.match( at )
+
+        if not match:
+
+            return None
+
+        shape = self._curveShape( node )
+
+        if match.group( 2 ) == '*':
+
+            return shape, list( range( len( shape.cvs ) ) )
+
+        start = int( match.group( 2 ) )
+        end = int( match.group( 3 ) ) if match.group( 3 ) else start
+
+        if end >= len( shape.cvs ):
+
+            raise RuntimeError( 'Component index out of range: %s.%s' % ( node.name, at ) )
+
+        return shape, list( range( start, end + 1 ) )
+
+    # matrix helpers
+
+    def _localMatrix( self, node ):
+
+        if node.type not in transformTypes:
+
+            return matrix.identity()
+
+        pivot = self._vector( node, 'rotatePivot' )
+        jointOrient = self._vector( node, 'jointOrient' ) if node.type == 'joint' else None
+
+        m = matrix.compose( rotate = self._vector( node, 'rotate' ), scale = self._vector( node, 'scale' ),
+                            jointOrient = jointOrient )
+
+        translate = self._vector( node, 'translate' )
+        offset = matrix.transformPoint( [ -v for v in pivot ], m )
+
+        return matrix.withTranslation( m, [ o + p + t for o, p, t in zip( offset, pivot, translate ) ] )
+
+    def _worldMatrix( self, node ):
+
+        if node not in self._worldMatrices:
+
+            m = self._localMatrix( node )
+
+            if self._inherits( node ):
+
+                m = matrix.multiply( m, self._worldMatrix( node.parent ) )
+
+            self._worldMatrices[ node ] = m
+
+        return list( self._worldMatrices[ node ] )
+
+    def _changed( self, node ):
+
+        # matrices cached for a node are cached for its ancestors too, a subtree without cached matrix at its top has none
+
+        if node in self._drivers:
+
+            self._worldMatrices.clear()
+            return
+
+        pending = [ node ]
+
+        while pending:
+
+            current = pending.pop()
+
+            if self._worldMatrices.pop( current, None ) is not None:
+
+                pending.extend( current.children )
+
+    def _inherits( self, node ):
+
+        if not node.parent:
+
+            return False
+
+        return node.type not in transformTypes or bool( self._value( node, 'inheritsTransform' ) )
+
+    def _parentMatrix( self, node ):
+
+        if self._inherits( node ):
+
+            return self._worldMatrix( node.parent )
+
+        return matrix.identity()
+
+    def _worldPivot( self, node ):
+
+        if node.type not in transformTypes:
+
+            return matrix.translation( self._worldMatrix( node ) )
+
+        return matrix.transformPoint( self._vector( node, 'rotatePivot' ), self._worldMatrix( node ) )
+
+    def _setLocalMatrix( self, node, m, translate = True, rotate = True, scale = True ):
+
+        pivot = self._vector( node, 'rotatePivot' )
+        jointOrient = self._vector( node, 'jointOrient' ) if node.type == 'joint' else None
+
+        t, r, s = matrix.decompose( m, jointOrient = jointOrient )
+
+        if translate:
+
+            offset = matrix.transformPoint( pivot, matrix.withTranslation( m, [ 0.0, 0.0, 0.0 ] ) )
+            t = [ tv + ov - pv for tv, ov, pv in zip( t, offset, pivot ) ]
+            self._setChannels( node, 'translate', t )
+
+        if rotate:
+
+            self._setChannels( node, 'rotate', r )
+
+        if scale:
+
+            self._setChannels( node, 'scale', s )
+
+    def _setWorldMatrix( self, node, m, translate = True, rotate = True, scale = True ):
+
+        local = matrix.multiply( m, matrix.inverse( self._parentMatrix( node ) ) )
+        self._setLocalMatrix( node, local, translate = translate, rotate = rotate, scale = scale )
+
+    def _setChannels( self, node, longName, values ):
+
+        for at, value in zip( compoundAttrs[ longName ], values ):
+
+            if at in node.locked or at in node.inputs:
+
+                raise RuntimeError( 'The attribute %s.%s is locked or connected and cannot be modified' % ( node.name, at ) )
+
+            node.attrs[ at ] = float( value )
+
+        self._changed( node )
+
+    # dag commands
+
+    def group( self, *objects, **kwargs ):
+
+        """
+        create empty group or group given objects
+
+        @return : str, name of new group
+        """
+
+        objects = self._flatten( objects )
+        parentName = kwargs.get( 'p', kwargs.get( 'parent' ) )
+        parent = self._node( parentName ) if parentName else None
+
+        if not objects and not kwargs.get( 'em', kwargs.get( 'empty' ) ):
+
+            objects = [ n.name for n in self._selection ]
+
+        grp = self._createNode( kwargs.get( 'n', kwargs.get( 'name', 'group1' ) ), 'transform', parent )
+
+        for obj in objects:
+
+            self._setParent( self._node( obj ), grp )
+
+        return grp.name
+
+    def createNode( self, nodeType, **kwargs ):
+
+        """
+        @return : str, name of new node
+        """
+
+        parentName = kwargs.get( 'p', kwargs.get( 'parent' ) )
+        parent = self._node( parentName ) if parentName else None
+
+        node = self._createNode( kwargs.get( 'n', kwargs.get( 'name', nodeType + '1' ) ), nodeType, parent )
+
+        if nodeType == 'nurbsCurve':
+
+            node.cvs = []
+
+        return node.name
+
+    def parent( self, *args, **kwargs ):
+
+        """
+        parent objects to last given object or to world
+
+        @return : list( str ), names of parented objects
+        """
+
+        objects = self._flatten( args )
+        relative = kwargs.get( 'r', kwargs.get( 'relative', False ) )
+
+        if kwargs.get( 'w', kwargs.get( 'world', False ) ):
+
+            newParent = None
+
+        else:
+
+            if len( objects ) < 2:
+
+                raise RuntimeError( 'parent: not enough objects specified' )
+
+            newParent = self._node( objects.pop() )
+
+        for obj in objects:
+
+            node = self._node( obj )
+
+            if node.isShape() and not kwargs.get( 's', kwargs.get( 'shape', False ) ):
+
+                raise RuntimeError( 'parent: use shape flag to parent shape %s' % node.name )
+
+            if node.parent is not newParent:
+
+                self._setParent( node, newParent, relative = relative )
+
+        return objects
+
+    def listRelatives( self, *args, **kwargs ):
+
+        """
+        list relatives of given objects
+
+        @return : list( str ) or None when nothing is found, like maya
+        """
+
+        result = []
+        nodeType = kwargs.get( 'type' )
+
+        if isinstance( nodeType, str ):
+
+            nodeType = [ nodeType ]
+
+        for obj in self._flatten( args ):
+
+            node = self._node( obj )
+
+            if kwargs.get( 'p', kwargs.get( 'parent' ) ):
+
+                relatives = [ node.parent ] if node.parent else []
+
+            elif kwargs.get( 'ad', kwargs.get( 'allDescendents' ) ):
+
+                relatives = self._descendants( node )
+                relatives.reverse()
+
+            else:
+
+                relatives = list( node.children )
+
+            if kwargs.get( 's', kwargs.get( 'shapes' ) ):
+
+                relatives = [ r for r in relatives if r.isShape() ]
+
+            if nodeType:
+
+                relatives = [ r for r in relatives if r.type in nodeType ]
+
+            for r in relatives:
+
+                if r.name not in result:
+
+                    result.append( r.name )
+
+        if kwargs.get( 'f', kwargs.get( 'fullPath' ) ):
+
+            result = [ self._fullPath( self._node( n ) ) for n in result ]
+
+        return result or None
+
+    def _fullPath( self, node ):
+
+        path = ''
+
+        while node:
+
+            path = '|' + node.name + path
+            node = node.parent
+
+        return path
+
+    def delete( self, *args, **kwargs ):
+
+        """
+        delete objects or their construction history
+        """
+
+        objects = self._flatten( args )
+
+        if kwargs.get( 'ch', kwargs.get( 'constructionHistory' ) ):
+
+            for obj in objects:
+
+                self._bakeHistory( self._node( obj ) )
+
+            return
+
+        for obj in objects:
+
+            nodeName = obj.split( '|' )[-1]
+
+            if nodeName in self._nodes:
+
+                self._removeNode( self._nodes[ nodeName ] )
+
+            else:
+
+                raise ValueError( 'No object matches name: %s' % obj )
+
+    def objExists( self, name ):
+
+        """
+        @return : bool, True if node or plug exists
+        """
+
+        if not name:
+
+            return False
+
+        name = str( name )
+
+        if '.' in name:
+
+            nodeName, at = name.split( '.', 1 )
+
+            if nodeName.split( '|' )[-1] not in self._nodes:
+
+                return False
+
+            node = self._nodes[ nodeName.split( '|' )[-1] ]
+
+            try:
+
+                self._components( node, at ) or self._longName( node, at )
+
+            except RuntimeError:
+
+                return False
+
+            return True
+
+        return name.split( '|' )[-1] in self._nodes
+
+    def nodeType( self, name ):
+
+        """
+        @return : str, type of node
+        """
+
+        return self._node( name ).type
+
+    def ls( self, *args, **kwargs ):
+
+        """
+        list nodes or components matching given names or patterns
+
+        @return : list( str ), matching names
+        """
+
+        patterns = self._flatten( args )
+        nodeType = kwargs.get( 'type' )
+
+        if isinstance( nodeType, str ):
+
+            nodeType = [ nodeType ]
+
+        if kwargs.get( 'sl', kwargs.get( 'selection' ) ):
+
+            patterns = [ n.name for n in self._selection ]
+
+        elif not patterns:
+
+            patterns = [ '*' ]
+
+        result = []
+
+        for pattern in patterns:
+
+            if '.' in pattern:
+
+                node, at = self._splitPlug( pattern )
+                components = self._components( node, at )
+
+                if components:
+
+                    shape, indices = components
+                    attrName = at.split( '[' )[0]
+
+                    if kwargs.get( 'fl', kwargs.get( 'flatten' ) ):
+
+                        result.extend( '%s.%s[%d]' % ( node.name, attrName, i ) for i in indices )
+
+                    else:
+
+                        result.append( '%s.%s[%d:%d]' % ( node.name, attrName, indices[0], indices[-1] ) )
+
+                continue
+
+            matches = fnmatch.filter( self._nodes, pattern.split( '|' )[-1] )
+
+            for name in matches:
+
+                if nodeType and self._nodes[ name ].type not in nodeType:
+
+                    continue
+
+                if name not in result:
+
+                    result.append( name )
+
+        if kwargs.get( 's', kwargs.get( 'shapes' ) ):
+
+            result = [ name for name in result if name in self._nodes and self._nodes[ name ].isShape() ]
+
+        types = [ self._nodes[ name.split( '.' )[0] ].type for name in result ]
+
+        if kwargs.get( 'l', kwargs.get( 'long' ) ):
+
+            result = [ self._fullPath( self._nodes[ name ] ) if name in self._nodes and self._nodes[ name ].isDag() else name
+                       for name in result ]
+
+        if kwargs.get( 'st', kwargs.get( 'showType' ) ):
+
+            return [ item for name, nodeType in zip( result, types ) for item in ( name, nodeType ) ]
+
+        return result
+
+    def select( self, *args, **kwargs ):
+
+        """
+        set scene selection
+        """
+
+        if kwargs.get( 'cl', kwargs.get( 'clear' ) ):
+
+            self._selection = []
+
+            return
+
+        nodes = [ self._node( obj ) for obj in self._flatten( args ) ]
+
+        if kwargs.get( 'add' ):
+
+            self._selection.extend( n for n in nodes if n not in self._selection )
+
+        else:
+
+            self._selection = nodes
+
+    def hide( self, *args ):
+
+        """
+        hide given objects
+        """
+
+        for obj in self._flatten( args ):
+
+            self.setAttr( obj + '.visibility', 0 )
+
+    def duplicate( self, *args, **kwargs ):
+
+        """
+        duplicate objects with their descendants under the same parent
+
+        @return : list( str ), names of duplicated roots, followed by duplicated descendants unless rr is on
+        """
+
+        roots = []
+        descendants = []
+
+        for obj in self._flatten( args ):
+
+            node = self._node( obj )
+            name = kwargs.get( 'n', kwargs.get( 'name' ) ) if not roots else None
+            copy = self._copyNode( node, node.parent, name, descendants )
+            roots.append( copy.name )
+
+        if kwargs.get( 'rr', kwargs.get( 'returnRootsOnly' ) ):
+
+            return roots
+
+        return roots + descendants
+
+    def _copyNode( self, node, parent, name, copies ):
+
+        copy = self._createNode( name or node.name, node.type, parent )
+        copy.attrs = dict( node.attrs )
+        copy.attrTypes = dict( node.attrTypes )
+        copy.userAttrs = list( node.userAttrs )
+        copy.locked = set( node.locked )
+        copy.keyable = set( node.keyable )
+        copy.channelBox = set( node.channelBox )
+        copy.cvs = [ list( cv ) for cv in node.cvs ] if node.cvs is not None else None
+
+        for child in node.children:
+
+            if child.isShape() or child.type == 'transform' or child.type == 'joint':
+
+                copies.append( self._copyNode( child, copy, None, copies ).name )
+
+        return copy
+
+    def rename( self, oldName, newName ):
+
+        """
+        @return : str, new unique name of node
+        """
+
+        node = self._node( oldName )
+        del self._nodes[ node.name ]
+        node.name = self._uniqueName( newName )
+        self._nodes[ node.name ] = node
+
+        return node.name
+
+    # creation commands
+
+    def _makeCurve( self, name, points ):
+
+        transform = self._createNode( name, 'transform' )
+        shape = self._createNode( transform.name + 'Shape', 'nurbsCurve', transform )
+        shape.cvs = [ [ float( v ) for v in p ] for p in points ]
+
+        return transform
+
+    def circle( self, **kwargs ):
+
+        """
+        create nurbs circle
+
+        @return : list( str ), transform name, and history node when ch is on
+        """
+
+        radius = kwargs.get( 'radius', kwargs.get( 'r', 1.0 ) )
+        normal = [ float( v ) for v in kwargs.get( 'normal', kwargs.get( 'nr', [ 0, 0, 1 ] ) ) ]
+        center = kwargs.get( 'center', kwargs.get( 'c', [ 0, 0, 0 ] ) )
+
+        length = math.sqrt( sum( v * v for v in normal ) ) or 1.0
+        normal = [ v / length for v in normal ]
+        helper = [ 0.0, 0.0, 1.0 ] if abs( normal[2] ) < 0.9 else [ 1.0, 0.0, 0.0 ]
+        axisU = _normalize( _cross( helper, normal ) )
+        axisV = _cross( normal, axisU )
+
+        if normal == [ 0.0, 0.0, 1.0 ]:
+
+            axisU, axisV = [ 1.0, 0.0, 0.0 ], [ 0.0, 1.0, 0.0 ]
+
+        points = [ [ center[i] + radius * ( u * axisU[i] + v * axisV[i] ) for i in range( 3 ) ] for u, v in _circleCvs ]
+
+        transform = self._makeCurve( kwargs.get( 'n', kwargs.get( 'name', 'nurbsCircle1' ) ), points )
+
+        if kwargs.get( 'ch', kwargs.get( 'constructionHistory', True ) ):
+
+            history = self._createNode( 'makeNurbCircle1', 'makeNurbCircle' )
+
+            return [ transform.name, history.name ]
+
+        return [ transform.name ]
+
+    def curve( self, **kwargs ):
+
+        """
+        create curve from points
+
+        @return : str, name of new curve transform
+        """
+
+        points = kwargs.get( 'p', kwargs.get( 'point', [] ) )
+
+        return self._makeCurve( kwargs.get( 'n', kwargs.get( 'name', 'curve1' ) ), points ).name
+
+    def spaceLocator( self, **kwargs ):
+
+        """
+        @return : list( str ), name of new locator
+        """
+
+        transform = self._createNode( kwargs.get( 'n', kwargs.get( 'name', 'locator1' ) ), 'transform' )
+        self._createNode( transform.name + 'Shape', 'locator', transform )
+
+        return [ transform.name ]
+
+    def joint( self, **kwargs ):
+
+        """
+        create joint under selected joint at given world position, new joint gets selected
+
+        @return : str, name of new joint
+        """
+
+        parent = self._selection[0] if self._selection else None
+        jnt = self._createNode( kwargs.get( 'n', kwargs.get( 'name', 'joint1' ) ), 'joint', parent )
+
+        orient = kwargs.get( 'o', kwargs.get( 'orientation' ) )
+
+        if orient:
+
+            self._setChannels( jnt, 'jointOrient', orient )
+
+        position = kwargs.get( 'p', kwargs.get( 'position' ) )
+
+        if position:
+
+            world = matrix.withTranslation( self._worldMatrix( jnt ), position )
+            self._setWorldMatrix( jnt, world, rotate = False, scale = False )
+
+        self._selection = [ jnt ]
+
+        return jnt.name
+
+    def cluster( self, *args, **kwargs ):
+
+        """
+        create cluster deformer on given curves or curve points
+
+        @return : list( str ), cluster node and handle names
+        """
+
+        components = []
+
+        for obj in self._flatten( args ):
+
+            if '.' in obj:
+
+                node, at = self._splitPlug( obj )
+                shape, indices = self._components( node, at )
+
+            else:
+
+                shape = self._curveShape( self._node( obj ) )
+                indices = list( range( len( shape.cvs ) ) )
+
+            components.extend( ( shape, i ) for i in indices )
+
+        if not components:
+
+            raise RuntimeError( 'cluster: no deformable objects' )
+
+        name = kwargs.get( 'n', kwargs.get( 'name', 'cluster1' ) )
+        clusterNode = self._createNode( name, 'cluster' )
+        weightedNode = kwargs.get( 'wn', kwargs.get( 'weightedNode' ) )
+
+        if weightedNode:
+
+            handle = self._node( weightedNode[0] )
+
+        else:
+
+            handle = self._createNode( clusterNode.name + 'Handle', 'clusterHandle' )
+            points = [ self._cvWorld( shape, i ) for shape, i in components ]
+            centroid = [ sum( p[i] for p in points ) / len( points ) for i in range( 3 ) ]
+            handle.attrs.update( zip( compoundAttrs[ 'rotatePivot' ], centroid ) )
+
+        clusterNode.data = { 'components': components, 'handle': handle,
+                             'bindMatrix': self._worldMatrix( handle ) }
+
+        return [ clusterNode.name, handle.name ]
+
+    def ikHandle( self, *args, **kwargs ):
+
+        """
+        create ik handle from start joint to end joint, or query start joint, effector or solver of ik handle
+
+        @return : list( str ), ik handle and effector names, queried name in query mode
+        """
+
+        if kwargs.get( 'q', kwargs.get( 'query' ) ):
+
+            handle = self._node( self._flatten( args )[0] )
+
+            if handle.type != 'ikHandle':
+
+                raise RuntimeError( 'ikHandle: %s is not an ik handle' % handle.name )
+
+            for flags, key in [ ( [ 'sj', 'startJoint' ], 'startJoint' ), ( [ 'ee', 'endEffector' ], 'effector' ) ]:
+
+                if any( kwargs.get( f ) for f in flags ):
+
+                    return handle.data[ key ].name
+
+            if kwargs.get( 'sol', kwargs.get( 'solver' ) ):
+
+                return handle.data[ 'solver' ]
+
+            raise RuntimeError( 'ikHandle: unsupported query %s' % sorted( kwargs ) )
+
+        startJoint = self._node( kwargs.get( 'sj', kwargs.get( 'startJoint' ) ) )
+        endJoint = self._node( kwargs.get( 'ee', kwargs.get( 'endEffector' ) ) )
+
+        if endJoint not in self._descendants( startJoint ):
+
+            raise RuntimeError( 'ikHandle: %s is not below %s' % ( endJoint.name, startJoint.name ) )
+
+        solver = kwargs.get( 'sol', kwargs.get( 'solver', 'ikRPsolver' ) )
+        handle = self._createNode( kwargs.get( 'n', kwargs.get( 'name', 'ikHandle1' ) ), 'ikHandle' )
+        effector = self._createNode( 'effector1', 'ikEffector', endJoint.parent )
+
+        self._setChannels( handle, 'translate', matrix.translation( self._worldMatrix( endJoint ) ) )
+        self._setChannels( effector, 'translate', self._vector( endJoint, 'translate' ) )
+
+        handle.data = { 'startJoint': startJoint, 'endJoint': endJoint, 'effector': effector, 'solver': solver }
+
+        curveName = kwargs.get( 'c', kwargs.get( 'curve' ) )
+
+        if curveName:
+
+            handle.data[ 'curve' ] = self._curveShape( self._node( curveName ) )
+
+        return [ handle.name, effector.name ]
+
+    # constraint commands
+
+    def _constraint( self, constraintType, args, kwargs ):
+
+        objects = self._flatten( args )
+
+        if kwargs.get( 'q', kwargs.get( 'query' ) ):
+
+            constraintNode = self._node( objects[0] )
+
+            if constraintNode.type != constraintType:
+
+                raise RuntimeError( '%s: %s is not a %s' % ( constraintType, constraintNode.name, constraintType ) )
+
+            if kwargs.get( 'tl', kwargs.get( 'targetList' ) ):
+
+                return [ t.name for t in constraintNode.data[ 'targets' ] if t.name in self._nodes ]
+
+            raise RuntimeError( '%s: unsupported query %s' % ( constraintType, sorted( kwargs ) ) )
+
+        if len( objects ) < 2:
+
+            raise RuntimeError( '%s: need target and constrained object' % constraintType )
+
+        targets = [ self._node( obj ) for obj in objects[ :-1 ] ]
+        constrained = self._node( objects[-1] )
+
+        if constrained.type not in transformTypes:
+
+            raise RuntimeError( '%s: %s is not a transform' % ( constraintType, constrained.name ) )
+
+        name = kwargs.get( 'n', kwargs.get( 'name', '%s_%s1' % ( constrained.name, constraintType ) ) )
+        constraintNode = self._createNode( name, constraintType, constrained )
+        maintainOffset = kwargs.get( 'mo', kwargs.get( 'maintainOffset', False ) )
+
+        constraintNode.data = { 'targets': targets, 'constrained': constrained, 'maintainOffset': bool( maintainOffset ) }
+
+        if not maintainOffset and constraintType != 'poleVectorConstraint':
+
+            self._applyConstraint( constraintType, targets, constrained )
+
+        return [ constraintNode.name ]
+
+    def _applyConstraint( self, constraintType, targets, constrained ):
+
+        count = float( len( targets ) )
+
+        if constraintType in [ 'pointConstraint', 'parentConstraint' ]:
+
+            pivots = [ self._worldPivot( t ) for t in targets ]
+            position = [ sum( p[i] for p in pivots ) / count for i in range( 3 ) ]
+            local = matrix.transformPoint( position, matrix.inverse( self._parentMatrix( constrained ) ) )
+            pivot = self._vector( constrained, 'rotatePivot' )
+            self._setChannels( constrained, 'translate', [ l - p for l, p in zip( local, pivot ) ] )
+
+        if constraintType in [ 'orientConstraint', 'parentConstraint' ]:
+
+            _, rotate, _ = matrix.decompose( self._worldMatrix( targets[0] ) )
+            _, _, scale = matrix.decompose( self._worldMatrix( constrained ) )
+            world = matrix.compose( rotate = rotate, scale = scale )
+            world = matrix.withTranslation( world, matrix.translation( self._worldMatrix( constrained ) ) )
+            self._setWorldMatrix( constrained, world, translate = False, scale = False )
+
+        if constraintType == 'scaleConstraint':
+
+            _, _, targetScale = matrix.decompose( self._worldMatrix( targets[0] ) )
+            _, _, parentScale = matrix.decompose( self._parentMatrix( constrained ) )
+            self._setChannels( constrained, 'scale', [ t / p for t, p in zip( targetScale, parentScale ) ] )
+
+    def pointConstraint( self, *args, **kwargs ):
+
+        return self._constraint( 'pointConstraint', args, kwargs )
+
+    def orientConstraint( self, *args, **kwargs ):
+
+        return self._constraint( 'orientConstraint', args, kwargs )
+
+    def parentConstraint( self, *args, **kwargs ):
+
+        return self._constraint( 'parentConstraint', args, kwargs )
+
+    def scaleConstraint( self, *args, **kwargs ):
+
+        return self._constraint( 'scaleConstraint', args, kwargs )
+
+    def poleVectorConstraint( self, *args, **kwargs ):
+
+        return self._constraint( 'poleVectorConstraint', args, kwargs )
+
+    # attribute commands
+
+    def addAttr( self, *args, **kwargs ):
+
+        """
+        add custom attribute to node
+        """
+
+        node = self._node( self._flatten( args )[0] )
+        at = kwargs.get( 'ln', kwargs.get( 'longName' ) )
+
+        if at in node.attrs:
+
+            raise RuntimeError( 'Found attribute %s already on %s' % ( at, node.name ) )
+
+        dataType = kwargs.get( 'dt', kwargs.get( 'dataType' ) )
+        attrType = dataType or kwargs.get( 'at', kwargs.get( 'attributeType', 'double' ) )
+
+        node.attrs[ at ] = None if dataType else kwargs.get( 'dv', kwargs.get( 'defaultValue', 0 ) )
+        node.attrTypes[ at ] = attrType
+        node.userAttrs.append( at )
+
+        if attrType == 'enum':
+
+            node.data.setdefault( 'enumNames', {} )[ at ] = kwargs.get( 'enumName', kwargs.get( 'en', '' ) )
+
+        if kwargs.get( 'k', kwargs.get( 'keyable' ) ):
+
+            node.keyable.add( at )
+
+    def setAttr( self, plug, *values, **kwargs ):
+
+        """
+        set attribute value and flags
+        """
+
+        node, at = self._splitPlug( plug )
+        components = self._components( node, at )
+
+        if components:
+
+            shape, indices = components
+            flatValues = []
+
+            for value in values:
+
+                flatValues.extend( float( v ) for v in ( value if isinstance( value, ( list, tuple ) ) else [ value ] ) )
+
+            for n, i in enumerate( indices ):
+
+                shape.cvs[ i ] = flatValues[ n * 3:n * 3 + 3 ]
+
+            return
+
+        longName = self._longName( node, at )
+        attrNames = self._attrNames( node, longName )
+
+        if values:
+
+            if len( values ) == 1 and isinstance( values[0], ( list, tuple ) ) and len( attrNames ) > 1:
+
+                values = values[0]
+
+            if len( values ) != len( attrNames ):
+
+                raise RuntimeError( 'setAttr: wrong number of values for %s' % plug )
+
+            for a, value in zip( attrNames, values ):
+
+                if a in node.locked or a in node.inputs:
+
+                    raise RuntimeError( 'setAttr: The attribute %s.%s is locked or connected and cannot be modified' % ( node.name, a ) )
+
+                node.attrs[ a ] = value
+
+            self._changed( node )
+
+        for flags, attrSet in [ ( ( 'l', 'lock' ), node.locked ), ( ( 'k', 'keyable' ), node.keyable ),
+                                ( ( 'cb', 'channelBox' ), node.channelBox ) ]:
+
+            flag = kwargs.get( flags[0], kwargs.get( flags[1] ) )
+
+            if flag is None:
+
+                continue
+
+            for a in attrNames:
+
+                if flag:
+
+                    attrSet.add( a )
+
+                else:
+
+                    attrSet.discard( a )
+
+    def getAttr( self, plug, **kwargs ):
+
+        """
+        @return : attribute value, or flag state when l, k or cb flag is given
+        """
+
+        node, at = self._splitPlug( plug )
+        components = self._components( node, at )
+
+        if components:
+
+            shape, indices = components
+
+            return [ tuple( shape.cvs[i] ) for i in indices ]
+
+        longName = self._longName( node, at )
+
+        for flags, attrSet in [ ( ( 'l', 'lock' ), node.locked ), ( ( 'k', 'keyable' ), node.keyable ),
+                                ( ( 'cb', 'channelBox' ), node.channelBox ) ]:
+
+            if kwargs.get( flags[0], kwargs.get( flags[1] ) ):
+
+                return all( a in attrSet for a in self._attrNames( node, longName ) )
+
+        value = self._value( node, longName )
+
+        if longName in compoundAttrs:
+
+            return [ value ]
+
+        return value
+
+    def listAttr( self, *args, **kwargs ):
+
+        """
+        list attributes of node, only user defined, keyable, channel box or locked ones when ud, k, cb or l flag is given
+
+        @return : list( str ) or None when no attribute matches
+        """
+
+        node = self._node( self._flatten( args )[0] )
+        result = list( node.userAttrs ) if kwargs.get( 'ud', kwargs.get( 'userDefined' ) ) else list( node.attrs )
+
+        for flags, attrSet in [ ( ( 'l', 'locked' ), node.locked ), ( ( 'k', 'keyable' ), node.keyable ),
+                                ( ( 'cb', 'channelBox' ), node.channelBox ) ]:
+
+            if kwargs.get( flags[0], kwargs.get( flags[1] ) ):
+
+                result = [ a for a in result if a in attrSet ]
+
+        return result or None
+
+    def connectAttr( self, source, destination, **kwargs ):
+
+        """
+        connect source plug to destination plug
+        """
+
+        srcNode, srcAt = self._splitPlug( source )
+        dstNode, dstAt = self._splitPlug( destination )
+        srcAt = self._longName( srcNode, srcAt )
+        dstAt = self._longName( dstNode, dstAt )
+
+        if dstAt in dstNode.locked:
+
+            raise RuntimeError( 'connectAttr: %s is locked' % destination )
+
+        if dstAt in dstNode.inputs and not kwargs.get( 'f', kwargs.get( 'force' ) ):
+
+            raise RuntimeError( 'connectAttr: %s is already connected' % destination )
+
+        dstNode.inputs[ dstAt ] = ( srcNode, srcAt )
+        self._drivers.add( srcNode )
+        self._changed( dstNode )
+
+    def listConnections( self, *args, **kwargs ):
+
+        """
+        list connected nodes or plugs, with c flag each one follows the plug of the listed node it is connected to
+
+        @return : list( str ) or None when nothing is connected
+        """
+
+        result = []
+        source = kwargs.get( 's', kwargs.get( 'source', True ) )
+        destination = kwargs.get( 'd', kwargs.get( 'destination', True ) )
+        plugs = kwargs.get( 'p', kwargs.get( 'plugs', False ) )
+        pairs = kwargs.get( 'c', kwargs.get( 'connections', False ) )
+
+        for obj in self._flatten( args ):
+
+            nodeName, _, at = obj.partition( '.' )
+            node = self._node( nodeName )
+            at = self._longName( node, at ) if at else None
+
+            if source:
+
+                for dstAt, ( srcNode, srcAt ) in node.inputs.items():
+
+                    if at is None or dstAt == at:
+
+                        if pairs:
+
+                            result.append( '%s.%s' % ( node.name, dstAt ) )
+
+                        result.append( '%s.%s' % ( srcNode.name, srcAt ) if plugs else srcNode.name )
+
+            if destination:
+
+                for other in self._nodes.values():
+
+                    for dstAt, ( srcNode, srcAt ) in other.inputs.items():
+
+                        if srcNode is node and ( at is None or srcAt == at ):
+
+                            if pairs:
+
+                                result.append( '%s.%s' % ( node.name, srcAt ) )
+
+                            result.append( '%s.%s' % ( other.name, dstAt ) if plugs else other.name )
+
+        return result or None
+
+    # transform commands
+
+    def xform( self, *args, **kwargs ):
+
+        """
+        query or set transform values, supports t, ro, s, m and rp flags in object or world space
+        and curve point positions
+
+        @return : list( float ) on query
+        """
+
+        objects = self._flatten( args )
+        worldSpace = kwargs.get( 'ws', kwargs.get( 'worldSpace', False ) )
+        query = kwargs.get( 'q', kwargs.get( 'query', False ) )
+        relative = kwargs.get( 'r', kwargs.get( 'relative', False ) )
+
+        translate = kwargs.get( 't', kwargs.get( 'translation' ) )
+        rotate = kwargs.get( 'ro', kwargs.get( 'rotation' ) )
+        scale = kwargs.get( 's', kwargs.get( 'scale' ) )
+        worldMatrix = kwargs.get( 'm', kwargs.get( 'matrix' ) )
+        pivot = kwargs.get( 'rp', kwargs.get( 'rotatePivot' ) )
+
+        if query:
+
+            result = []
+
+            for obj in objects:
+
+                result.extend( self._queryTransform( obj, worldSpace, translate, rotate, scale, worldMatrix, pivot ) )
+
+            return result
+
+        for obj in objects:
+
+            if '.' in obj:
+
+                node, at = self._splitPlug( obj )
+                shape, indices = self._components( node, at )
+
+                for i in indices:
+
+                    point = [ float( v ) for v in translate ]
+
+                    if relative:
+
+                        point = [ p + c for p, c in zip( point, shape.cvs[i] ) ]
+
+                    elif worldSpace:
+
+                        point = matrix.transformPoint( point, matrix.inverse( self._worldMatrix( shape ) ) )
+
+                    shape.cvs[ i ] = point
+
+                continue
+
+            node = self._node( obj )
+
+            if worldMatrix:
+
+                m = [ float( v ) for v in worldMatrix ]
+
+                if worldSpace:
+
+                    self._setWorldMatrix( node, m )
+
+                else:
+
+                    self._setLocalMatrix( node, m )
+
+            if rotate:
+
+                if worldSpace:
+
+                    world = matrix.compose( rotate = rotate, scale = matrix.decompose( self._worldMatrix( node ) )[2] )
+                    self._setWorldMatrix( node, world, translate = False, scale = False )
+
+                else:
+
+                    self._setChannels( node, 'rotate', rotate )
+
+            if scale:
+
+                self._setChannels( node, 'scale', scale )
+
+            if pivot:
+
+                node.attrs.update( zip( compoundAttrs[ 'rotatePivot' ], [ float( v ) for v in pivot ] ) )
+                self._changed( node )
+
+            if translate:
+
+                if relative:
+
+                    translate = [ t + c for t, c in zip( translate, self._vector( node, 'translate' ) ) ]
+
+                if worldSpace:
+
+                    world = matrix.withTranslation( self._worldMatrix( node ), translate )
+                    self._setWorldMatrix( node, world, rotate = False, scale = False )
+
+                else:
+
+                    self._setChannels( node, 'translate', translate )
+
+    def _queryTransform( self, obj, worldSpace, translate, rotate, scale, worldMatrix, pivot ):
+
+        if '.' in obj:
+
+            node, at = self._splitPlug( obj )
+            shape, indices = self._components( node, at )
+            shapeMatrix = self._worldMatrix( shape )
+            result = []
+
+            for i in indices:
+
+                point = shape.cvs[i]
+                result.extend( matrix.transformPoint( point, shapeMatrix ) if worldSpace else point )
+
+            return result
+
+        node = self._node( obj )
+        m = self._worldMatrix( node ) if worldSpace else self._localMatrix( node )
+
+        if worldMatrix:
+
+            return m
+
+        if pivot:
+
+            if worldSpace:
+
+                return self._worldPivot( node )
+
+            return self._vector( node, 'rotatePivot' )
+
+        if translate:
+
+            if worldSpace:
+
+                return matrix.translation( m )
+
+            return self._vector( node, 'translate' )
+
+        if rotate:
+
+            if worldSpace:
+
+                return matrix.decompose( m )[1]
+
+            return self._vector( node, 'rotate' )
+
+        if scale:
+
+            if worldSpace:
+
+                return matrix.decompose( m )[2]
+
+            return self._vector( node, 'scale' )
+
+        return []
+
+    def move( self, *args, **kwargs ):
+
+        """
+        move objects by given values, relative moves are done in world space
+        """
+
+        values = [ float( a ) for a in args if isinstance( a, ( int, float ) ) ]
+        objects = self._flatten( [ a for a in args if not isinstance( a, ( int, float ) ) ] )
+        axes = [ axis for axis, flag in enumerate( [ 'moveX', 'moveY', 'moveZ' ] ) if kwargs.get( flag ) ]
+
+        if not axes:
+
+            axes = [ 0, 1, 2 ]
+
+        relative = kwargs.get( 'r', kwargs.get( 'relative', False ) )
+
+        for obj in objects:
+
+            node = self._node( obj )
+            world = self._worldMatrix( node )
+            position = matrix.translation( world )
+
+            for axis, value in zip( axes, values ):
+
+                position[ axis ] = position[ axis ] + value if relative else value
+
+            self._setWorldMatrix( node, matrix.withTranslation( world, position ), rotate = False, scale = False )
+
+    # history
+
+    def _cvWorld( self, shape, index ):
+
+        return matrix.transformPoint( shape.cvs[ index ], self._worldMatrix( shape ) )
+
+    def _bakeHistory( self, node ):
+
+        shapes = [ node ] if node.isShape() else self._shapes( node )
+        clusters = [ n for n in list( self._nodes.values() ) if n.type == 'cluster' ]
+
+        for clusterNode in clusters:
+
+            components = [ ( s, i ) for s, i in clusterNode.data[ 'components' ] if s in shapes ]
+
+            if not components:
+
+                continue
+
+            handle = clusterNode.data[ 'handle' ]
+            deformMatrix = matrix.multiply( matrix.inverse( clusterNode.data[ 'bindMatrix' ] ), self._worldMatrix( handle ) )
+
+            for shape, i in components:
+
+                shapeMatrix = self._worldMatrix( shape )
+                world = matrix.transformPoint( matrix.transformPoint( shape.cvs[i], shapeMatrix ), deformMatrix )
+                shape.cvs[ i ] = matrix.transformPoint( world, matrix.inverse( shapeMatrix ) )
+
+            remaining = [ c for c in clusterNode.data[ 'components' ] if c[0] not in shapes ]
+
+            if not remaining:
+
+                self._removeNode( clusterNode )
+
+                if handle.type == 'clusterHandle' and handle.name in self._nodes:
+
+                    self._removeNode( handle )
+
+            else:
+
+                clusterNode.data[ 'components' ] = remaining
+
+    # scene files
+
+    def file( self, *args, **kwargs ):
+
+        """
+        open, save, rename and query scene files, scenes are saved as JSON
+        whatever file type is asked for
+
+        @return : str, scene name for queries and when opening or saving
+        """
+
+        if kwargs.get( 'q', kwargs.get( 'query' ) ):
+
+            if kwargs.get( 'sn', kwargs.get( 'sceneName' ) ):
+
+                return self._sceneName
+
+            raise RuntimeError( 'file: unsupported query %s' % sorted( kwargs ) )
+
+        if kwargs.get( 'new' ):
+
+            self._nodes = {}
+            self._selection = []
+            self._sceneName = ''
+            self._worldMatrices = {}
+            self._drivers = set()
+
+            return ''
+
+        if kwargs.get( 'rename', kwargs.get( 'rn' ) ):
+
+            self._sceneName = kwargs.get( 'rename', kwargs.get( 'rn' ) )
+
+            return self._sceneName
+
+        if kwargs.get( 'o', kwargs.get( 'open' ) ):
+
+            self._load( args[0] )
+            self._sceneName = args[0]
+
+            return self._sceneName
+
+        if kwargs.get( 's', kwargs.get( 'save' ) ):
+
+            if not self._sceneName:
+
+                raise RuntimeError( 'file: scene has no name, rename it before saving' )
+
+            self._save( self._sceneName )
+
+            return self._sceneName
+
+        raise RuntimeError( 'file: unsupported flags %s' % sorted( kwargs ) )
+
+    def _save( self, scenePath ):
+
+        nodes = []
+
+        for node in self._nodes.values():
+
+            nodes.append( {
+                        'name': node.name,
+                        'type': node.type,
+                        'parent': node.parent.name if node.parent else None,
+                        'children': [ c.name for c in node.children ],
+                        'attrs': node.attrs,
+                        'attrTypes': node.attrTypes,
+                        'userAttrs': node.userAttrs,
+                        'locked': sorted( node.locked ),
+                        'keyable': sorted( node.keyable ),
+                        'channelBox': sorted( node.channelBox ),
+                        'inputs': dict( ( at, [ src.name, srcAt ] ) for at, ( src, srcAt ) in node.inputs.items() ),
+                        'cvs': node.cvs,
+                        'data': _encode( node.data )
+                        } )
+
+        sceneDir = os.path.dirname( os.path.abspath( scenePath ) )
+
+        if not os.path.isdir( sceneDir ):
+
+            os.makedirs( sceneDir )
+
+        with open( scenePath, 'w' ) as sceneFile:
+
+            json.dump( { 'nodes': nodes }, sceneFile )
+
+    def _load( self, scenePath ):
+
+        if not os.path.isfile( scenePath ):
+
+            raise RuntimeError( 'file: scene not found : %s' % scenePath )
+
+        with open( scenePath ) as sceneFile:
+
+            nodeEntries = json.load( sceneFile )[ 'nodes' ]
+
+        self._nodes = {}
+        self._selection = []
+        self._worldMatrices = {}
+        self._drivers = set()
+
+        for entry in nodeEntries:
+
+            node = Node( entry[ 'name' ], entry[ 'type' ] )
+            node.attrs = entry[ 'attrs' ]
+            node.attrTypes = entry[ 'attrTypes' ]
+            node.userAttrs = entry[ 'userAttrs' ]
+            node.locked = set( entry[ 'locked' ] )
+            node.keyable = set( entry[ 'keyable' ] )
+            node.channelBox = set( entry[ 'channelBox' ] )
+            node.cvs = [ list( cv ) for cv in entry[ 'cvs' ] ] if entry[ 'cvs' ] is not None else None
+            self._nodes[ node.name ] = node
+
+        for entry in nodeEntries:
+
+            node = self._nodes[ entry[ 'name' ] ]
+            node.parent = self._nodes[ entry[ 'parent' ] ] if entry[ 'parent' ] else None
+            node.children = [ self._nodes[ c ] for c in entry[ 'children' ] ]
+            node.inputs = dict( ( at, ( self._nodes[ src ], srcAt ) ) for at, ( src, srcAt ) in entry[ 'inputs' ].items() )
+            self._drivers.update( src for src, _ in node.inputs.values() )
+            node.data = _decode( entry[ 'data' ], self._nodes )
+
+def _encode( value ):
+
+    # node references in node data as { "node": name }
+
+    if isinstance( value, Node ):
+
+        return { 'node': value.name }
+
+    if isinstance( value, dict ):
+
+        return dict( ( k, _encode( v ) ) for k, v in value.items() )
+
+    if isinstance( value, ( list, tuple ) ):
+
+        return [ _encode( v ) for v in value ]
+
+    return value
+
+def _decode( value, nodes ):
+
+    if isinstance( value, dict ):
+
+        if list( value.keys() ) == [ 'node' ]:
+
+            return nodes[ value[ 'node' ] ]
+
+        return dict( ( k, _decode( v, nodes ) ) for k, v in value.items() )
+
+    if isinstance( value, list ):
+
+        return [ _decode( v, nodes ) for v in value ]
+
+    return value
+
+def _cross( a, b ):
+
+    return [ a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0] ]
+
+def _normalize( v ):
+
+    length = math.sqrt( sum( c * c for c in v ) ) or 1.0
+
+    return [ c / length for c in v ]
@@ -0,0 +1,438 @@
+"""
+profiler @ backend
+opt-in build profiler counting backend calls per command inside module builds and controls
+
+functions decorated with profiled ( module builds, Base and Control
+construction ) open a frame of the active profile, frames record wall
+time, backend calls by command name and number of nodes created, counted
+from the node names returned by create commands, so profiling never
+queries the scene :
+
+    with profiler.profiling( 'hero' ) as profile:
+
+        characterName.Build( 'hero' )
+
+    print( profile.tree() )
+    profile.save( 'hero_profile.json' )
+
+calls are counted as issued to the scene, after command batching, so
+setAttr calls queued inside a control are counted in the frame flushing
+them. Decorated functions only check a module global when not profiling
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import time
+
+from . import getBackend
+from . import useBackend
+
+# commands creating nodes, with the created node names in their results
+
+createCommands = [ 'aimConstraint', 'circle', 'cluster', 'createNode', 'curve', 'duplicate', 'group', 'ikHandle',
+                   'joint', 'orientConstraint', 'parentConstraint', 'pointConstraint', 'poleVectorConstraint',
+                   'scaleConstraint', 'spaceLocator' ]
+
+_queryFlags = [ 'q', 'query', 'e', 'edit' ]
+
+_active = []
+
+class Frame():
+
+    """
+    class holding measures of one profiled call
+    """
+
+    def __init__( self, name ):
+
+        """
+        @param name : str, name of frame
+        @return : None
+        """
+
+        self.name = name
+        self.children = []
+        self.calls = collections.Counter()
+        self.time = 0.0
+        self.nodes = 0
+
+        self._startTime = 0.0
+
+    def selfTime( self ):
+
+        """
+        @return : float, seconds spent in frame outside of its child frames
+        """
+
+        return self.time - sum( c.time for c in self.children )
+
+    def totalCalls( self ):
+
+        """
+        @return : collections.Counter, calls by command name of frame and its child frames
+        """
+
+        result = collections.Counter( self.calls )
+
+        for child in self.children:
+
+            result.update( child.totalCalls() )
+
+        return result
+
+    def walk( self, depth = 0 ):
+
+        """
+        @return : generator of tuple( Frame, int ), frame and its descendants with their depth
+        """
+
+        yield self, depth
+
+        for child in self.children:
+
+            for item in child.walk( depth + 1 ):
+
+                yield item
+
+    def toDict( self ):
+
+        """
+        @return : dict, frame and its children as JSON compatible dictionary
+        """
+
+        totalCalls = self.totalCalls()
+
+        return {
+            'name': self.name,
+            'time': self.time,
+            'selfTime': self.selfTime(),
+            'nodes': self.nodes,
+            'calls': dict( self.calls ),
+            'totalCalls': sum( totalCalls.values() ),
+            'children': [ c.toDict() for c in self.children ]
+            }
+
+class Profile():
+
+    """
+    class collecting frames of one profiling session
+    """
+
+    def __init__( self, name ):
+
+        """
+        @param name : str, name of root frame
+        @return : None
+        """
+
+        self.root = Frame( name )
+        self._stack = [ self.root ]
+
+        self._startFrame( self.root )
+
+    def count( self, commandName ):
+
+        """
+        count call of command in current frame
+        """
+
+        self._stack[-1].calls[ commandName ] += 1
+
+    def created( self, count ):
+
+        """
+        count nodes created in current frame
+        """
+
+        self._stack[-1].nodes += count
+
+    def push( self, name ):
+
+        """
+        open child frame of current frame
+
+        @param name : str, name of frame
+        @return : Frame, new current frame
+        """
+
+        frame = Frame( name )
+        self._stack[-1].children.append( frame )
+        self._stack.append( frame )
+        self._startFrame( frame )
+
+        return frame
+
+    def pop( self ):
+
+        """
+        close current frame
+
+        @return : Frame, closed frame
+        """
+
+        frame = self._stack.pop()
+        self._endFrame( frame )
+
+        # nodes of child frames count in their parent
+
+        self._stack[-1].nodes += frame.nodes
+
+        return frame
+
+    def stop( self ):
+
+        """
+        close all open frames
+        """
+
+        while len( self._stack ) > 1:
+
+            self.pop()
+
+        self._endFrame( self.root )
+
+    def histogram( self ):
+
+        """
+        @return : list( tuple( str, int ) ), total calls by command name, most called first
+        """
+
+        return self.root.totalCalls().most_common()
+
+    def byName( self ):
+
+        """
+        measures summed over frames of same function, like all controls
+
+        @return : dict, { function name: { 'count', 'time', 'selfTime', 'nodes', 'calls' } }
+        """
+
+        result = {}
+
+        for frame, depth in self.root.walk():
+
+            if frame is self.root:
+
+                continue
+
+            key = frame.name.split( ' ' )[0]
+            entry = result.setdefault( key, { 'count': 0, 'time': 0.0, 'selfTime': 0.0, 'nodes': 0, 'calls': 0 } )
+            entry[ 'count' ] += 1
+            entry[ 'time' ] += frame.time
+            entry[ 'selfTime' ] += frame.selfTime()
+            entry[ 'nodes' ] += frame.nodes
+            entry[ 'calls' ] += sum( frame.calls.values() )
+
+        return result
+
+    def tree( self, minTime = 0.0, topCommands = 3 ):
+
+        """
+        @param minTime : float, frames faster than this number of seconds are left out
+        @param topCommands : int, number of most called commands listed per frame
+        @return : str, indented report of frames
+        """
+
+        lines = [ '%10s %10s %7s %6s  %s' % ( 'time ms', 'self ms', 'calls', 'nodes', 'frame' ) ]
+
+        for frame, depth in self.root.walk():
+
+            if frame.time < minTime and frame is not self.root:
+
+                continue
+
+            totalCalls = frame.totalCalls()
+            commands = ', '.join( '%s %d' % item for item in totalCalls.most_common( topCommands ) )
+
+            lines.append( '%10.2f %10.2f %7d %6d  %s%s  [%s]' % ( frame.time * 1000.0, frame.selfTime() * 1000.0,
+                                                                 sum( totalCalls.values() ), frame.nodes,
+                                                                 '  ' * depth, frame.name, commands ) )
+
+        lines.append( '' )
+        lines.append( 'calls by command : ' + ', '.join( '%s %d' % item for item in self.histogram() ) )
+
+        return '\n'.join( lines )
+
+    def toDict( self ):
+
+        """
+        @return : dict, JSON compatible profile with frame tree, call histogram and sums by function
+        """
+
+        return { 'root': self.root.toDict(), 'histogram': dict( self.histogram() ), 'byName': self.byName() }
+
+    def save( self, path ):
+
+        """
+        write profile as JSON
+
+        @param path : str, path of JSON file
+        @return : None
+        """
+
+        with open( path, 'w' ) as profileFile:
+
+            json.dump( self.toDict(), profileFile, indent = 2, sort_keys = True )
+
+    def _startFrame( self, frame ):
+
+        frame._startTime = time.time()
+
+    def _endFrame( self, frame ):
+
+        frame.time = time.time() - frame._startTime
+
+class ProfilingBackend():
+
+    """
+    class counting commands in active profile and forwarding them to wrapped backend
+    """
+
+    def __init__( self, backend, profile ):
+
+        """
+        @param backend : backend to issue commands to
+        @param profile : Profile, profile counting calls
+        @return : None
+        """
+
+        self.backend = backend
+        self.profile = profile
+
+    def __getattr__( self, commandName ):
+
+        if commandName.startswith( '_' ):
+
+            raise AttributeError( commandName )
+
+        command = getattr( self.backend, commandName )
+
+        def counted( *args, **kwargs ):
+
+            self.profile.count( commandName )
+
+            result = command( *args, **kwargs )
+
+            if commandName in createCommands and not any( kwargs.get( f ) for f in _queryFlags ):
+
+                self.profile.created( _nodeCount( result ) )
+
+            return result
+
+        return counted
+
+@contextlib.contextmanager
+def profiling( name = 'build' ):
+
+    """
+    profile calls made inside the with block, should be started outside of module builds
+    so calls are counted after batching, nested blocks open a frame of outer profile
+
+    @param name : str, name of root frame
+    @return : Profile active inside the with block
+    """
+
+    if _active:
+
+        _active[0].push( name )
+
+        try:
+
+            yield _active[0]
+
+        finally:
+
+            _active[0].pop()
+
+        return
+
+    activeBackend = getBackend()
+    profile = Profile( name )
+    _active.append( profile )
+
+    try:
+
+        with useBackend( ProfilingBackend( activeBackend, profile ) ):
+
+            yield profile
+
+    finally:
+
+        _active.remove( profile )
+        profile.stop()
+
+def _nodeCount( result ):
+
+    if isinstance( result, str ):
+
+        return 1
+
+    return len( result or [] )
+
+def profiled( function ):
+
+    """
+    decorator opening a profile frame named after function and its prefix argument while profiling
+
+    @param function : function, module build function or class __init__
+    @return : function, wrapped function
+    """
+
+    names = callNames( function )
+
+    @functools.wraps( function )
+    def wrapper( *args, **kwargs ):
+
+        if not _active:
+
+            return function( *args, **kwargs )
+
+        functionName, label = names( args, kwargs )
+
+        _active[0].push( '%s %s' % ( functionName, label ) if label else functionName )
+
+        try:
+
+            return function( *args, **kwargs )
+
+        finally:
+
+            _active[0].pop()
+
+    return wrapper
+
+def callNames( function ):
+
+    """
+    @param function : function, module build function or class __init__
+    @return : function, called with positional and keyword arguments of a call, returning function name
+              like arm.Build and prefix or characterName argument of the call, None when it has neither
+    """
+
+    functionName = function.__qualname__.replace( '.__init__', '' )
+
+    if '.' not in functionName:
+
+        functionName = function.__module__.split( '.' )[-1] + '.' + functionName
+
+    # argument names of innermost wrapped function, without importing inspect
+
+    code = function
+
+    while hasattr( code, '__wrapped__' ):
+
+        code = code.__wrapped__
+
+    code = code.__code__
+    argNames = code.co_varnames[ :code.co_argcount ]
+
+    def names( args, kwargs ):
+
+        arguments = dict( zip( argNames, args ) )
+        arguments.update( kwargs )
+
+        return functionName, arguments.get( 'prefix', arguments.get( 'characterName' ) )
+
+    return names
@@ -0,0 +1,465 @@
+"""
+telemetry @ backend
+build telemetry streamed as JSON lines to a file or a socket
+
+functions decorated with reported ( characterName builds, module builds
+and mirror replays ) open a span while a sink is set. When the outermost
+span ends one JSON record per span is written to the sink, inner spans
+first, with wall time, status and error, counts of nodes, joints,
+controls, constraints and IK handles below the rig or module top group.
+Records of the outermost span also hold peak memory of the process, the
+time of each module and the names of failed spans :
+
+    with telemetry.streaming( telemetry.Sink( '/var/log/rigBuilds.jsonl' ) ):
+
+        characterName.Build( 'hero' )
+
+set environment variable RIGLIB_TELEMETRY to a file path, or to an
+address like tcp://dashboard:5170 or udp://dashboard:5170, to stream
+records of all builds, like farm jobs. Errors collecting or writing
+records, like annotated values JSON can not hold or a failing custom sink,
+drop the records and never fail a build nor replace its error, decorated
+functions only check a module global and the environment when no sink is set
+"""
+
+import binascii
+import contextlib
+import functools
+import json
+import os
+import re
+import sys
+import time
+
+from . import cmds as mc
+from . import profiler
+
+try:
+
+    import resource
+
+except ImportError:
+
+    # no resource module on windows, peak memory is not reported
+
+    resource = None
+
+_state = { 'sink': None, 'muted': 0 }
+_spans = []
+_environmentSinks = {}
+
+_controlRe = re.compile( r'_CTRL\d*$' )
+
+class Sink():
+
+    """
+    class writing records as JSON lines to a file, or to a TCP or UDP socket
+    """
+
+    def __init__( self, target ):
+
+        """
+        @param target : str, file path, or address like tcp://host:port or udp://host:port
+        @return : None
+        """
+
+        self.target = target
+        self.dropped = 0
+        self._socket = None
+        self._address = None
+
+        scheme, _, address = target.partition( '://' )
+
+        if scheme in [ 'tcp', 'udp' ]:
+
+            host, _, port = address.rpartition( ':' )
+            self._address = ( host, int( port ) )
+
+        self._scheme = scheme if self._address else 'file'
+
+    def write( self, records ):
+
+        """
+        write records, dropped when the target can not be written
+
+        @param records : list( dict ), JSON compatible records
+        @return : None
+        """
+
+        # socket is imported on first write, so importing rig modules stays cheap
+
+        import socket
+
+        try:
+
+            data = ''.join( json.dumps( r, sort_keys = True ) + '\n' for r in records )
+
+        except ( TypeError, ValueError ):
+
+            # annotated values JSON can not hold
+
+            self.dropped += len( records )
+
+            return
+
+        try:
+
+            if self._scheme == 'file':
+
+                # one append per build, lines of processes sharing the file do not interleave
+
+                with open( self.target, 'a' ) as logFile:
+
+                    logFile.write( data )
+
+            elif self._scheme == 'udp':
+
+                udpSocket = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+
+                try:
+
+                    for line in data.splitlines( True ):
+
+                        udpSocket.sendto( line.encode( 'utf-8' ), self._address )
+
+                finally:
+
+                    udpSocket.close()
+
+            else:
+
+                if self._socket is None:
+
+                    self._socket = socket.create_connection( self._address, timeout = 5.0 )
+
+                self._socket.sendall( data.encode( 'utf-8' ) )
+
+        except ( IOError, OSError ):
+
+            self.dropped += len( records )
+            self.close()
+
+    def close( self ):
+
+        """
+        close socket, opened again on next write
+
+        @return : None
+        """
+
+        if self._socket is not None:
+
+            try:
+
+                self._socket.close()
+
+            except ( IOError, OSError ):
+
+                pass
+
+            self._socket = None
+
+class Span():
+
+    """
+    class holding measures of one reported call
+    """
+
+    def __init__( self, name, label = None ):
+
+        """
+        @param name : str, function name, like arm.Build
+        @param label : str, prefix or character name of the call
+        @return : None
+        """
+
+        self.id = binascii.hexlify( os.urandom( 16 ) ).decode( 'ascii' )
+        self.name = name
+        self.label = label
+        self.children = []
+        self.fields = {}
+        self.start = time.time()
+        self.duration = 0.0
+        self.status = 'ok'
+        self.error = None
+        self.topGrp = None
+
+    def walk( self, parent = None ):
+
+        """
+        @return : generator of tuple( Span, Span ), descendant spans with their parent, then span itself
+        """
+
+        for child in self.children:
+
+            for item in child.walk( self ):
+
+                yield item
+
+        yield self, parent
+
+def activeSink():
+
+    """
+    @return : Sink, sink set by streaming() or by environment variable RIGLIB_TELEMETRY, None when neither is set
+    """
+
+    if _state[ 'sink' ] is not None:
+
+        return _state[ 'sink' ]
+
+    target = os.environ.get( 'RIGLIB_TELEMETRY' )
+
+    if not target:
+
+        return None
+
+    if target not in _environmentSinks:
+
+        _environmentSinks[ target ] = Sink( target )
+
+    return _environmentSinks[ target ]
+
+@contextlib.contextmanager
+def streaming( sink ):
+
+    """
+    report builds made inside the with block to sink
+
+    @param sink : Sink, or any object with a write( records ) method
+    @return : given sink, active inside the with block
+    """
+
+    previousSink = _state[ 'sink' ]
+    _state[ 'sink' ] = sink
+
+    try:
+
+        yield sink
+
+    finally:
+
+        _state[ 'sink' ] = previousSink
+
+@contextlib.contextmanager
+def muted():
+
+    """
+    report no spans inside the with block, like builds planned in sandbox scenes
+
+    @return : None
+    """
+
+    _state[ 'muted' ] += 1
+
+    try:
+
+        yield
+
+    finally:
+
+        _state[ 'muted' ] -= 1
+
+@contextlib.contextmanager
+def span( name, label = None ):
+
+    """
+    report code inside the with block as a span, records are written when the outermost span ends
+
+    @param name : str, span name, like cache.build
+    @param label : str, module prefix or character name, the top group of its nodes is counted
+    @return : Span, active inside the with block, None when not reporting
+    """
+
+    sink = None if _spans else activeSink()
+
+    if _state[ 'muted' ] or ( not _spans and sink is None ):
+
+        yield None
+        return
+
+    current = Span( name, label )
+
+    if _spans:
+
+        _spans[-1].children.append( current )
+
+    _spans.append( current )
+
+    try:
+
+        yield current
+
+    except BaseException as e:
+
+        current.status = 'failed'
+        current.error = '%s: %s' % ( type( e ).__name__, e )
+        raise
+
+    finally:
+
+        _spans.pop()
+        _endSpan( current )
+
+        if not _spans:
+
+            _report( sink, current )
+
+def annotate( **fields ):
+
+    """
+    add fields to record of current span, like cache = 'hit'
+
+    @param fields : JSON compatible values by field name
+    @return : None
+    """
+
+    if _spans:
+
+        _spans[-1].fields.update( fields )
+
+def reported( function ):
+
+    """
+    decorator reporting calls as spans named after function and its prefix or characterName argument
+
+    @param function : function, character or module build function
+    @return : function, wrapped function
+    """
+
+    names = profiler.callNames( function )
+
+    @functools.wraps( function )
+    def wrapper( *args, **kwargs ):
+
+        if not _spans and ( _state[ 'muted' ] or activeSink() is None ):
+
+            return function( *args, **kwargs )
+
+        with span( *names( args, kwargs ) ):
+
+            return function( *args, **kwargs )
+
+    return wrapper
+
+def records( outerSpan ):
+
+    """
+    @param outerSpan : Span, ended outermost span
+    @return : list( dict ), records of span and its descendants, descendants first
+    """
+
+    import socket
+
+    result = []
+    host = socket.gethostname()
+    pid = os.getpid()
+
+    for current, parent in outerSpan.walk():
+
+        record = {
+            'id': current.id,
+            'build': outerSpan.id,
+            'parent': parent.id if parent else None,
+            'name': current.name,
+            'label': current.label,
+            'start': current.start,
+            'duration': current.duration,
+            'status': current.status,
+            'error': current.error,
+            'host': host,
+            'pid': pid
+            }
+
+        record.update( current.fields )
+
+        if current.topGrp:
+
+            record.update( nodeCounts( current.topGrp ) )
+
+        # peak memory of the process is only meaningful for the whole build
+
+        if current is outerSpan:
+
+            record[ 'peakMemory' ] = peakMemory()
+            record[ 'modules' ] = dict( ( _fullName( c ), c.duration ) for c in current.children )
+            record[ 'failures' ] = [ _fullName( s ) for s, _ in current.walk() if s.status != 'ok' and s is not current ]
+
+        result.append( record )
+
+    return result
+
+def nodeCounts( topGrp ):
+
+    """
+    @param topGrp : str, rig or module top group
+    @return : dict, { 'nodes', 'joints', 'controls', 'constraints', 'ikHandles' } counts of nodes below top group
+    """
+
+    if not mc.objExists( topGrp ):
+
+        return {}
+
+    typeValues = mc.ls( [ topGrp ] + ( mc.listRelatives( topGrp, ad = 1 ) or [] ), st = 1 )
+    names, types = typeValues[ ::2 ], typeValues[ 1::2 ]
+
+    return {
+        'nodes': len( names ),
+        'joints': types.count( 'joint' ),
+        'controls': len( [ n for n, t in zip( names, types ) if t == 'transform' and _controlRe.search( n ) ] ),
+        'constraints': len( [ t for t in types if t.endswith( 'Constraint' ) ] ),
+        'ikHandles': types.count( 'ikHandle' )
+        }
+
+def peakMemory():
+
+    """
+    @return : int, peak resident memory of process in bytes, None when not available
+    """
+
+    if resource is None:
+
+        return None
+
+    peak = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+
+    # kilobytes on linux, bytes on macOS
+
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _endSpan( current ):
+
+    current.duration = time.time() - current.start
+
+    # rig top groups and module top groups follow base.module names, a scene that can not be queried leaves no counts
+
+    try:
+
+        for topGrp in [ '%s_Module_GRP' % current.label, '%s_rig_GRP' % current.label ] if current.label else []:
+
+            if mc.objExists( topGrp ):
+
+                current.topGrp = topGrp
+                break
+
+    except Exception:
+
+        current.topGrp = None
+
+def _report( sink, outerSpan ):
+
+    # telemetry never fails a build nor hides its error, records that can not be collected or written are dropped
+
+    try:
+
+        sink.write( records( outerSpan ) )
+
+    except Exception:
+
+        if isinstance( getattr( sink, 'dropped', None ), int ):
+
+            sink.dropped += len( list( outerSpan.walk() ) )
+
+def _fullName( current ):
+
+    return '%s %s' % ( current.name, current.label ) if current.label else current.name
@@ -1,2 +1,3 @@
-import control 
-import module
\ No newline at end of file
+from .. import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'attrSpec', 'control', 'module', 'shapeCache' ] )
\ No newline at end of file
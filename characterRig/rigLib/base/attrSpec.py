@@ -0,0 +1,87 @@
+"""
+attrSpec @ base
+channel states and custom attributes of rig nodes, declared by node and channel names
+
+controls and rig structures declare the lock, keyable and channel box
+state of their channels, the custom attributes they add and the
+attributes they connect through these functions instead of building
+setAttr, addAttr and connectAttr calls themselves. Calls are issued
+through the backend, so inside module builds the command batch of
+backend.batch queues the channel states and merges per axis states equal
+on x, y and z into one t, r or s call when it flushes :
+
+    attrSpec.lock( 'main_CTRL', [ 't', 'r', 's', 'v' ] )
+    attrSpec.addAttr( 'main_CTRL', 'modelVis', at = 'enum', enumName = 'off:on', k = 1, dv = 1 )
+    attrSpec.connect( 'main_CTRL.modelVis', 'model_GRP.v' )
+"""
+
+from ..backend import cmds as mc
+
+_axes = [ 'x', 'y', 'z' ]
+_compounds = [ 't', 'r', 's' ]
+
+# channel state flags of setAttr
+
+_flagNames = { 'lock': 'l', 'keyable': 'k', 'channelBox': 'cb' }
+
+def channels( node, attrs, lock = None, keyable = None, channelBox = None ):
+
+    """
+    declare state of node channels, states not given are left as they are
+
+    @param node : str, node name
+    @param attrs : list( str ), channel names, t, r and s stand for their x, y and z channels
+    @param lock : bool, lock channels
+    @param keyable : bool, make channels keyable
+    @param channelBox : bool, show non-keyable channels in channel box
+    @return : None
+    """
+
+    flags = dict( ( _flagNames[ k ], v ) for k, v in [ ( 'lock', lock ), ( 'keyable', keyable ), ( 'channelBox', channelBox ) ] if v is not None )
+
+    if not flags:
+
+        return
+
+    for at in attrs:
+
+        for channel in ( [ at + axis for axis in _axes ] if at in _compounds else [ at ] ):
+
+            mc.setAttr( node + '.' + channel, **flags )
+
+def lock( node, attrs ):
+
+    """
+    declare node channels locked and non-keyable
+
+    @param node : str, node name
+    @param attrs : list( str ), channel names, t, r and s stand for their x, y and z channels
+    @return : None
+    """
+
+    channels( node, attrs, lock = True, keyable = False )
+
+def addAttr( node, longName, **flags ):
+
+    """
+    declare custom attribute of node
+
+    @param node : str, node name
+    @param longName : str, long name of attribute
+    @param flags : flags of mc.addAttr, like at, enumName, k and dv
+    @return : None
+    """
+
+    mc.addAttr( node, ln = longName, **flags )
+
+def connect( source, destination ):
+
+    """
+    declare connection
+
+    @param source : str, source plug
+    @param destination : str, destination plug
+    @return : None
+    """
+
+    mc.connectAttr( source, destination )
@@ -2,13 +2,24 @@
 module for making rig control
 """
 
-import maya.cmds as mc 
+from ..backend import cmds as mc
+from ..backend import profiler
+
+from . import attrSpec
+from . import shapeCache
+from ..utils import snap
+
+# override colors of controls by side prefix, other controls get centerColor
+
+sideColors = { 'l_': 6, 'r_': 13 }
+centerColor = 22
 
 class Control():
 
     """ class for building controls """
     
-    def _init_(
+    @profiler.profiled
+    def __init__(
                 self,
                 prefix = 'new',
                 scale = 1.0,
@@ -30,8 +41,8 @@ class Control():
         @return : None
         """
             
-        ctrlObject = None
         circleNormal = [ 1, 0, 0 ]
+        ctrlName = prefix + '_CTRL'
         
         if shape in [ 'circle', 'circleX' ]:
             
@@ -47,73 +58,48 @@ class Control():
         
         elif shape in [ 'sphere' ]:
 
-            ctrlObject = mc.circle ( n = prefix + '_CTRL1', ch = False, radius = scale, normal = [ 1, 0, 0 ] )[0]
-            addShape = mc.circle ( n = prefix + '_CTRL2', ch = False, radius = scale, normal = [ 0, 1, 0 ] )[0]
-            mc.parent ( mc.listRelatives ( addShape, s = 1 ), ctrlObject, r = 1, s = 1 )
-            mc.delete( addShape )
-            
-        if not ctrlObject:
+            ctrlName = prefix + '_CTRL1'
 
-            mc.circle ( n = prefix + '_CTRL', ch = False, radius = scale, normal = circleNormal )[0]
+        ctrlObject, ctrlShapes = shapeCache.makeControlCurve( ctrlName, shape = shape, normal = circleNormal, scale = scale )
 
         ctrlOffset = mc.group( n = prefix + '_offset_GRP', em = 1 )
         mc.parent( ctrlObject, ctrlOffset )
 
         # control color
 
-        ctrlShapes = mc.listRelatives( ctrlObject, s = 1 )
         [ mc.setAttr( s + '.ove', 1 ) for s in ctrlShapes ]
 
-        if prefix.startswith( 'l_' ):
+        ctrlColor = centerColor
 
-            [ mc.setAttr( s + '.ovc', 6 ) for s in ctrlShapes ]
-            
-        elif prefix.startswith( 'r_' ):
+        for side, sideColor in sideColors.items():
 
-            [ mc.setAttr( s + '.ovc', 13 ) for s in ctrlShapes ]
-            
-        else:
+            if prefix.startswith( side ):
+
+                ctrlColor = sideColor
 
-            [ mc.setAttr( s + '.ovc', 22 ) for s in ctrlShapes ]
+        [ mc.setAttr( s + '.ovc', ctrlColor ) for s in ctrlShapes ]
             
         # translateTo
 
         if mc.objExists( translateTo ):
 
-            mc.delete( mc.pointContraint( translateTo, ctrlOffset ) )
+            snap.snap( translateTo, ctrlOffset, rotate = False )
 
         # rotateTo 
 
         if mc.objExists( rotateTo ):
 
-            mc.delete( mc.orientContraint( rotateTo, ctrlObject ) )
+            snap.snap( rotateTo, ctrlObject, translate = False )
 
         # parent control
 
         if mc.objExists( parent ):
 
-            mc.delete( mc.parent( ctrlOffset, parent ) )
+            mc.parent( ctrlOffset, parent )
             
         # lock control channels
 
-        singleAttrLockList = []
-
-        for lockChannel in lockChannels:
-
-            if lockChannel in [ 't', 'r', 's' ]:
-
-                for axis in [ 'x', 'y', 'z' ]:
-
-                    at = lockChannel + axis
-                    singleAttrLockList.append( at )
-                
-            else:
-
-                singleAttrLockList.append( lockChannel )
-                
-        for at in singleAttrLockList:
-
-            mc.setAttr( ctrlObject + '.' + at, l = 1, k = 0 )
+        attrSpec.lock( ctrlObject, lockChannels )
 
         # add public members
 
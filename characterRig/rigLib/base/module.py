@@ -2,18 +2,26 @@
 module for making top rig structure and rig module
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import profiler
 
 sceneObjectType = 'rig'
 
+from . import attrSpec
 from . import control
 
+from .. import utils
+from ..utils import matrix
+
 class Base():
 
     """
     class for building top rig structure
     """
 
+    @profiler.profiled
+    @batch.batchedBuild
     def __init__(
                 self,
                 characterName = 'new',
@@ -59,15 +67,16 @@ class Base():
 
         for axis in [ 'y', 'z' ]:
 
-            mc.connectAttr( global1Ctrl + '.sx', global1Ctrl + '.s' + axis )
-            mc.setAttr( global1Ctrl + '.s' + axis, k = 0 )
+            attrSpec.connect( global1Ctrl.C + '.sx', global1Ctrl.C + '.s' + axis )
+
+        attrSpec.channels( global1Ctrl.C, [ 'sy', 'sz' ], keyable = False )
         
         # make more groups
 
         self.partsGrp = mc.group( n = 'parts_GRP', em = 1, p = self.rigGrp )
         self.jointsGrp = mc.group( n = 'joints_GRP', em = 1, p = self.partsGrp )
 
-        mc.setAttr( self.partsGrp + 'it', 0, l = 1 )
+        mc.setAttr( self.partsGrp + '.it', 0, l = 1 )
 
         self.modulesGrp = mc.group( n = 'modules_GRP', em = 1, p = global2Ctrl.C )
 
@@ -85,7 +94,7 @@ class Base():
 
         if mc.objExists( mainCtrlAttachObj ):
 
-            mc.parent( mainCtrlAttachObj, mainCtrl.Off, mo = 1 )
+            mc.parentConstraint( mainCtrlAttachObj, mainCtrl.Off, mo = 1 )
         
         mainVisAts = [ 'modelVis', 'jointsVis' ]
         mainDispAts = [ 'modelDisp', 'jointsDisp' ]
@@ -96,27 +105,24 @@ class Base():
 
         for at, obj, dfVal in zip( mainVisAts, mainObjList, mainObjVisDvList ):
 
-            mc.addAttr( mainCtrl.C, ln = at, at = 'enum', enumName = 'off:on', k = 1, dv= dfVal )
-            mc.setAttr( mainCtrl.C + '.' + at, cb = 1 )
-            mc.connectAttr( mainCtrl.C + '.' + at, obj + '.v' )
+            attrSpec.addAttr( mainCtrl.C, at, at = 'enum', enumName = 'off:on', k = 1, dv= dfVal )
+            attrSpec.channels( mainCtrl.C, [ at ], channelBox = True )
+            attrSpec.connect( mainCtrl.C + '.' + at, obj + '.v' )
         
         # add rig display type connections
 
         for at, obj in zip( mainDispAts, mainObjList ):
 
-            mc.addAttr( mainCtrl.C, ln = at, at = 'enum', enumName = 'normal:template:reference', k = 1, dv = 2 )
-            mc.setAttr( mainCtrl.C + '.' + at, cb = 1 )
-            mc.setAttr( obj + 'ove', 1 )
-            mc.connectAttr( mainCtrl.C + '.' + at, obj + '.ovdt' )
+            attrSpec.addAttr( mainCtrl.C, at, at = 'enum', enumName = 'normal:template:reference', k = 1, dv = 2 )
+            attrSpec.channels( mainCtrl.C, [ at ], channelBox = True )
+            mc.setAttr( obj + '.ove', 1 )
+            attrSpec.connect( mainCtrl.C + '.' + at, obj + '.ovdt' )
 
     def _adjustMainCtrlShape( self, ctrl, scale ):
 
-        # adjust shape of main control
+        # adjust shape of main control, shapeEdit loads NumPy on first use
 
-        ctrlShapes = mc.listRelatives( ctrl.C, s = 1, type = 'nurbsCurve' )
-        cls = mc.cluster( ctrlShapes )[1]
-        mc.setAttr( cls + '.ry', 90 )
-        mc.delete( ctrlShapes, ch = 1 )
+        utils.shapeEdit.transform( ctrl.C, matrix.compose( rotate = [ 0, 90, 0 ] ), worldSpace = True )
 
         mc.move( 8 * scale, ctrl.Off, moveY = True, relative = True )
 
@@ -124,11 +130,35 @@ class Base():
 
         # flatten ctrl object shape
 
-        ctrlShapes = mc.listRelatives( ctrlObject, s = 1, type = 'nurbsCurve' )
-        cls = mc.cluster( ctrlShapes )[1]
-        mc.setAttr( cls + '.ry', 90 )
-        mc.delete( ctrlShapes, ch = 1 )
+        utils.shapeEdit.transform( ctrlObject, matrix.compose( rotate = [ 0, 90, 0 ] ), worldSpace = True )
     
+class ExistingBase():
+
+    """
+    class referencing top rig structure of a rig already built by Base, used to rebuild modules
+    """
+
+    def __init__( self, characterName = 'new' ):
+
+        """
+        @param characterName : str, name of character the rig was built for
+        @return : None
+        """
+
+        self.topGrp = characterName + '_rig_GRP'
+
+        if not mc.objExists( self.topGrp ):
+
+            raise RuntimeError( 'no rig found for character %s' % characterName )
+
+        # groups made by Base have unique names
+
+        self.rigGrp = 'rig_GRP'
+        self.modelGrp = 'model_GRP'
+        self.partsGrp = 'parts_GRP'
+        self.jointsGrp = 'joints_GRP'
+        self.modulesGrp = 'modules_GRP'
+
 class Module():
 
     """
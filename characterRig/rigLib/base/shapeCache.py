@@ -0,0 +1,182 @@
+"""
+shapeCache @ base
+per session cache of prebuilt control shape templates
+
+shapes built from several curves ( like 'sphere' ) are built once per
+( shape, normal, scale ) key under a hidden template group, new controls
+duplicate the template and rename its shapes. Least recently used templates
+are deleted when more than maxTemplates are cached, clear() removes all
+templates from the scene. Builds making controls run inside building(),
+which clears the templates when the outermost block ends, also when the
+build fails :
+
+    with shapeCache.building():
+
+        makeControlSetup( baseRig )
+"""
+
+import collections
+import contextlib
+
+from ..backend import cmds as mc
+
+templatesGrpName = 'shapeTemplates_GRP'
+maxTemplates = 32
+
+# shape : list of circle normals the shape is built from
+
+compoundShapes = {
+    'sphere': [ [ 1, 0, 0 ], [ 0, 1, 0 ] ]
+    }
+
+_templates = collections.OrderedDict()
+_stats = { 'hits': 0, 'misses': 0, 'evictions': 0 }
+_state = { 'depth': 0 }
+
+def makeControlCurve( ctrlName, shape = 'circle', normal = ( 1, 0, 0 ), scale = 1.0 ):
+
+    """
+    make control curve transform from shape template
+
+    @param ctrlName : str, name of new control transform
+    @param shape : str, control shape type
+    @param normal : list( float ), normal of circle for single circle shapes
+    @param scale : float, radius of circles
+    @return : tuple( str, list( str ) ), name of new control transform and names of its shapes
+    """
+
+    if shape not in compoundShapes:
+
+        ctrlObject = mc.circle( n = ctrlName, ch = False, radius = scale, normal = normal )[0]
+
+        return ctrlObject, mc.listRelatives( ctrlObject, s = 1 )
+
+    template = _getTemplate( shape, normal, scale )
+
+    ctrlObject = mc.duplicate( template, n = ctrlName, rr = 1 )[0]
+    ctrlShapes = []
+
+    for i, ctrlShape in enumerate( mc.listRelatives( ctrlObject, s = 1, f = 1 ) ):
+
+        ctrlShapes.append( mc.rename( ctrlShape, ctrlObject + 'Shape' + ( str( i ) if i else '' ) ) )
+
+    return ctrlObject, ctrlShapes
+
+def _getTemplate( shape, normal, scale ):
+
+    key = ( shape, tuple( normal ), float( scale ) )
+    template = _templates.get( key )
+
+    if template and mc.objExists( template ):
+
+        _templates.pop( key )
+        _templates[ key ] = template
+        _stats[ 'hits' ] += 1
+
+        return template
+
+    _templates.pop( key, None )
+    _stats[ 'misses' ] += 1
+
+    if not mc.objExists( templatesGrpName ):
+
+        mc.group( n = templatesGrpName, em = 1 )
+        mc.hide( templatesGrpName )
+
+    template = _buildTemplate( shape, scale )
+    mc.parent( template, templatesGrpName )
+    _templates[ key ] = template
+
+    while len( _templates ) > maxTemplates:
+
+        _, evicted = _templates.popitem( last = False )
+        _stats[ 'evictions' ] += 1
+
+        if mc.objExists( evicted ):
+
+            mc.delete( evicted )
+
+    return template
+
+def _buildTemplate( shape, scale ):
+
+    normals = compoundShapes[ shape ]
+    template = mc.circle( n = shape + 'Template_CRV', ch = False, radius = scale, normal = normals[0] )[0]
+
+    for normal in normals[ 1: ]:
+
+        addShape = mc.circle( n = shape + 'TemplateAdd_CRV', ch = False, radius = scale, normal = normal )[0]
+        mc.parent( mc.listRelatives( addShape, s = 1 ), template, r = 1, s = 1 )
+        mc.delete( addShape )
+
+    return template
+
+def clear():
+
+    """
+    delete all cached templates from the scene
+
+    @return : None
+    """
+
+    _templates.clear()
+
+    if mc.objExists( templatesGrpName ):
+
+        mc.delete( templatesGrpName )
+
+@contextlib.contextmanager
+def building():
+
+    """
+    share templates between controls made inside the with block and clear them
+    when the outermost block ends, nested blocks keep the templates of outer block
+
+    @return : None
+    """
+
+    _state[ 'depth' ] += 1
+
+    try:
+
+        yield
+
+    finally:
+
+        _state[ 'depth' ] -= 1
+
+        if not _state[ 'depth' ]:
+
+            clear()
+
+@contextlib.contextmanager
+def isolated():
+
+    """
+    set cached templates aside while building in another scene, like a sandbox scene
+
+    @return : None
+    """
+
+    saved = list( _templates.items() )
+    _templates.clear()
+
+    try:
+
+        yield
+
+    finally:
+
+        _templates.clear()
+        _templates.update( saved )
+
+def stats():
+
+    """
+    @return : dict, cache hits, misses, evictions and number of cached templates
+    """
+
+    result = dict( _stats )
+    result[ 'cached' ] = len( _templates )
+
+    return result
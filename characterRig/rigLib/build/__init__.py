@@ -0,0 +1,3 @@
+from .. import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'spec', 'scheduler', 'incremental', 'farm', 'snapshot', 'bake', 'mirror', 'lod', 'plan', 'cache', 'diff' ] )
\ No newline at end of file
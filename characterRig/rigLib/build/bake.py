@@ -0,0 +1,336 @@
+"""
+bake @ build
+streaming bake of control animation to joint world matrices
+
+control animation is read frame by frame, each frame a dictionary of
+control channel values like { "l_arm_hand_CTRL1.tx": 1.5 }, channels not
+given keep their value from the previous frame. Frames are evaluated in
+fixed-size chunks by a generator and each chunk is appended to the bake
+file as soon as it is done, so memory stays flat for any shot length :
+
+    frames = bake.readAnimation( 'shot010_controls.jsonl' )
+    bake.bake( 'hero', frames, 'shot010.rigbake', startFrame = 1001 )
+
+    with bake.BakeFile( 'shot010.rigbake' ) as baked:
+
+        for firstFrame, matrices in baked.chunks():
+
+            pass
+
+evaluation goes through the scene by default, where Maya evaluates the
+rig as it does in the viewport. Channels set while sampling are put back
+to the values they had before the bake once sampling ends, also when it
+fails, so the rig is not left in the pose of the last frame. Any
+evaluator with setValue, value and worldMatrices methods can be given
+instead, like an evaluate.poseGraph PoseGraph of the rig which needs no
+scene. A PoseGraph solves rotate plane IK of 2 bone chains and single
+chain IK only, when a frame moves the drivers of a spline IK handle, like
+the tail controls, reading its joints raises ValueError and the bake stops,
+bake such rigs with the scene evaluator.
+
+the bake file is little-endian, header then joint names then frames :
+
+    header          magic, version, joint count, frame count, start frame, byte size of names
+    names           UTF-8 joint names separated by new lines
+    frames          float32 [ frames * joints * 16 ], world matrices, row-major like mc.xform( q = 1, ws = 1, m = 1 )
+"""
+
+import array
+import json
+import mmap
+import struct
+import sys
+
+from ..backend import cmds as mc
+
+magic = b'RIGBAKE\0'
+version = 1
+
+defaultChunkSize = 256
+
+# magic, version, joint count, frame count, start frame and byte size of names
+
+_header = struct.Struct( '<8sIIIiI' )
+
+class SceneEvaluator():
+
+    """
+    class setting control channels in the scene and querying joint matrices in bulk
+    """
+
+    def setValue( self, node, channel, value ):
+
+        """
+        @param node : str, node name
+        @param channel : str, attribute name, like tx
+        @param value : float, attribute value
+        @return : None
+        """
+
+        mc.setAttr( node + '.' + channel, value )
+
+    def value( self, node, channel ):
+
+        """
+        @param node : str, node name
+        @param channel : str, attribute name, like tx
+        @return : float, attribute value
+        """
+
+        return mc.getAttr( node + '.' + channel )
+
+    def worldMatrices( self, nodes ):
+
+        """
+        @param nodes : list( str ), node names
+        @return : list( list( float ) ), world matrices of nodes
+        """
+
+        values = mc.xform( nodes, q = 1, ws = 1, m = 1 )
+
+        return [ values[ i * 16:i * 16 + 16 ] for i in range( len( nodes ) ) ]
+
+def rigJoints( characterName ):
+
+    """
+    @param characterName : str, name of character built by characterName.Build
+    @return : list( str ), joints of rig, parents first
+    """
+
+    return list( reversed( mc.listRelatives( characterName + '_rig_GRP', ad = 1, type = 'joint' ) or [] ) )
+
+def readAnimation( path ):
+
+    """
+    read control animation lazily from JSON lines file, one frame per line
+
+    @param path : str, path of JSON lines file with a dictionary of channel values per frame
+    @return : generator of dict, { 'control.channel': value } of each frame
+    """
+
+    with open( path ) as animationFile:
+
+        for line in animationFile:
+
+            if line.strip():
+
+                yield json.loads( line )
+
+def sample( joints, animation, evaluator = None, chunkSize = defaultChunkSize ):
+
+    """
+    evaluate animation frame by frame and yield joint matrices in fixed-size chunks,
+    channels set are restored to their values from before sampling when it ends
+
+    @param joints : list( str ), joints to bake
+    @param animation : iterable of dict, { 'control.channel': value } of each frame
+    @param evaluator : optional evaluator with setValue, value and worldMatrices methods, SceneEvaluator by default
+    @param chunkSize : int, number of frames per chunk
+    @return : generator of tuple( int, array.array ), frame count and float32 matrices of each chunk
+    """
+
+    if chunkSize < 1:
+
+        raise ValueError( 'bake chunk size must be at least 1' )
+
+    evaluator = evaluator or SceneEvaluator()
+    chunk = array.array( 'f' )
+    frameCount = 0
+
+    # values of channels before the bake, in the order they were first set
+
+    restValues = []
+    touched = set()
+
+    try:
+
+        for values in animation:
+
+            for plug, value in values.items():
+
+                node, _, channel = plug.rpartition( '.' )
+
+                if plug not in touched:
+
+                    restValues.append( ( node, channel, evaluator.value( node, channel ) ) )
+                    touched.add( plug )
+
+                evaluator.setValue( node, channel, value )
+
+            for m in evaluator.worldMatrices( joints ):
+
+                chunk.extend( m )
+
+            frameCount += 1
+
+            if frameCount == chunkSize:
+
+                yield frameCount, chunk
+
+                chunk = array.array( 'f' )
+                frameCount = 0
+
+        if frameCount:
+
+            yield frameCount, chunk
+
+    finally:
+
+        for node, channel, value in reversed( restValues ):
+
+            evaluator.setValue( node, channel, value )
+
+def write( path, joints, chunks, startFrame = 0 ):
+
+    """
+    write chunks to bake file as they are produced
+
+    @param path : str, bake file path
+    @param joints : list( str ), baked joints, in order of matrices
+    @param chunks : iterable of tuple( int, array.array ), frame count and matrices of each chunk, like sample() yields
+    @param startFrame : int, number of first frame
+    @return : int, number of frames written
+    """
+
+    names = '\n'.join( joints ).encode( 'utf-8' )
+    frameCount = 0
+
+    with open( path, 'wb' ) as bakeFile:
+
+        bakeFile.write( _header.pack( magic, version, len( joints ), 0, startFrame, len( names ) ) )
+        bakeFile.write( names )
+
+        for count, matrices in chunks:
+
+            if sys.byteorder != 'little':
+
+                matrices = array.array( 'f', matrices )
+                matrices.byteswap()
+
+            matrices.tofile( bakeFile )
+            bakeFile.flush()
+            frameCount += count
+
+        # frame count is known once the animation is exhausted
+
+        bakeFile.seek( 0 )
+        bakeFile.write( _header.pack( magic, version, len( joints ), frameCount, startFrame, len( names ) ) )
+
+    return frameCount
+
+def bake( characterName, animation, path, joints = None, startFrame = 0, evaluator = None, chunkSize = defaultChunkSize ):
+
+    """
+    bake control animation of a rig built by characterName.Build to a bake file
+
+    @param characterName : str, name of character
+    @param animation : iterable of dict, { 'control.channel': value } of each frame, like readAnimation() yields
+    @param path : str, bake file path
+    @param joints : list( str ), optional joints to bake, all rig joints by default
+    @param startFrame : int, number of first frame
+    @param evaluator : optional evaluator with setValue, value and worldMatrices methods, SceneEvaluator by default
+    @param chunkSize : int, number of frames evaluated and written at once
+    @return : int, number of frames baked
+    """
+
+    joints = joints or rigJoints( characterName )
+
+    if not joints:
+
+        raise RuntimeError( 'no joints to bake below %s_rig_GRP' % characterName )
+
+    return write( path, joints, sample( joints, animation, evaluator = evaluator, chunkSize = chunkSize ), startFrame = startFrame )
+
+class BakeFile():
+
+    """
+    class reading a memory mapped bake file chunk by chunk
+    """
+
+    def __init__( self, path ):
+
+        """
+        @param path : str, bake file path
+        @return : None
+        """
+
+        self._file = open( path, 'rb' )
+        self._map = mmap.mmap( self._file.fileno(), 0, access = mmap.ACCESS_READ )
+
+        fields = _header.unpack_from( self._map, 0 )
+
+        if fields[0] != magic:
+
+            self.close()
+            raise ValueError( '%s is not a rig bake' % path )
+
+        if fields[1] != version:
+
+            self.close()
+            raise ValueError( 'rig bake %s has version %d, expected %d' % ( path, fields[1], version ) )
+
+        self.jointCount, self.frameCount, self.startFrame, namesSize = fields[ 2: ]
+        self.joints = self._map[ _header.size:_header.size + namesSize ].decode( 'utf-8' ).split( '\n' )
+
+        self._offset = _header.size + namesSize
+
+    def __enter__( self ):
+
+        return self
+
+    def __exit__( self, *args ):
+
+        self.close()
+
+    def __len__( self ):
+
+        return self.frameCount
+
+    def close( self ):
+
+        """
+        unmap file
+        """
+
+        self._map.close()
+        self._file.close()
+
+    def frame( self, frame ):
+
+        """
+        @param frame : int, frame number, from start frame
+        @return : list( list( float ) ), world matrices of joints at frame
+        """
+
+        index = frame - self.startFrame
+
+        if not 0 <= index < self.frameCount:
+
+            raise ValueError( 'rig bake has no frame %d' % frame )
+
+        values = self._read( index, 1 )
+
+        return [ list( values[ i * 16:i * 16 + 16 ] ) for i in range( self.jointCount ) ]
+
+    def chunks( self, chunkSize = defaultChunkSize ):
+
+        """
+        @param chunkSize : int, number of frames per chunk
+        @return : generator of tuple( int, array.array ), first frame number and float32 matrices of each chunk
+        """
+
+        for index in range( 0, self.frameCount, chunkSize ):
+
+            yield self.startFrame + index, self._read( index, min( chunkSize, self.frameCount - index ) )
+
+    def _read( self, index, count ):
+
+        frameSize = self.jointCount * 16 * 4
+        start = self._offset + index * frameSize
+        values = array.array( 'f', self._map[ start:start + count * frameSize ] )
+
+        if sys.byteorder != 'little':
+
+            values.byteswap()
+
+        return values
@@ -0,0 +1,492 @@
+"""
+cache @ build
+persistent content-addressed cache of module builds, shared across sessions and processes
+
+a module build is keyed by its incremental fingerprint ( spec entry, rig
+scale, world matrices of the joints and locators it reads and the rigLib
+source code ) and the base rig groups it is parented to. On a miss the
+module is built in the active scene while its commands are recorded like
+build.mirror does, and the recording is stored as a plan. On a hit the
+stored plan is applied, its commands replayed in one batch instead of
+running the build function :
+
+    buildCache = cache.BuildCache( '/shows/rigCache', maxBytes = 512 * 1024 ** 2 )
+    incremental.build( rigSpec, baseRig = baseRig, cache = buildCache )
+    buildCache.stats()
+
+entries are JSON files named by key, written atomically so farm workers
+can share a cache folder. They hold command names, arguments and results
+as plain values, only commands of rig builds are replayed and entries of
+another version or structure are misses, so a cache folder others can
+write to runs no code. Reading an entry refreshes its modification time,
+least recently used entries are deleted when the folder holds more than
+maxBytes. Set environment variable RIGLIB_BUILD_CACHE to a folder to
+cache the builds of characterName rigs and farm jobs
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ..backend import cmds as mc
+from ..backend import telemetry
+
+from ..base import control
+from ..base import module
+from ..base import shapeCache
+
+from . import mirror
+from . import plan
+from . import scheduler
+
+version = 2
+
+defaultMaxBytes = 256 * 1024 ** 2
+
+entrySuffix = '.rigplan'
+tempSuffix = '.tmp'
+
+# temporary files older than this were left by killed writers
+
+staleSeconds = 3600
+
+# commands of rig builds, other command names make an entry invalid
+
+replayCommands = set( [ 'addAttr', 'circle', 'cluster', 'connectAttr', 'curve', 'delete', 'duplicate', 'group', 'hide',
+                        'ikHandle', 'move', 'orientConstraint', 'parent', 'parentConstraint', 'pointConstraint',
+                        'poleVectorConstraint', 'rename', 'select', 'setAttr', 'xform' ] + mirror.nameQueryCommands )
+
+# classes of build results, stored by name with their node names
+
+resultClasses = { 'Module': module.Module, 'Control': control.Control }
+
+_sessionCaches = {}
+
+class BuildCache():
+
+    """
+    class storing module build plans on disk by input hash, with least recently used eviction
+    """
+
+    def __init__( self, path, maxBytes = defaultMaxBytes ):
+
+        """
+        @param path : str, cache folder, made when missing
+        @param maxBytes : int, size bound of cache entries in bytes
+        @return : None
+        """
+
+        self.path = path
+        self.maxBytes = maxBytes
+        self._stats = { 'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'errors': 0 }
+
+        if not os.path.isdir( path ):
+
+            os.makedirs( path )
+
+    def key( self, fingerprint, kwargs ):
+
+        """
+        @param fingerprint : str, input hash of module build, like incremental.fingerprint() returns
+        @param kwargs : dict, keyword arguments of module build function
+        @return : str, cache key of module build
+        """
+
+        baseRig = kwargs.get( 'baseRig' )
+        baseNames = sorted( v for v in vars( baseRig ).values() if isinstance( v, str ) ) if baseRig else []
+        inputs = { 'version': version, 'fingerprint': fingerprint, 'base': baseNames }
+
+        return hashlib.sha1( json.dumps( inputs, sort_keys = True ).encode( 'utf-8' ) ).hexdigest()
+
+    def get( self, key ):
+
+        """
+        @param key : str, cache key
+        @return : plan.Plan, stored plan, None on a miss
+        """
+
+        entryPath = self._entryPath( key )
+
+        try:
+
+            with open( entryPath, 'r' ) as entryFile:
+
+                data = entryFile.read()
+
+        except ( IOError, OSError ):
+
+            self._stats[ 'misses' ] += 1
+
+            return None
+
+        try:
+
+            entry = decode( json.loads( data ) )
+
+        except ( ValueError, TypeError, KeyError ):
+
+            # entries written by other rigLib versions, cut short or not written by a build are dropped
+
+            self._stats[ 'misses' ] += 1
+            self._stats[ 'errors' ] += 1
+            self._remove( entryPath )
+
+            return None
+
+        self._stats[ 'hits' ] += 1
+        self._touch( entryPath )
+
+        return entry
+
+    def put( self, key, entry ):
+
+        """
+        store plan, then evict least recently used entries above size bound
+
+        @param key : str, cache key
+        @param entry : plan.Plan, plan of module build
+        @return : None
+        """
+
+        data = json.dumps( encode( entry ), sort_keys = True )
+        handle, tempPath = tempfile.mkstemp( suffix = tempSuffix, dir = self.path )
+
+        try:
+
+            with os.fdopen( handle, 'w' ) as entryFile:
+
+                entryFile.write( data )
+
+            os.replace( tempPath, self._entryPath( key ) )
+
+        except Exception:
+
+            self._remove( tempPath )
+            raise
+
+        self._stats[ 'writes' ] += 1
+        self.evict()
+
+    def build( self, moduleName, moduleSpec, kwargs, fingerprint ):
+
+        """
+        build module from its stored plan, building it in the active scene and storing its recorded commands on a miss
+
+        @param moduleName : str, name of module in rig spec
+        @param moduleSpec : dict, module entry of rig spec
+        @param kwargs : dict, keyword arguments of module build function
+        @param fingerprint : str, input hash of module build, like incremental.fingerprint() returns
+        @return : dict, build result of module
+        """
+
+        with telemetry.span( 'cache.build', kwargs.get( 'prefix' ) ):
+
+            key = self.key( fingerprint, kwargs )
+            entry = self.get( key )
+            telemetry.annotate( cache = 'miss' if entry is None else 'hit' )
+
+            if entry is not None:
+
+                return plan.apply( entry )
+
+            result, entry = record( moduleName, moduleSpec[ 'type' ], kwargs )
+
+            # a cache folder that can not be written leaves the build as it is
+
+            try:
+
+                self.put( key, entry )
+
+            except ( IOError, OSError, TypeError, ValueError ):
+
+                self._stats[ 'errors' ] += 1
+
+            return result
+
+    def entries( self ):
+
+        """
+        @return : list( tuple( float, int, str ) ), access time, byte size and path of each entry, least recently used first
+        """
+
+        result = []
+
+        for fileName in os.listdir( self.path ):
+
+            if not fileName.endswith( entrySuffix ):
+
+                continue
+
+            entryPath = os.path.join( self.path, fileName )
+
+            try:
+
+                info = os.stat( entryPath )
+
+            except OSError:
+
+                continue
+
+            result.append( ( info.st_mtime, info.st_size, entryPath ) )
+
+        return sorted( result )
+
+    def evict( self ):
+
+        """
+        delete temporary files left by killed writers, then least recently used entries until entries fit size bound
+
+        @return : int, number of deleted entries
+        """
+
+        self._removeStale()
+
+        entries = self.entries()
+        size = sum( e[1] for e in entries )
+        evicted = 0
+
+        for _, entrySize, entryPath in entries:
+
+            if size <= self.maxBytes:
+
+                break
+
+            self._remove( entryPath )
+            size -= entrySize
+            evicted += 1
+
+        self._stats[ 'evictions' ] += evicted
+
+        return evicted
+
+    def clear( self ):
+
+        """
+        delete all entries
+
+        @return : None
+        """
+
+        for _, _, entryPath in self.entries():
+
+            self._remove( entryPath )
+
+    def stats( self ):
+
+        """
+        @return : dict, hits, misses, writes, evictions and unreadable entries of this session, hit rate,
+                  number and byte size of entries on disk
+        """
+
+        result = dict( self._stats )
+        lookups = result[ 'hits' ] + result[ 'misses' ]
+        entries = self.entries()
+
+        result[ 'hitRate' ] = float( result[ 'hits' ] ) / lookups if lookups else 0.0
+        result[ 'entries' ] = len( entries )
+        result[ 'bytes' ] = sum( e[1] for e in entries )
+
+        return result
+
+    def _removeStale( self ):
+
+        # temporary files of writers killed before their rename, recent ones may still be written
+
+        oldest = time.time() - staleSeconds
+
+        for fileName in os.listdir( self.path ):
+
+            tempPath = os.path.join( self.path, fileName )
+
+            try:
+
+                if fileName.endswith( tempSuffix ) and os.stat( tempPath ).st_mtime < oldest:
+
+                    self._remove( tempPath )
+
+            except OSError:
+
+                continue
+
+    def _entryPath( self, key ):
+
+        return os.path.join( self.path, key + entrySuffix )
+
+    def _touch( self, entryPath ):
+
+        # an entry evicted by another process meanwhile is no error
+
+        try:
+
+            os.utime( entryPath, None )
+
+        except OSError:
+
+            pass
+
+    def _remove( self, entryPath ):
+
+        try:
+
+            os.remove( entryPath )
+
+        except OSError:
+
+            pass
+
+def fromEnvironment():
+
+    """
+    @return : BuildCache, cache in folder set by environment variable RIGLIB_BUILD_CACHE, one per folder and session
+              so its stats add up over builds, None when not set
+    """
+
+    path = os.environ.get( 'RIGLIB_BUILD_CACHE' )
+
+    if not path:
+
+        return None
+
+    if path not in _sessionCaches:
+
+        _sessionCaches[ path ] = BuildCache( path )
+
+    return _sessionCaches[ path ]
+
+def record( moduleName, buildType, kwargs ):
+
+    """
+    build module in the active scene while recording its commands
+
+    @param moduleName : str, name of module in rig spec
+    @param buildType : str, module type like spine
+    @param kwargs : dict, keyword arguments of module build function
+    @return : tuple( dict, plan.Plan ), build result and plan of recorded commands
+    """
+
+    # control shape templates are made by the recording and deleted after it, so applying the plan needs no
+    # templates of earlier builds
+
+    shapeCache.clear()
+
+    try:
+
+        result, recorder = mirror.record( scheduler.builders[ buildType ], kwargs )
+        temporary = [ shapeCache.templatesGrpName ] if mc.objExists( shapeCache.templatesGrpName ) else []
+
+    finally:
+
+        shapeCache.clear()
+
+    return result, plan.Plan( moduleName, recorder.commands, result, {}, temporary )
+
+def encode( entry ):
+
+    """
+    @param entry : plan.Plan, plan of module build
+    @return : dict, JSON compatible entry, node types of plan are not stored
+    """
+
+    result = {}
+
+    for key, value in entry.result.items():
+
+        if isinstance( value, str ):
+
+            result[ key ] = value
+
+        else:
+
+            className = type( value ).__name__
+
+            if resultClasses.get( className ) is not type( value ):
+
+                raise TypeError( 'build result %s of %s can not be stored' % ( key, entry.name ) )
+
+            result[ key ] = { 'class': className, 'names': dict( ( k, v ) for k, v in vars( value ).items() if isinstance( v, str ) ) }
+
+    return {
+        'version': version,
+        'name': entry.name,
+        'commands': [ [ c[0], list( c[1] ), c[2], c[3] ] for c in entry.commands ],
+        'result': result,
+        'temporary': entry.temporary
+        }
+
+def decode( data ):
+
+    """
+    @param data : dict, entry read from JSON
+    @return : plan.Plan, plan of entry
+    """
+
+    if not isinstance( data, dict ) or data.get( 'version' ) != version:
+
+        raise ValueError( 'cache entry of another version' )
+
+    commands = []
+
+    for commandName, args, kwargs, commandResult in data[ 'commands' ]:
+
+        if commandName not in replayCommands or not isinstance( args, list ) or not isinstance( kwargs, dict ):
+
+            raise ValueError( 'cache entry command %r is no rig build command' % ( commandName, ) )
+
+        if not ( _plain( args ) and _plain( list( kwargs.values() ) ) and _plain( [ commandResult ] ) ):
+
+            raise ValueError( 'cache entry command %s has values other than strings, numbers and lists' % commandName )
+
+        commands.append( ( commandName, tuple( args ), dict( ( str( k ), v ) for k, v in kwargs.items() ), commandResult ) )
+
+    result = {}
+
+    for key, value in data[ 'result' ].items():
+
+        if isinstance( value, dict ):
+
+            names = value[ 'names' ]
+
+            if not isinstance( names, dict ) or not all( isinstance( v, str ) for v in names.values() ):
+
+                raise ValueError( 'cache entry result %s has names other than strings' % key )
+
+            # build result objects only hold node names, no constructor is run
+
+            result[ key ] = resultClasses[ value[ 'class' ] ].__new__( resultClasses[ value[ 'class' ] ] )
+            result[ key ].__dict__.update( ( str( k ), v ) for k, v in names.items() )
+
+        elif isinstance( value, str ):
+
+            result[ key ] = value
+
+        else:
+
+            raise ValueError( 'cache entry result %s is no node name' % key )
+
+    temporary = data[ 'temporary' ]
+
+    if not isinstance( temporary, list ) or not all( isinstance( n, str ) for n in temporary ):
+
+        raise ValueError( 'cache entry temporary nodes are no node names' )
+
+    return plan.Plan( str( data[ 'name' ] ), commands, result, {}, temporary )
+
+def _plain( values ):
+
+    # strings, numbers, booleans, None and lists of them, like command arguments
+
+    for value in values:
+
+        if isinstance( value, list ):
+
+            if not _plain( value ):
+
+                return False
+
+        elif value is not None and not isinstance( value, ( str, int, float ) ):
+
+            return False
+
+    return True
@@ -0,0 +1,408 @@
+"""
+diff @ build
+structural diff of built rigs from Merkle hashes of their hierarchy
+
+a digest of a rig holds, for each node below the rig top group made by
+module.Base, a hash of its content ( name, type, parent, local matrix,
+values of keyable, channel box, locked and user defined attributes,
+locked attributes, incoming connections and curve CVs, build records of
+build.incremental aside ) and a tree hash of its content and the tree
+hashes of its children. Two digests are compared from the top group
+down, subtrees with equal tree hashes are skipped, so comparing rigs
+costs about the number of changed nodes :
+
+    old = diff.load( 'rigs/hero.rigdigest' )
+    new = diff.digest( 'hero_rig_GRP' )
+
+    for line in diff.formatReport( diff.compare( old, new ) ):
+
+        print( line )
+
+changes are reported by module, the nodes of a module being the ones
+below its _Module_GRP group and base for the others. Farm jobs with a
+digest path write the digest of each built rig, command line comparing
+two digests or two folders of digests, run from the characterRig folder :
+
+    python -m rigLib.build.diff rigs/before rigs/after -v
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from ..backend import cmds as mc
+
+from . import incremental
+
+version = 1
+
+digestSuffix = '.rigdigest'
+
+baseModule = 'base'
+
+_moduleSuffix = '_Module_GRP'
+
+# attributes of dag nodes hashed besides keyable, channel box, locked and user defined ones
+
+_displayAttrs = [ 'visibility', 'overrideEnabled', 'overrideColor', 'overrideDisplayType' ]
+
+def digest( topGrp, precision = 5 ):
+
+    """
+    hash rig below top group
+
+    @param topGrp : str, rig top group, like characterName_rig_GRP
+    @param precision : int, number of decimals floats are rounded to before hashing
+    @return : dict, { 'version', 'top', 'precision', 'nodes' }, nodes by name with their
+              'parent', 'children', 'module', 'content', 'hash' and 'tree' hash
+    """
+
+    topPath = mc.ls( topGrp, l = 1 )[0]
+    paths = [ topPath ] + ( mc.listRelatives( topGrp, ad = 1, f = 1 ) or [] )
+    typeValues = mc.ls( paths, st = 1, l = 1 )
+    nodeTypes = dict( zip( typeValues[ ::2 ], typeValues[ 1::2 ] ) )
+    shapes = set( mc.ls( paths, s = 1, l = 1 ) or [] )
+    transforms = [ p for p in paths if p not in shapes ]
+    matrices = mc.xform( transforms, q = 1, m = 1 )
+    localMatrices = dict( ( p, matrices[ i * 16:i * 16 + 16 ] ) for i, p in enumerate( transforms ) )
+
+    # parents come before their children, sorting paths keeps that order
+
+    paths = [ topPath ] + sorted( paths[ 1: ] )
+    nodes = {}
+
+    for path in paths:
+
+        parentPath, _, name = path.rpartition( '|' )
+        parent = parentPath.rpartition( '|' )[2] if path != topPath else None
+        content = _content( path, nodeTypes[ path ], parent, localMatrices.get( path ), path in shapes, precision )
+
+        if name.endswith( _moduleSuffix ):
+
+            module = name[ :-len( _moduleSuffix ) ]
+
+        else:
+
+            module = nodes[ parent ][ 'module' ] if parent else baseModule
+
+        nodes[ name ] = { 'parent': parent, 'children': [], 'module': module, 'content': content, 'hash': _hash( content ) }
+
+        if parent:
+
+            nodes[ parent ][ 'children' ].append( name )
+
+    for path in reversed( paths ):
+
+        node = nodes[ path.rpartition( '|' )[2] ]
+        node[ 'children' ].sort()
+        node[ 'tree' ] = _hash( [ node[ 'hash' ] ] + [ [ c, nodes[ c ][ 'tree' ] ] for c in node[ 'children' ] ] )
+
+    return { 'version': version, 'top': topPath.rpartition( '|' )[2], 'precision': precision, 'nodes': nodes }
+
+def save( rigDigest, path ):
+
+    """
+    @param rigDigest : dict, digest returned by digest()
+    @param path : str, digest file path
+    @return : None
+    """
+
+    with open( path, 'w' ) as digestFile:
+
+        json.dump( rigDigest, digestFile, sort_keys = True )
+
+def load( path ):
+
+    """
+    @param path : str, digest file path
+    @return : dict, digest
+    """
+
+    with open( path ) as digestFile:
+
+        rigDigest = json.load( digestFile )
+
+    if rigDigest.get( 'version' ) != version:
+
+        raise ValueError( 'rig digest %s has version %s, expected %s' % ( path, rigDigest.get( 'version' ), version ) )
+
+    return rigDigest
+
+def export( topGrp, path, precision = 5 ):
+
+    """
+    write digest of rig below top group
+
+    @param topGrp : str, rig top group, like characterName_rig_GRP
+    @param path : str, digest file path
+    @param precision : int, number of decimals floats are rounded to before hashing
+    @return : None
+    """
+
+    save( digest( topGrp, precision = precision ), path )
+
+def compare( oldDigest, newDigest ):
+
+    """
+    compare two digests of a rig, walking only subtrees whose tree hashes differ
+
+    @param oldDigest : dict, digest of previous rig
+    @param newDigest : dict, digest of new rig
+    @return : dict, changes by module, { module: { 'added', 'removed', 'changed' } } with lists of added and
+              removed node names and names of changed nodes with their changed fields, like attrs.rotateX
+    """
+
+    if oldDigest[ 'precision' ] != newDigest[ 'precision' ]:
+
+        raise ValueError( 'rig digests hashed with precision %s and %s can not be compared' % ( oldDigest[ 'precision' ], newDigest[ 'precision' ] ) )
+
+    oldNodes, newNodes = oldDigest[ 'nodes' ], newDigest[ 'nodes' ]
+    changes = {}
+    addedRoots = []
+    removedRoots = []
+    pending = [ ( oldDigest[ 'top' ], newDigest[ 'top' ] ) ]
+
+    while pending:
+
+        oldName, newName = pending.pop()
+        oldNode, newNode = oldNodes[ oldName ], newNodes[ newName ]
+
+        if oldNode[ 'tree' ] == newNode[ 'tree' ]:
+
+            continue
+
+        if oldNode[ 'hash' ] != newNode[ 'hash' ]:
+
+            _moduleChanges( changes, newNode[ 'module' ] )[ 'changed' ][ newName ] = _changedFields( oldNode[ 'content' ], newNode[ 'content' ] )
+
+        oldChildren, newChildren = set( oldNode[ 'children' ] ), set( newNode[ 'children' ] )
+        pending.extend( ( c, c ) for c in oldChildren & newChildren )
+        removedRoots.extend( oldChildren - newChildren )
+        addedRoots.extend( newChildren - oldChildren )
+
+    # nodes moved to another parent are in a removed subtree and in an added one
+
+    removed = set( _subtrees( oldNodes, removedRoots ) )
+    added = set( _subtrees( newNodes, addedRoots ) )
+    moved = removed & added
+
+    for name in moved:
+
+        if oldNodes[ name ][ 'hash' ] != newNodes[ name ][ 'hash' ]:
+
+            _moduleChanges( changes, newNodes[ name ][ 'module' ] )[ 'changed' ][ name ] = _changedFields( oldNodes[ name ][ 'content' ], newNodes[ name ][ 'content' ] )
+
+    for name in removed - moved:
+
+        _moduleChanges( changes, oldNodes[ name ][ 'module' ] )[ 'removed' ].append( name )
+
+    for name in added - moved:
+
+        _moduleChanges( changes, newNodes[ name ][ 'module' ] )[ 'added' ].append( name )
+
+    for moduleChanges in changes.values():
+
+        moduleChanges[ 'added' ].sort()
+        moduleChanges[ 'removed' ].sort()
+
+    return changes
+
+def compareFolders( oldFolder, newFolder ):
+
+    """
+    compare digests of the same file name in two folders, like digests of a character library before and after a change
+
+    @param oldFolder : str, folder of previous digests
+    @param newFolder : str, folder of new digests
+    @return : dict, changes returned by compare() by digest file name, None for digests missing in one of the folders
+    """
+
+    names = set( n for folder in [ oldFolder, newFolder ] for n in os.listdir( folder ) if n.endswith( digestSuffix ) )
+    result = {}
+
+    for name in sorted( names ):
+
+        oldPath, newPath = os.path.join( oldFolder, name ), os.path.join( newFolder, name )
+
+        if not os.path.isfile( oldPath ) or not os.path.isfile( newPath ):
+
+            result[ name ] = None
+            continue
+
+        result[ name ] = compare( load( oldPath ), load( newPath ) )
+
+    return result
+
+def formatReport( changes, verbose = False ):
+
+    """
+    @param changes : dict, changes by module returned by compare()
+    @param verbose : bool, list node names and changed fields, counts by module only when False
+    @return : list( str ), report lines, empty when rigs match
+    """
+
+    lines = []
+
+    for module in sorted( changes ):
+
+        moduleChanges = changes[ module ]
+        lines.append( '%-24s %5d added %5d removed %5d changed' % ( module, len( moduleChanges[ 'added' ] ),
+                                                                   len( moduleChanges[ 'removed' ] ), len( moduleChanges[ 'changed' ] ) ) )
+
+        if not verbose:
+
+            continue
+
+        lines.extend( '    + %s' % name for name in moduleChanges[ 'added' ] )
+        lines.extend( '    - %s' % name for name in moduleChanges[ 'removed' ] )
+        lines.extend( '    ~ %s : %s' % ( name, ', '.join( fields ) ) for name, fields in sorted( moduleChanges[ 'changed' ].items() ) )
+
+    return lines
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when rigs differ
+    """
+
+    parser = argparse.ArgumentParser( description = 'structural diff of rig digests' )
+    parser.add_argument( 'old', help = 'digest file or folder of digests of previous rigs' )
+    parser.add_argument( 'new', help = 'digest file or folder of digests of new rigs' )
+    parser.add_argument( '-v', '--verbose', action = 'store_true', help = 'list changed nodes' )
+    args = parser.parse_args( argv )
+
+    if os.path.isdir( args.old ):
+
+        results = compareFolders( args.old, args.new )
+
+    else:
+
+        results = { os.path.basename( args.new ): compare( load( args.old ), load( args.new ) ) }
+
+    lines = []
+    differ = 0
+
+    for name, changes in sorted( results.items() ):
+
+        if changes is None:
+
+            lines.append( '%s : missing in one folder' % name )
+
+        elif changes:
+
+            lines.append( '%s :' % name )
+            lines.extend( '    ' + line for line in formatReport( changes, verbose = args.verbose ) )
+
+        differ += changes != {}
+
+    lines.append( '%d of %d rigs differ' % ( differ, len( results ) ) )
+    sys.stdout.write( '\n'.join( lines ) + '\n' )
+
+    return 1 if differ else 0
+
+def _content( path, nodeType, parent, localMatrix, isShape, precision ):
+
+    # attributes are read by short name, rigLib node names are unique
+
+    name = path.rpartition( '|' )[2]
+    locked = mc.listAttr( path, l = 1 ) or []
+    attrNames = set( locked )
+
+    for flags in [ { 'k': 1 }, { 'cb': 1 }, { 'ud': 1 } ]:
+
+        attrNames.update( mc.listAttr( path, **flags ) or [] )
+
+    attrNames.update( _displayAttrs )
+
+    # build records hold input hashes and the rigLib code version, not rig structure
+
+    attrNames.discard( incremental.recordAttr )
+
+    if not isShape:
+
+        attrNames.add( 'inheritsTransform' )
+
+    connectionValues = mc.listConnections( path, s = 1, d = 0, c = 1, p = 1 ) or []
+
+    content = {
+        'name': name,
+        'type': nodeType,
+        'parent': parent,
+        'attrs': dict( ( at, _rounded( mc.getAttr( path + '.' + at ), precision ) ) for at in attrNames ),
+        'locked': sorted( locked ),
+        'connections': dict( ( d.partition( '.' )[2], s ) for d, s in zip( connectionValues[ ::2 ], connectionValues[ 1::2 ] ) )
+        }
+
+    if localMatrix is not None:
+
+        content[ 'matrix' ] = _rounded( localMatrix, precision )
+
+    if nodeType == 'nurbsCurve':
+
+        content[ 'cvs' ] = _rounded( mc.getAttr( path + '.cv[*]' ), precision )
+
+    return content
+
+def _rounded( value, precision ):
+
+    if isinstance( value, float ):
+
+        # negative zero hashes like zero
+
+        return round( value, precision ) + 0.0
+
+    if isinstance( value, ( list, tuple ) ):
+
+        return [ _rounded( v, precision ) for v in value ]
+
+    return value
+
+def _hash( value ):
+
+    return hashlib.sha1( json.dumps( value, sort_keys = True ).encode( 'utf-8' ) ).hexdigest()
+
+def _subtrees( nodes, roots ):
+
+    pending = list( roots )
+
+    while pending:
+
+        name = pending.pop()
+        pending.extend( nodes[ name ][ 'children' ] )
+
+        yield name
+
+def _moduleChanges( changes, module ):
+
+    if module not in changes:
+
+        changes[ module ] = { 'added': [], 'removed': [], 'changed': {} }
+
+    return changes[ module ]
+
+def _changedFields( oldContent, newContent ):
+
+    fields = []
+
+    for key in sorted( set( oldContent ) | set( newContent ) ):
+
+        oldValue, newValue = oldContent.get( key ), newContent.get( key )
+
+        if isinstance( oldValue, dict ) and isinstance( newValue, dict ):
+
+            fields.extend( '%s.%s' % ( key, k ) for k in sorted( set( oldValue ) | set( newValue ) ) if oldValue.get( k ) != newValue.get( k ) )
+
+        elif oldValue != newValue:
+
+            fields.append( key )
+
+    return fields
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
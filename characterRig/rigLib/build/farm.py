@@ -0,0 +1,398 @@
+"""
+farm @ build
+build rigs of many characters in a pool of worker processes
+
+command line, run from the characterRig folder :
+
+    python -m rigLib.build.farm manifest.json -w 8 -t 600 -r 1 -o report.json
+
+manifest is a JSON file :
+
+    {
+        "builder": "charactertNameRig.characterName",
+        "jobs": [
+            { "scene": "scenes/hero_skeleton.ma", "character": "hero", "spec": "specs/hero.json" },
+            { "scene": "scenes/crowd01_skeleton.ma", "character": "crowd01", "output": "rigs/crowd01_rig.ma", "timeout": 120 },
+            { "scene": "scenes/villain_skeleton.ma", "character": "villain", "digest": "digests/villain.rigdigest" }
+        ]
+    }
+
+builder is a module with a Build( characterName, rigSpec = None ) function,
+spec is optional, output defaults to the scene path with a _rig suffix and
+relative paths are relative to the manifest. Jobs with a digest path also
+write the build.diff digest of the rig, to compare with earlier builds. Each worker opens the job
+scene, builds the rig and saves it to the output path. Jobs running longer
+than their timeout get their worker killed and replaced, failed jobs are
+retried and a summary report of timings and failures is written at the end
+"""
+
+import argparse
+import collections
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+
+from .. import backend
+from ..backend import cmds as mc
+from ..backend import mayaCmds
+from ..base import shapeCache
+
+from . import diff
+from . import spec
+
+defaultBuilder = 'charactertNameRig.characterName'
+
+def loadManifest( manifestPath ):
+
+    """
+    load manifest and resolve its paths
+
+    @param manifestPath : str, path of JSON manifest
+    @return : tuple( str, list( dict ) ), builder module name and jobs
+    """
+
+    with open( manifestPath ) as manifestFile:
+
+        manifest = json.load( manifestFile )
+
+    if isinstance( manifest, list ):
+
+        manifest = { 'jobs': manifest }
+
+    manifestDir = os.path.dirname( os.path.abspath( manifestPath ) )
+    jobs = []
+
+    for i, job in enumerate( manifest.get( 'jobs', [] ) ):
+
+        if not job.get( 'scene' ) or not job.get( 'character' ):
+
+            raise ValueError( 'manifest job %d needs "scene" and "character"' % i )
+
+        job = dict( job )
+
+        for key in [ 'scene', 'spec', 'output', 'digest' ]:
+
+            if job.get( key ):
+
+                job[ key ] = os.path.join( manifestDir, job[ key ] )
+
+        if not job.get( 'output' ):
+
+            sceneStem, sceneExt = os.path.splitext( job[ 'scene' ] )
+            job[ 'output' ] = sceneStem + '_rig' + sceneExt
+
+        jobs.append( job )
+
+    return manifest.get( 'builder', defaultBuilder ), jobs
+
+def buildJob( job, builder = defaultBuilder ):
+
+    """
+    build one character in current session : open scene, build rig, save output scene and optional rig digest
+
+    @param job : dict, manifest job
+    @param builder : str, name of module with Build function
+    @return : dict, number of nodes in built scene
+    """
+
+    builderModule = importlib.import_module( builder )
+    rigSpec = spec.load( job[ 'spec' ] ) if job.get( 'spec' ) else None
+
+    mc.file( job[ 'scene' ], o = 1, f = 1 )
+    shapeCache.clear()
+
+    builderModule.Build( job[ 'character' ], rigSpec = rigSpec )
+
+    if job.get( 'digest' ):
+
+        diff.export( job[ 'character' ] + '_rig_GRP', job[ 'digest' ] )
+
+    fileType = 'mayaBinary' if job[ 'output' ].endswith( '.mb' ) else 'mayaAscii'
+
+    mc.file( rename = job[ 'output' ] )
+    mc.file( save = 1, type = fileType )
+
+    return { 'nodes': len( mc.ls() ) }
+
+def run( jobs, builder = defaultBuilder, workers = None, timeout = 600.0, retries = 1, log = None ):
+
+    """
+    build jobs in worker processes
+
+    @param jobs : list( dict ), manifest jobs
+    @param builder : str, name of module with Build function
+    @param workers : int, number of worker processes, number of CPUs by default
+    @param timeout : float, default seconds a job may run before its worker is killed
+    @param retries : int, number of times failed jobs are built again
+    @param log : function, optional, called with a line of text when a job is done
+    @return : dict, report with one entry per job and a summary
+    """
+
+    workers = max( 1, min( workers or multiprocessing.cpu_count(), len( jobs ) or 1 ) )
+    results = multiprocessing.Queue()
+    pool = [ _Worker( i, builder, results ) for i in range( workers ) ]
+    pending = collections.deque( ( i, 1 ) for i in range( len( jobs ) ) )
+    entries = [ None ] * len( jobs )
+    startTime = time.time()
+
+    try:
+
+        while pending or any( w.job is not None for w in pool ):
+
+            for worker in pool:
+
+                if worker.job is None and pending:
+
+                    jobIndex, attempt = pending.popleft()
+                    worker.start( jobIndex, attempt, jobs[ jobIndex ] )
+
+            try:
+
+                message = results.get( timeout = 0.2 )
+
+            except queue.Empty:
+
+                message = None
+
+            finished = []
+
+            if message:
+
+                workerId, generation, jobIndex, outcome = message
+                worker = pool[ workerId ]
+
+                # results of killed processes are dropped
+
+                if worker.generation == generation and worker.job == jobIndex:
+
+                    finished.append( ( worker, outcome ) )
+
+            for worker in pool:
+
+                if worker.job is None or any( w is worker for w, _ in finished ):
+
+                    continue
+
+                limit = jobs[ worker.job ].get( 'timeout', timeout )
+
+                if time.time() - worker.started > limit:
+
+                    finished.append( ( worker, { 'status': 'timeout', 'error': 'no result after %.0f seconds' % limit } ) )
+                    worker.restart()
+
+                elif not worker.isAlive():
+
+                    finished.append( ( worker, { 'status': 'failed', 'error': 'worker process exited with code %s' % worker.exitCode() } ) )
+                    worker.restart()
+
+            for worker, outcome in finished:
+
+                jobIndex, attempt = worker.job, worker.attempt
+                outcome.setdefault( 'time', time.time() - worker.started )
+                worker.job = None
+
+                entry = _reportEntry( jobs[ jobIndex ], outcome, attempt )
+                entries[ jobIndex ] = entry
+
+                if entry[ 'status' ] != 'ok' and attempt <= retries:
+
+                    pending.append( ( jobIndex, attempt + 1 ) )
+
+                if log:
+
+                    log( '%-8s %-24s %8.1fs  attempt %d%s' % ( entry[ 'status' ], entry[ 'character' ], entry[ 'time' ],
+                                                              attempt, '  ' + entry[ 'error' ].splitlines()[-1] if entry[ 'error' ] else '' ) )
+
+    finally:
+
+        for worker in pool:
+
+            worker.stop()
+
+    return { 'jobs': entries, 'summary': _summary( entries, time.time() - startTime, workers ) }
+
+def formatReport( report ):
+
+    """
+    @param report : dict, report returned by run()
+    @return : str, readable summary of report
+    """
+
+    summary = report[ 'summary' ]
+    lines = [ 'built %d of %d characters in %.1fs with %d workers, %.1fs of build time' % (
+                    summary[ 'ok' ], summary[ 'jobs' ], summary[ 'wallTime' ], summary[ 'workers' ], summary[ 'buildTime' ] ) ]
+
+    if summary[ 'jobs' ]:
+
+        lines.append( 'job time min %.1fs, mean %.1fs, max %.1fs' % ( summary[ 'minTime' ], summary[ 'meanTime' ], summary[ 'maxTime' ] ) )
+
+    for entry in report[ 'jobs' ]:
+
+        if entry[ 'status' ] != 'ok':
+
+            lines.append( '%s %s after %d attempts : %s' % ( entry[ 'character' ], entry[ 'status' ], entry[ 'attempts' ],
+                                                              entry[ 'error' ].strip().splitlines()[-1] ) )
+
+    return '\n'.join( lines )
+
+def main( argv = None ):
+
+    """
+    command line entry point
+
+    @param argv : list( str ), command line arguments, sys.argv by default
+    @return : int, exit code, 1 when a job failed
+    """
+
+    parser = argparse.ArgumentParser( description = 'build rigs of characters listed in manifest' )
+    parser.add_argument( 'manifest', help = 'JSON manifest of jobs' )
+    parser.add_argument( '-w', '--workers', type = int, default = None, help = 'number of worker processes' )
+    parser.add_argument( '-t', '--timeout', type = float, default = 600.0, help = 'seconds per job before its worker is killed' )
+    parser.add_argument( '-r', '--retries', type = int, default = 1, help = 'number of retries of failed jobs' )
+    parser.add_argument( '-b', '--builder', default = None, help = 'module with Build function, overrides manifest' )
+    parser.add_argument( '-o', '--report', default = None, help = 'path of JSON report' )
+    args = parser.parse_args( argv )
+
+    builder, jobs = loadManifest( args.manifest )
+
+    report = run( jobs, builder = args.builder or builder, workers = args.workers, timeout = args.timeout,
+                  retries = args.retries, log = _log )
+
+    if args.report:
+
+        with open( args.report, 'w' ) as reportFile:
+
+            json.dump( report, reportFile, indent = 2 )
+
+    _log( formatReport( report ) )
+
+    return 0 if report[ 'summary' ][ 'failed' ] == 0 else 1
+
+class _Worker():
+
+    # worker process with its own job queue, so a job can be traced to the process running it
+
+    def __init__( self, workerId, builder, results ):
+
+        self.workerId = workerId
+        self.builder = builder
+        self.results = results
+        self.job = None
+        self.attempt = 0
+        self.started = 0.0
+        self.generation = 0
+        self._launch()
+
+    def _launch( self ):
+
+        self.generation += 1
+        self.jobs = multiprocessing.Queue()
+        self.process = multiprocessing.Process( target = _workerLoop,
+                                                args = ( self.workerId, self.generation, self.builder, self.jobs, self.results ) )
+        self.process.daemon = True
+        self.process.start()
+
+    def start( self, jobIndex, attempt, job ):
+
+        self.job = jobIndex
+        self.attempt = attempt
+        self.started = time.time()
+        self.jobs.put( ( jobIndex, job ) )
+
+    def isAlive( self ):
+
+        return self.process.is_alive()
+
+    def exitCode( self ):
+
+        return self.process.exitcode
+
+    def restart( self ):
+
+        self.process.terminate()
+        self.process.join( 5.0 )
+        self._launch()
+
+    def stop( self ):
+
+        if self.process.is_alive():
+
+            self.jobs.put( None )
+            self.process.join( 5.0 )
+
+        if self.process.is_alive():
+
+            self.process.terminate()
+
+def _workerLoop( workerId, generation, builder, jobs, results ):
+
+    if isinstance( backend.getBackend(), mayaCmds.MayaBackend ):
+
+        backend.getBackend().standalone()
+
+    while True:
+
+        message = jobs.get()
+
+        if message is None:
+
+            return
+
+        jobIndex, job = message
+        startTime = time.time()
+
+        try:
+
+            outcome = buildJob( job, builder = builder )
+            outcome[ 'status' ] = 'ok'
+
+        except Exception:
+
+            outcome = { 'status': 'failed', 'error': traceback.format_exc() }
+
+        outcome[ 'time' ] = time.time() - startTime
+        results.put( ( workerId, generation, jobIndex, outcome ) )
+
+def _reportEntry( job, outcome, attempt ):
+
+    return {
+        'character': job[ 'character' ],
+        'scene': job[ 'scene' ],
+        'output': job[ 'output' ],
+        'status': outcome[ 'status' ],
+        'attempts': attempt,
+        'time': outcome[ 'time' ],
+        'nodes': outcome.get( 'nodes' ),
+        'error': outcome.get( 'error', '' )
+        }
+
+def _summary( entries, wallTime, workers ):
+
+    times = [ e[ 'time' ] for e in entries ]
+
+    return {
+        'jobs': len( entries ),
+        'ok': len( [ e for e in entries if e[ 'status' ] == 'ok' ] ),
+        'failed': len( [ e for e in entries if e[ 'status' ] != 'ok' ] ),
+        'retried': len( [ e for e in entries if e[ 'attempts' ] > 1 ] ),
+        'workers': workers,
+        'wallTime': wallTime,
+        'buildTime': sum( times ),
+        'minTime': min( times ) if times else 0.0,
+        'meanTime': sum( times ) / len( times ) if times else 0.0,
+        'maxTime': max( times ) if times else 0.0
+        }
+
+def _log( line ):
+
+    sys.stdout.write( line + '\n' )
+    sys.stdout.flush()
+
+if __name__ == '__main__':
+
+    sys.exit( main() )
@@ -0,0 +1,286 @@
+"""
+incremental @ build
+rebuild only the rig modules whose inputs changed since the last build
+
+each module build is fingerprinted from its spec entry, rig scale, world
+matrices of the joints and locators it reads and the rigLib source code.
+The fingerprint, the nodes the build created outside its module group, its
+outputs and its attach constraints are stored as a JSON string attribute on
+the module top group. On rebuild, modules with the same fingerprint are
+kept, changed ones are torn down and built again and modules attached to
+rebuilt ones get their attach constraints rewired. Changed modules are
+built from a build.cache BuildCache when one is given
+"""
+
+import hashlib
+import json
+import os
+
+from ..backend import cmds as mc
+
+from ..utils import joint
+
+from . import scheduler
+from . import spec
+
+recordAttr = 'rigBuildRecord'
+
+_codeVersion = []
+
+def codeVersion():
+
+    """
+    @return : str, hash of rigLib source files, computed once per session
+    """
+
+    if not _codeVersion:
+
+        rigLibPath = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+        sourceHash = hashlib.sha1()
+
+        for dirPath, dirNames, fileNames in sorted( os.walk( rigLibPath ) ):
+
+            dirNames.sort()
+
+            for fileName in sorted( fileNames ):
+
+                if fileName.endswith( '.py' ):
+
+                    with open( os.path.join( dirPath, fileName ), 'rb' ) as sourceFile:
+
+                        sourceHash.update( sourceFile.read() )
+
+        _codeVersion.append( sourceHash.hexdigest() )
+
+    return _codeVersion[0]
+
+def inputObjects( moduleSpec, skeleton = None ):
+
+    """
+    list scene objects module build reads, joints of limb modules come with their descendants
+
+    @param moduleSpec : dict, module entry of rig spec
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional
+    @return : list( str ), sorted names of existing input objects
+    """
+
+    names = set()
+
+    for value in moduleSpec.get( 'args', {} ).values():
+
+        values = value if isinstance( value, list ) else [ value ]
+        names.update( v for v in values if isinstance( v, str ) and v )
+
+    existing = set( mc.ls( sorted( names ) ) ) if names else set()
+
+    if moduleSpec[ 'type' ] in scheduler.skeletonModuleTypes:
+
+        for name in list( existing ):
+
+            if skeleton and name in skeleton:
+
+                existing.update( skeleton.descendants( name ) )
+
+            elif mc.nodeType( name ) == 'joint':
+
+                existing.update( mc.listRelatives( name, ad = 1, type = 'joint' ) or [] )
+
+    return sorted( existing )
+
+def fingerprint( moduleSpec, rigScale = 1.0, skeleton = None ):
+
+    """
+    @param moduleSpec : dict, module entry of rig spec
+    @param rigScale : float, default scale factor for size of controls
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional
+    @return : str, hash of all module build inputs
+    """
+
+    names = inputObjects( moduleSpec, skeleton = skeleton )
+    worldValues = mc.xform( names, q = 1, ws = 1, m = 1 ) if names else []
+
+    inputs = {
+        'spec': moduleSpec,
+        'rigScale': rigScale,
+        'code': codeVersion(),
+        'objects': names,
+        'matrices': [ round( v, 6 ) + 0.0 for v in worldValues ]
+        }
+
+    return hashlib.sha1( json.dumps( inputs, sort_keys = True ).encode( 'utf-8' ) ).hexdigest()
+
+def readRecord( prefix ):
+
+    """
+    @param prefix : str, prefix of module
+    @return : dict, build record stored on module top group, None when module was not built
+    """
+
+    plug = prefix + '_Module_GRP.' + recordAttr
+
+    if not mc.objExists( plug ):
+
+        return None
+
+    return json.loads( mc.getAttr( plug ) )
+
+def writeRecord( topGrp, record ):
+
+    """
+    store build record on module top group
+
+    @param topGrp : str, module top group
+    @param record : dict, build record
+    @return : None
+    """
+
+    if not mc.objExists( topGrp + '.' + recordAttr ):
+
+        mc.addAttr( topGrp, ln = recordAttr, dt = 'string' )
+
+    mc.setAttr( topGrp + '.' + recordAttr, json.dumps( record ), type = 'string' )
+
+def teardown( prefix, record ):
+
+    """
+    delete module top group and nodes its build created elsewhere
+
+    @param prefix : str, prefix of module
+    @param record : dict, build record of module
+    @return : None
+    """
+
+    existing = mc.ls( record[ 'nodes' ] + [ prefix + '_Module_GRP' ] )
+
+    if existing:
+
+        mc.delete( existing )
+
+def build( rigSpec, baseRig = None, rigScale = 1.0, modules = None, skeleton = None, cache = None ):
+
+    """
+    build modules of rig spec, keeping modules whose fingerprint did not change
+
+    @param rigSpec : dict, rig spec
+    @param baseRig : instance of base.module.Base or base.module.ExistingBase class
+    @param rigScale : float, default scale factor for size of controls
+    @param modules : list( str ), optional names of modules to build with their dependencies, all by default
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional, indexed from spec root joint when not given
+    @param cache : build.cache.BuildCache, optional cache changed modules are built from
+    @return : dict, { 'results': build results or stored outputs by module name, 'built': list( str ),
+              'kept': list( str ), 'rewired': list( str ) }
+    """
+
+    graph = spec.BuildGraph( rigSpec, modules = modules )
+
+    if not skeleton:
+
+        skeleton = joint.SkeletonIndex( rigSpec.get( 'rootJoint', 'root_JNT' ) )
+
+    # compare fingerprints with stored records
+
+    hashes = {}
+    records = {}
+    changed = []
+
+    for moduleName in graph.order:
+
+        moduleSpec = graph.modules[ moduleName ]
+        prefix = scheduler.moduleArgs( moduleSpec )[ 'prefix' ]
+
+        hashes[ moduleName ] = fingerprint( moduleSpec, rigScale = rigScale, skeleton = skeleton )
+        records[ moduleName ] = readRecord( prefix )
+
+        if not records[ moduleName ] or records[ moduleName ][ 'hash' ] != hashes[ moduleName ]:
+
+            changed.append( moduleName )
+
+    # tear down changed modules, dependent modules first
+
+    for moduleName in reversed( changed ):
+
+        if records[ moduleName ]:
+
+            teardown( scheduler.moduleArgs( graph.modules[ moduleName ] )[ 'prefix' ], records[ moduleName ] )
+
+    # build changed modules in dependency order
+
+    results = {}
+    rewired = []
+    recordings = scheduler.mirrorRecordings( graph )
+
+    for moduleName in graph.order:
+
+        moduleSpec = graph.modules[ moduleName ]
+
+        if moduleName not in changed:
+
+            results[ moduleName ] = records[ moduleName ][ 'outputs' ]
+
+            if any( d in changed for d in graph.dependencies[ moduleName ] ):
+
+                _rewire( moduleSpec, records[ moduleName ], results )
+                rewired.append( moduleName )
+
+            continue
+
+        nodesBefore = set( mc.ls() )
+
+        kwargs = scheduler.moduleArgs( moduleSpec, baseRig = baseRig, rigScale = rigScale, skeleton = skeleton )
+
+        if cache:
+
+            result = cache.build( moduleName, moduleSpec, kwargs, hashes[ moduleName ] )
+
+        else:
+
+            result = scheduler.runBuild( moduleSpec, kwargs, recordings = recordings )
+        constraints = scheduler.attach( moduleSpec, result, results )
+
+        topGrp = result[ 'module' ].topGrp
+        moduleNodes = set( mc.listRelatives( topGrp, ad = 1 ) or [] ) | set( [ topGrp ] )
+        outsideNodes = [ n for n in mc.ls() if n not in nodesBefore and n not in moduleNodes ]
+
+        writeRecord( topGrp, {
+                            'hash': hashes[ moduleName ],
+                            'nodes': sorted( outsideNodes ),
+                            'outputs': _outputNames( result ),
+                            'attach': constraints
+                            } )
+
+        results[ moduleName ] = result
+
+    return { 'results': results, 'built': changed, 'kept': [ n for n in graph.order if n not in changed ], 'rewired': rewired }
+
+def _rewire( moduleSpec, record, results ):
+
+    existing = mc.ls( record[ 'attach' ] )
+
+    if existing:
+
+        mc.delete( existing )
+
+    record[ 'attach' ] = scheduler.attach( moduleSpec, record[ 'outputs' ], results )
+    writeRecord( record[ 'outputs' ][ 'module' ], record )
+
+def _outputNames( result ):
+
+    # build results as names, controls by their control object, module by its top group
+
+    outputs = {}
+
+    for key, value in result.items():
+
+        if hasattr( value, 'topGrp' ):
+
+            outputs[ key ] = value.topGrp
+
+        elif hasattr( value, 'C' ):
+
+            outputs[ key ] = value.C
+
+        elif isinstance( value, str ):
+
+            outputs[ key ] = value
+
+    return outputs
@@ -0,0 +1,132 @@
+"""
+lod @ build
+level of detail variants of a rig spec
+
+lower levels drop whole sub-setups from the spec before it is built,
+instead of building them and hiding them :
+
+    full            every module as described by the spec
+    noFingers       arm finger controls and leg additional toe setups are not built
+    limbsOnly       noFingers, arm and leg modules only
+    rootOnly        no modules, the skeleton follows the global controls
+
+joints of dropped setups are not constrained one by one, they follow their
+parents in the skeleton. From limbsOnly down the root joint itself is
+parent constrained to the modules group, below the global controls, and
+attach drivers of kept modules taken from dropped modules are replaced by
+the root joint :
+
+    lodSpec = lod.apply( rigSpec, 'limbsOnly' )
+    incremental.build( lodSpec, baseRig = baseRig )
+    lod.constrainRoot( lodSpec, 'limbsOnly', baseRig )
+"""
+
+import copy
+
+from ..backend import cmds as mc
+from ..backend import telemetry
+
+from . import spec
+
+levels = [ 'full', 'noFingers', 'limbsOnly', 'rootOnly' ]
+
+limbModuleTypes = [ 'arm', 'leg' ]
+
+# module args dropping detail setups from noFingers down
+
+detailArgs = {
+    'arm': { 'fingers': False },
+    'leg': { 'additionnalToeJoints': False }
+    }
+
+def _checkLevel( level ):
+
+    if level not in levels:
+
+        raise ValueError( 'unknown rig level of detail %s, expected one of %s' % ( level, ', '.join( levels ) ) )
+
+def apply( rigSpec, level ):
+
+    """
+    @param rigSpec : dict, rig spec
+    @param level : str, level of detail, one of levels
+    @return : dict, copy of rig spec reduced to level of detail, rig spec itself for full
+    """
+
+    _checkLevel( level )
+
+    if level == 'full':
+
+        return rigSpec
+
+    rank = levels.index( level )
+    lodSpec = copy.deepcopy( rigSpec )
+    rootJoint = lodSpec.get( 'rootJoint', 'root_JNT' )
+
+    for moduleSpec in lodSpec[ 'modules' ]:
+
+        moduleType = moduleSpec[ 'type' ]
+
+        if rank >= levels.index( 'rootOnly' ) or ( rank >= levels.index( 'limbsOnly' ) and moduleType not in limbModuleTypes ):
+
+            moduleSpec[ 'enabled' ] = False
+            continue
+
+        moduleSpec.setdefault( 'args', {} ).update( detailArgs.get( moduleType, {} ) )
+
+    # kept modules attached to dropped ones follow the root joint
+
+    dropped = set( m[ 'name' ] for m in lodSpec[ 'modules' ] if not m.get( 'enabled', True ) )
+
+    for moduleSpec in lodSpec[ 'modules' ]:
+
+        for attachSpec in moduleSpec.get( 'attach', [] ):
+
+            driver = attachSpec[ 'driver' ]
+
+            if isinstance( driver, dict ) and driver[ 'module' ] in dropped:
+
+                attachSpec[ 'driver' ] = rootJoint
+
+        moduleSpec[ 'after' ] = [ name for name in moduleSpec.get( 'after', [] ) if name not in dropped ]
+
+    spec.validate( lodSpec )
+
+    return lodSpec
+
+def needsRootConstraint( level ):
+
+    """
+    @param level : str, level of detail, one of levels
+    @return : bool, True when root joint is not driven by any module at level and needs the root constraint
+    """
+
+    _checkLevel( level )
+
+    return levels.index( level ) >= levels.index( 'limbsOnly' )
+
+def constrainRoot( rigSpec, level, baseRig ):
+
+    """
+    constrain root joint to modules group when its driving modules are dropped at level
+
+    @param rigSpec : dict, rig spec
+    @param level : str, level of detail, one of levels
+    @param baseRig : instance of base.module.Base or base.module.ExistingBase class
+    @return : str, root constraint, None when modules drive root joint
+    """
+
+    if not needsRootConstraint( level ):
+
+        return None
+
+    return mc.parentConstraint( baseRig.modulesGrp, rigSpec.get( 'rootJoint', 'root_JNT' ), mo = 1 )[0]
+
+def nodeCounts( topGrp ):
+
+    """
+    @param topGrp : str, rig top group, like characterName_rig_GRP
+    @return : dict, { 'nodes', 'joints', 'controls', 'constraints', 'ikHandles' } counts of nodes below top group
+    """
+
+    return telemetry.nodeCounts( topGrp )
@@ -0,0 +1,462 @@
+"""
+mirror @ build
+build one side of a symmetric limb and replay it reflected for the other side
+
+a module entry of the rig spec naming a "mirror" source module is built by
+replaying the commands recorded while its source was built, instead of
+running its build function again :
+
+    { "name": "r_arm", "type": "arm", "args": { ... }, "mirror": "l_arm" }
+
+the replay renames l_ objects to r_ ( or the other way ), reflects all world
+space positions, rotations and matrices across the YZ plane in one pass and
+swaps control colors by side, scene queries of the build are not run again.
+Rotations are reflected the way the skeleton was mirrored, by orientation
+or by behavior, as found on the module joints. Modules whose args are not
+the mirror of their source args, whose input joints and locators are not
+mirror images, or whose source set transforms in object space are built
+normally
+"""
+
+import copy
+import math
+
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import getBackend
+from ..backend import profiler
+from ..backend import telemetry
+from ..backend import useBackend
+
+from ..base import control
+
+from ..utils import matrix
+
+# commands and flags to tell queries from edits and find node names in arguments
+
+queryCommands = [ 'objExists', 'ls', 'listRelatives', 'listConnections', 'listAttr', 'getAttr', 'attributeQuery', 'nodeType' ]
+nameQueryCommands = [ 'ls', 'listRelatives', 'listConnections' ]
+nodeFlags = [ 'p', 'parent', 'sj', 'startJoint', 'ee', 'endEffector', 'c', 'curve', 'wn', 'weightedNode' ]
+
+# world space values reflected on replay
+
+_pointFlags = [ 't', 'translation', 'rp', 'rotatePivot', 'sp', 'scalePivot' ]
+_rotationFlags = [ 'ro', 'rotation' ]
+_matrixFlags = [ 'm', 'matrix' ]
+
+# object space transform edits make a recording unsafe to mirror
+
+_localAttrs = set( [ 't', 'tx', 'ty', 'tz', 'translate', 'translateX', 'translateY', 'translateZ',
+                     'r', 'rx', 'ry', 'rz', 'rotate', 'rotateX', 'rotateY', 'rotateZ',
+                     'jo', 'jox', 'joy', 'joz', 'jointOrient', 'rp', 'rotatePivot' ] )
+_localCommands = [ 'move', 'rotate' ]
+
+_colorAttrs = [ 'ovc', 'overrideColor' ]
+
+tolerance = 1e-3
+
+class Recorder():
+
+    """
+    class forwarding commands to wrapped backend and recording edits and name queries for replay
+    """
+
+    def __init__( self, backend ):
+
+        """
+        @param backend : backend to issue commands to
+        @return : None
+        """
+
+        self.backend = backend
+        self.commands = []
+        self.mirrorable = True
+
+    def __getattr__( self, commandName ):
+
+        if commandName.startswith( '_' ):
+
+            raise AttributeError( commandName )
+
+        command = getattr( self.backend, commandName )
+
+        def recorded( *args, **kwargs ):
+
+            result = command( *args, **kwargs )
+            query = commandName in queryCommands or kwargs.get( 'q' ) or kwargs.get( 'query' )
+
+            if not query and _localEdit( commandName, args, kwargs ):
+
+                self.mirrorable = False
+
+            if not query or commandName in nameQueryCommands:
+
+                self.commands.append( ( commandName, copy.deepcopy( args ), copy.deepcopy( kwargs ), copy.deepcopy( result ) ) )
+
+            return result
+
+        return recorded
+
+def record( buildFunction, kwargs ):
+
+    """
+    run module build while recording the commands it issues
+
+    @param buildFunction : function, module build function
+    @param kwargs : dict, keyword arguments of build function
+    @return : tuple( dict, Recorder ), build result and recorder
+    """
+
+    recorder = Recorder( getBackend() )
+
+    with useBackend( recorder ):
+
+        result = buildFunction( **kwargs )
+
+    return result, recorder
+
+def mirrorName( name, sides ):
+
+    """
+    @param name : str, node name, path or plug
+    @param sides : tuple( str, str ), source and target side prefixes, like ( 'l_', 'r_' )
+    @return : str, name with source side prefix of each node swapped for target side prefix
+    """
+
+    node, dot, attr = name.partition( '.' )
+    parts = [ sides[1] + p[ len( sides[0] ): ] if p.startswith( sides[0] ) else p for p in node.split( '|' ) ]
+
+    return '|'.join( parts ) + dot + attr
+
+def reflectPoint( point ):
+
+    """
+    @param point : list( float ), world position
+    @return : list( float ), position reflected across YZ plane
+    """
+
+    return [ -point[0], point[1], point[2] ]
+
+def reflectMatrix( m, behavior = False ):
+
+    """
+    reflect world matrix across YZ plane
+
+    @param m : list( float ), world matrix
+    @param behavior : bool, negate axes like behavior mirrored joints, axes are reflected like orientation mirror otherwise
+    @return : list( float ), reflected matrix, keeping a right handed frame
+    """
+
+    result = list( m )
+
+    for row in range( 3 ):
+
+        for col in range( 3 ):
+
+            flip = ( col != 0 ) if behavior else ( ( row == 0 ) != ( col == 0 ) )
+            result[ row * 4 + col ] = -m[ row * 4 + col ] if flip else m[ row * 4 + col ]
+
+    result[ 12 ] = -m[ 12 ]
+
+    return result
+
+def mirrorSides( sourcePrefix, targetPrefix ):
+
+    """
+    @param sourcePrefix : str, prefix of source module, like l_arm
+    @param targetPrefix : str, prefix of mirrored module, like r_arm
+    @return : tuple( str, str ), source and target side prefixes, None when prefixes are not opposite sides
+    """
+
+    for side in control.sideColors:
+
+        for otherSide in control.sideColors:
+
+            if side != otherSide and sourcePrefix.startswith( side ) and targetPrefix == otherSide + sourcePrefix[ len( side ): ]:
+
+                return side, otherSide
+
+    return None
+
+def rotationMode( sourceNames, targetNames ):
+
+    """
+    find how the skeleton was mirrored from world matrices of source and target objects
+
+    @param sourceNames : list( str ), source side objects
+    @param targetNames : list( str ), target side objects, in same order
+    @return : bool, True for behavior mirror, False for orientation mirror, None when objects are not mirror images
+    """
+
+    if not sourceNames:
+
+        return False
+
+    sourceValues = mc.xform( sourceNames, q = 1, ws = 1, m = 1 )
+    targetValues = mc.xform( targetNames, q = 1, ws = 1, m = 1 )
+    joints = set( mc.ls( sourceNames, type = 'joint' ) or [] )
+    modes = [ False, True ]
+
+    for i in range( len( sourceNames ) ):
+
+        source = sourceValues[ i * 16:i * 16 + 16 ]
+        target = targetValues[ i * 16:i * 16 + 16 ]
+        size = max( 1.0, max( abs( v ) for v in source[ 12:15 ] ) )
+
+        if _distance( reflectPoint( source[ 12:15 ] ), target[ 12:15 ] ) > tolerance * size:
+
+            return None
+
+        # only joint orientations matter, locators are read for positions
+
+        if sourceNames[i] in joints:
+
+            modes = [ mode for mode in modes if _distance( reflectMatrix( source, mode )[ :12 ], target[ :12 ] ) < tolerance ]
+
+    return modes[0] if modes else None
+
+@telemetry.reported
+@profiler.profiled
+def replay( recorder, prefix, sides, behavior = False ):
+
+    """
+    replay recorded build of source module for the mirrored module
+
+    @param recorder : Recorder, recorder of source module build
+    @param prefix : str, prefix of mirrored module
+    @param sides : tuple( str, str ), source and target side prefixes, like ( 'l_', 'r_' )
+    @param behavior : bool, reflect rotations like behavior mirrored joints
+    @return : dict, names of source nodes mapped to names of nodes made by replay when they differ from mirrored names
+    """
+
+    commands = _reflected( recorder.commands, behavior, sides )
+    names = {}
+    sourceNodes = set()
+
+    with batch.batched():
+
+        for commandName, args, kwargs, result in commands:
+
+            nodes = _nodeNames( args, kwargs )
+
+            # commands on shared nodes only, like control shape templates, are not replayed
+
+            if not any( n.startswith( sides[0] ) or n in sourceNodes for n in nodes ):
+
+                continue
+
+            newArgs = _renamed( args, names, sides )
+            newKwargs = dict( ( k, _renamed( v, names, sides ) if k in nodeFlags or k in [ 'n', 'name' ] else v ) for k, v in kwargs.items() )
+            newResult = getattr( mc, commandName )( *newArgs, **newKwargs )
+
+            # renamed and deleted nodes free their names for nodes made later
+
+            if commandName in [ 'rename', 'delete' ]:
+
+                for old in _flatten( args[ :1 ] if commandName == 'rename' else args ):
+
+                    sourceNodes.discard( old.split( '|' )[-1] )
+                    names.pop( old.split( '|' )[-1], None )
+
+            for old, new in zip( _flatten( [ result ] ), _flatten( [ newResult ] ) ):
+
+                if isinstance( old, str ) and isinstance( new, str ):
+
+                    old, new = old.split( '|' )[-1], new.split( '|' )[-1]
+                    sourceNodes.add( old )
+
+                    if mirrorName( old, sides ) != new:
+
+                        names[ old ] = new
+
+    return names
+
+def missingNodes( recorder, sides ):
+
+    """
+    @param recorder : Recorder, recorder of source module build
+    @param sides : tuple( str, str ), source and target side prefixes
+    @return : list( str ), mirrored names of existing nodes the replay needs which are not in the scene
+    """
+
+    created = set()
+    needed = set()
+
+    for commandName, args, kwargs, result in recorder.commands:
+
+        # rename takes the new name after the renamed node
+
+        nodes = _nodeNames( args[ :1 ] if commandName == 'rename' else args, dict( ( k, v ) for k, v in kwargs.items() if k in nodeFlags ) )
+        needed.update( mirrorName( n, sides ) for n in nodes if n not in created )
+        created.update( r.split( '|' )[-1] for r in _flatten( [ result ] ) if isinstance( r, str ) )
+
+    needed = sorted( needed )
+    existing = set( mc.ls( needed ) or [] ) if needed else set()
+
+    return [ n for n in needed if n not in existing ]
+
+def mirrorResult( result, names, sides ):
+
+    """
+    @param result : dict, build result of source module
+    @param names : dict, node names returned by replay()
+    @param sides : tuple( str, str ), source and target side prefixes
+    @return : dict, build result of mirrored module, modules and controls copied with their node names mirrored
+    """
+
+    mirrored = {}
+
+    for key, value in result.items():
+
+        if isinstance( value, str ):
+
+            mirrored[ key ] = _renamed( value, names, sides )
+
+        elif hasattr( value, '__dict__' ):
+
+            mirrored[ key ] = copy.copy( value )
+            mirrored[ key ].__dict__.update( ( k, _renamed( v, names, sides ) ) for k, v in value.__dict__.items() if isinstance( v, str ) )
+
+        else:
+
+            mirrored[ key ] = value
+
+    return mirrored
+
+def matchingArgs( sourceKwargs, kwargs, sides ):
+
+    """
+    @param sourceKwargs : dict, build arguments of source module
+    @param kwargs : dict, build arguments of mirrored module
+    @param sides : tuple( str, str ), source and target side prefixes
+    @return : bool, True when arguments are the source arguments with names mirrored, shared objects like baseRig aside
+    """
+
+    keys = set( sourceKwargs ) | set( kwargs )
+
+    return all( _renamed( sourceKwargs.get( k ), {}, sides ) == kwargs.get( k ) for k in keys if k not in [ 'baseRig', 'skeleton' ] )
+
+def inputObjects( kwargs ):
+
+    """
+    @param kwargs : dict, build arguments of module
+    @return : list( str ), existing joints and locators module build reads, joints with their descendant joints
+    """
+
+    names = set()
+
+    for key, value in kwargs.items():
+
+        if key != 'prefix':
+
+            names.update( v for v in _flatten( [ value ] ) if isinstance( v, str ) and v )
+
+    existing = set( mc.ls( sorted( names ) ) or [] ) if names else set()
+    skeleton = kwargs.get( 'skeleton' )
+
+    for name in set( mc.ls( sorted( existing ), type = 'joint' ) or [] ) if existing else []:
+
+        existing.update( skeleton.descendants( name ) if skeleton and name in skeleton else mc.listRelatives( name, ad = 1, type = 'joint' ) or [] )
+
+    return sorted( existing )
+
+def _reflected( commands, behavior, sides ):
+
+    # world space values of all commands reflected in one pass, control colors swapped by side
+
+    result = []
+
+    for commandName, args, kwargs, commandResult in commands:
+
+        kwargs = dict( kwargs )
+
+        if commandName == 'xform' and ( kwargs.get( 'ws' ) or kwargs.get( 'worldSpace' ) ):
+
+            for flag in kwargs:
+
+                if flag in _pointFlags:
+
+                    kwargs[ flag ] = reflectPoint( kwargs[ flag ] )
+
+                elif flag in _rotationFlags:
+
+                    kwargs[ flag ] = matrix.eulerFromRotation( reflectMatrix( matrix.rotation( kwargs[ flag ] ), behavior ) )
+
+                elif flag in _matrixFlags:
+
+                    kwargs[ flag ] = reflectMatrix( kwargs[ flag ], behavior )
+
+        elif commandName == 'curve':
+
+            for flag in [ 'p', 'point' ]:
+
+                if flag in kwargs:
+
+                    kwargs[ flag ] = [ reflectPoint( p ) for p in kwargs[ flag ] ]
+
+        elif commandName == 'setAttr' and args[0].partition( '.' )[2] in _colorAttrs and len( args ) > 1:
+
+            if args[1] == control.sideColors.get( sides[0] ):
+
+                args = ( args[0], control.sideColors[ sides[1] ] ) + tuple( args[ 2: ] )
+
+        result.append( ( commandName, args, kwargs, commandResult ) )
+
+    return result
+
+def _localEdit( commandName, args, kwargs ):
+
+    if commandName in _localCommands:
+
+        return True
+
+    if commandName == 'xform' and not ( kwargs.get( 'ws' ) or kwargs.get( 'worldSpace' ) ):
+
+        return any( f in kwargs for f in _pointFlags + _rotationFlags + _matrixFlags )
+
+    if commandName == 'setAttr' and len( args ) > 1:
+
+        return args[0].partition( '.' )[2] in _localAttrs
+
+    return False
+
+def _renamed( value, names, sides ):
+
+    if isinstance( value, str ):
+
+        node, dot, attr = value.partition( '.' )
+        parts = [ names.get( p, mirrorName( p, sides ) ) for p in node.split( '|' ) ]
+
+        return '|'.join( parts ) + dot + attr
+
+    if isinstance( value, ( list, tuple ) ):
+
+        return type( value )( _renamed( v, names, sides ) for v in value )
+
+    return value
+
+def _nodeNames( args, kwargs ):
+
+    values = _flatten( list( args ) + [ v for k, v in kwargs.items() if k in nodeFlags or k in [ 'n', 'name' ] ] )
+
+    return [ p for v in values if isinstance( v, str ) for p in v.partition( '.' )[0].split( '|' ) if p ]
+
+def _flatten( values ):
+
+    result = []
+
+    for value in values:
+
+        if isinstance( value, ( list, tuple ) ):
+
+            result.extend( _flatten( value ) )
+
+        else:
+
+            result.append( value )
+
+    return result
+
+def _distance( a, b ):
+
+    return math.sqrt( sum( ( x - y ) ** 2 for x, y in zip( a, b ) ) )
@@ -0,0 +1,541 @@
+"""
+plan @ build
+plan / apply split of rig module builds, with plans computed in parallel and a dry run
+
+the plan of a module is the list of commands its build issues, found by
+running the build function in a private in-memory sandbox scene seeded
+with copies of the objects it reads : input joints and locators with
+their descendant joints and parents, input curves and the base rig
+groups. Planning only queries the scene, so outside of an interactive
+Maya session, like in mayapy, plans of all modules can be computed at
+once in a pool of worker processes. Applying a plan issues
+its commands in the active scene in one batch, node names the scene
+makes unique differently than the sandbox are mapped on the way, then
+the module is attached to its drivers :
+
+    results = plan.build( rigSpec, baseRig = baseRig, workers = 4 )
+
+a dry run plans the base rig and all modules and prints node and command
+counts of each without touching the scene :
+
+    plan.dryRun( rigSpec, baseArgs = { 'characterName': 'hero', 'mainCtrlAttachObj': 'head_JNT' } )
+
+mirrored modules are planned like other modules, without replay of their
+mirror source
+"""
+
+import copy
+import multiprocessing
+import os
+import sys
+
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import memory
+from ..backend import telemetry
+from ..backend import useBackend
+
+from ..base import module
+from ..base import shapeCache
+
+from ..utils import joint
+from ..utils import matrix
+
+from . import mirror
+from . import scheduler
+from . import spec
+
+class Plan():
+
+    """
+    class holding the commands of one build and the nodes they make
+    """
+
+    def __init__( self, name, commands, result, nodes, temporary ):
+
+        """
+        @param name : str, name of planned module
+        @param commands : list( tuple( str, tuple, dict, object ) ), command name, arguments, flags and sandbox result of each command
+        @param result : build result in sandbox
+        @param nodes : dict, types of nodes made by build by name
+        @param temporary : list( str ), nodes made by build only to be copied, like control shape templates, deleted after apply
+        @return : None
+        """
+
+        self.name = name
+        self.commands = commands
+        self.result = result
+        self.nodes = nodes
+        self.temporary = temporary
+
+    def edits( self ):
+
+        """
+        @return : list( tuple ), commands changing the scene, name queries aside
+        """
+
+        return [ c for c in self.commands if not _query( c[0], c[2] ) ]
+
+    def counts( self ):
+
+        """
+        @return : dict, { 'nodes', 'commands', 'constraints', 'controls' } counts of plan
+        """
+
+        types = list( self.nodes.values() )
+
+        return {
+            'nodes': len( types ),
+            'commands': len( self.edits() ),
+            'constraints': len( [ t for t in types if t.endswith( 'Constraint' ) ] ),
+            'controls': len( [ n for n, t in self.nodes.items() if t == 'transform' and n.rpartition( '_' )[2].startswith( 'CTRL' ) ] )
+            }
+
+def seed( names ):
+
+    """
+    read objects and their parents from the active scene, objects not in the scene are seeded as empty groups
+
+    @param names : list( str ), names of objects a build reads
+    @return : list( dict ), { 'name', 'type', 'parent', 'matrix', 'points' } of each object, parents first
+    """
+
+    existing = set( mc.ls( sorted( set( names ) ) ) or [] ) if names else set()
+    parents = {}
+    pending = sorted( existing )
+
+    while pending:
+
+        name = pending.pop()
+
+        if name in parents:
+
+            continue
+
+        parent = mc.listRelatives( name, p = 1 )
+        parents[ name ] = parent[0] if parent else None
+
+        if parent:
+
+            pending.append( parent[0] )
+
+    ordered = sorted( parents, key = lambda n: ( _depth( n, parents ), n ) )
+    worldValues = mc.xform( ordered, q = 1, ws = 1, m = 1 ) if ordered else []
+    nodes = []
+
+    for i, name in enumerate( ordered ):
+
+        points = None
+
+        if mc.listRelatives( name, s = 1, type = 'nurbsCurve' ):
+
+            points = mc.xform( name + '.cv[*]', q = 1, ws = 1, t = 1 )
+            points = [ points[ j:j + 3 ] for j in range( 0, len( points ), 3 ) ]
+
+        nodes.append( { 'name': name, 'type': mc.nodeType( name ), 'parent': parents[ name ],
+                        'matrix': worldValues[ i * 16:i * 16 + 16 ], 'points': points } )
+
+    for name in sorted( set( names ) - existing ):
+
+        nodes.append( { 'name': name, 'type': 'transform', 'parent': None, 'matrix': matrix.identity(), 'points': None } )
+
+    return nodes
+
+def seedNames( kwargs ):
+
+    """
+    @param kwargs : dict, keyword arguments of module build function
+    @return : list( str ), names of objects module build reads, inputs with their descendant joints and base rig groups
+    """
+
+    baseRig = kwargs.get( 'baseRig' )
+    baseNames = sorted( v for v in vars( baseRig ).values() if isinstance( v, str ) ) if baseRig else []
+
+    return mirror.inputObjects( kwargs ) + baseNames
+
+def sandbox( nodes ):
+
+    """
+    @param nodes : list( dict ), seeded objects, like returned by seed()
+    @return : memory.MemoryScene, new in-memory scene holding copies of seeded objects
+    """
+
+    scene = memory.MemoryScene()
+
+    with useBackend( scene ):
+
+        for node in nodes:
+
+            if node[ 'points' ]:
+
+                # curve points in object space so they land on their world position
+
+                inverse = matrix.inverse( node[ 'matrix' ] )
+                points = [ matrix.transformPoint( p, inverse ) for p in node[ 'points' ] ]
+                mc.curve( n = node[ 'name' ], d = min( 3, len( points ) - 1 ), p = points )
+
+            elif node[ 'type' ] == 'joint':
+
+                mc.createNode( 'joint', n = node[ 'name' ] )
+
+            else:
+
+                mc.group( n = node[ 'name' ], em = 1 )
+
+            if node[ 'parent' ]:
+
+                mc.parent( node[ 'name' ], node[ 'parent' ] )
+
+            mc.xform( node[ 'name' ], ws = 1, m = node[ 'matrix' ] )
+
+        mc.select( cl = 1 )
+
+    return scene
+
+def make( name, buildType, kwargs, nodes ):
+
+    """
+    plan one build in a sandbox scene
+
+    @param name : str, name of planned module
+    @param buildType : str, module type like spine, or base for the base rig
+    @param kwargs : dict, keyword arguments of build function
+    @param nodes : list( dict ), seeded objects build reads, like returned by seed()
+    @return : Plan
+    """
+
+    scene = sandbox( nodes )
+    buildFunction = module.Base if buildType == 'base' else scheduler.builders[ buildType ]
+
+    # sandbox builds are no builds of the scene, telemetry reports them as part of the calling span
+
+    with useBackend( scene ), shapeCache.isolated(), telemetry.muted():
+
+        nodesBefore = set( scene.ls() )
+        result, recorder = mirror.record( buildFunction, kwargs )
+        made = [ n for n in scene.ls() if n not in nodesBefore ]
+
+        temporary = []
+
+        if shapeCache.templatesGrpName in made:
+
+            temporary = [ shapeCache.templatesGrpName ] + ( scene.listRelatives( shapeCache.templatesGrpName, ad = 1 ) or [] )
+
+        nodeTypes = dict( ( n, scene.nodeType( n ) ) for n in made if n not in temporary )
+
+    return Plan( name, recorder.commands, result, nodeTypes, [ shapeCache.templatesGrpName ] if temporary else [] )
+
+def makeMany( jobs, workers = 1 ):
+
+    """
+    plan builds, at once in a pool of worker processes when more than one worker is asked for outside of interactive Maya
+
+    @param jobs : list( tuple( str, str, dict, list( dict ) ) ), name, build type, build arguments and seeded objects of each build
+    @param workers : int, number of worker processes, 1 plans in this process
+    @return : dict, plans by name
+    """
+
+    workers = workers or 1
+
+    if workers < 2 or len( jobs ) < 2 or not poolAvailable():
+
+        plans = [ _makeJob( job ) for job in jobs ]
+
+    else:
+
+        pool = _poolContext().Pool( min( workers, len( jobs ) ) )
+
+        try:
+
+            plans = pool.map( _makeJob, jobs )
+
+        finally:
+
+            pool.close()
+            pool.join()
+
+    return dict( ( p.name, p ) for p in plans )
+
+def poolAvailable():
+
+    """
+    @return : bool, True when planning may use worker processes, False inside an interactive Maya session
+    """
+
+    mayaCmds = sys.modules.get( 'maya.cmds' )
+    about = getattr( mayaCmds, 'about', None )
+
+    # maya.cmds has no commands before maya standalone is initialized
+
+    return about is None or bool( about( batch = True ) )
+
+def mayapyPath():
+
+    """
+    @return : str, path of mayapy of the running Maya, python executable of this process when not found
+    """
+
+    folder, name = os.path.split( sys.executable )
+
+    if name.lower().startswith( 'mayapy' ):
+
+        return sys.executable
+
+    # mayapy sits next to maya on windows and linux, in Contents/bin of Maya.app on macOS
+
+    for path in [ os.path.join( folder, 'mayapy.exe' ), os.path.join( folder, 'mayapy' ), os.path.join( folder, '..', 'bin', 'mayapy' ) ]:
+
+        if os.path.isfile( path ):
+
+            return os.path.normpath( path )
+
+    return sys.executable
+
+def moduleJobs( rigSpec, baseRig = None, rigScale = 1.0, modules = None, skeleton = None ):
+
+    """
+    @param rigSpec : dict, rig spec
+    @param baseRig : instance of base.module.Base class
+    @param rigScale : float, default scale factor for size of controls
+    @param modules : list( str ), optional names of modules to plan with their dependencies, all by default
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional, indexed from spec root joint when not given
+    @return : tuple( spec.BuildGraph, list( tuple ) ), build graph and plan jobs of its modules, like makeMany() takes
+    """
+
+    graph = spec.BuildGraph( rigSpec, modules = modules )
+
+    if not skeleton and any( graph.modules[ n ][ 'type' ] in scheduler.skeletonModuleTypes for n in graph.order ):
+
+        skeleton = joint.SkeletonIndex( rigSpec.get( 'rootJoint', 'root_JNT' ) )
+
+    jobs = []
+
+    for moduleName in graph.order:
+
+        moduleSpec = graph.modules[ moduleName ]
+        kwargs = scheduler.moduleArgs( moduleSpec, baseRig = baseRig, rigScale = rigScale, skeleton = skeleton )
+        jobs.append( ( moduleName, moduleSpec[ 'type' ], kwargs, seed( seedNames( kwargs ) ) ) )
+
+    return graph, jobs
+
+def apply( plan ):
+
+    """
+    issue commands of plan in the active scene
+
+    @param plan : Plan, plan of one build
+    @return : build result with node names of the scene
+    """
+
+    names = {}
+
+    with batch.batched():
+
+        for commandName, args, kwargs, result in plan.commands:
+
+            newArgs = _renamed( args, names )
+            newKwargs = dict( ( k, _renamed( v, names ) if k in mirror.nodeFlags or k in [ 'n', 'name' ] else v ) for k, v in kwargs.items() )
+            newResult = getattr( mc, commandName )( *newArgs, **newKwargs )
+
+            # renamed and deleted nodes free their names for nodes made later
+
+            if commandName in [ 'rename', 'delete' ]:
+
+                for old in _flatten( args[ :1 ] if commandName == 'rename' else args ):
+
+                    names.pop( old.split( '|' )[-1], None )
+
+            for old, new in zip( _flatten( [ result ] ), _flatten( [ newResult ] ) ):
+
+                if isinstance( old, str ) and isinstance( new, str ):
+
+                    old, new = old.split( '|' )[-1], new.split( '|' )[-1]
+
+                    if old != new:
+
+                        names[ old ] = new
+
+        temporary = mc.ls( [ names.get( n, n ) for n in plan.temporary ] ) if plan.temporary else []
+
+        if temporary:
+
+            mc.delete( temporary )
+
+    return _mappedResult( plan.result, names )
+
+def build( rigSpec, baseRig = None, rigScale = 1.0, modules = None, skeleton = None, workers = 1 ):
+
+    """
+    plan modules of rig spec in parallel, then apply plans and attach modules in dependency order
+
+    @param rigSpec : dict, rig spec
+    @param baseRig : instance of base.module.Base class
+    @param rigScale : float, default scale factor for size of controls
+    @param modules : list( str ), optional names of modules to build with their dependencies, all by default
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional, indexed from spec root joint when not given
+    @param workers : int, number of worker processes planning modules, outside of interactive Maya only, 1 by default
+    @return : dict, build results by module name
+    """
+
+    graph, jobs = moduleJobs( rigSpec, baseRig = baseRig, rigScale = rigScale, modules = modules, skeleton = skeleton )
+    plans = makeMany( jobs, workers = workers )
+    results = {}
+
+    for moduleName in graph.order:
+
+        result = apply( plans[ moduleName ] )
+        scheduler.attach( graph.modules[ moduleName ], result, results )
+        results[ moduleName ] = result
+
+    return results
+
+def dryRun( rigSpec, baseArgs = None, rigScale = 1.0, modules = None, workers = 1, verbose = False, stream = None ):
+
+    """
+    plan base rig and modules of rig spec and report their node and command counts, the scene is only queried
+
+    @param rigSpec : dict, rig spec
+    @param baseArgs : dict, keyword arguments of base.module.Base, like characterName and mainCtrlAttachObj
+    @param rigScale : float, default scale factor for size of controls
+    @param modules : list( str ), optional names of modules to plan with their dependencies, all by default
+    @param workers : int, number of worker processes planning modules, outside of interactive Maya only, 1 by default
+    @param verbose : bool, list commands of each plan after counts
+    @param stream : file object report is written to, sys.stdout by default
+    @return : dict, { 'plans': plans by name, 'order': list( str ), 'totals': dict }
+    """
+
+    baseArgs = baseArgs or {}
+    baseNames = [ baseArgs[ 'mainCtrlAttachObj' ] ] if baseArgs.get( 'mainCtrlAttachObj' ) else []
+    basePlan = make( 'base', 'base', baseArgs, seed( baseNames ) )
+
+    graph, jobs = moduleJobs( rigSpec, baseRig = basePlan.result, rigScale = rigScale, modules = modules )
+    plans = makeMany( jobs, workers = workers )
+    plans[ 'base' ] = basePlan
+    order = [ 'base' ] + graph.order
+
+    # attach constraints are made after apply, one per attach entry
+
+    attachCounts = dict( ( n, len( graph.modules[ n ].get( 'attach', [] ) ) ) for n in graph.order )
+    totals = dict( ( key, 0 ) for key in [ 'nodes', 'commands', 'constraints', 'controls', 'attach' ] )
+    lines = [ '%-12s %8s %9s %12s %9s %7s' % ( 'module', 'nodes', 'commands', 'constraints', 'controls', 'attach' ) ]
+
+    for name in order:
+
+        counts = plans[ name ].counts()
+        counts[ 'attach' ] = attachCounts.get( name, 0 )
+
+        for key in totals:
+
+            totals[ key ] += counts[ key ]
+
+        lines.append( '%-12s %8d %9d %12d %9d %7d' % ( name, counts[ 'nodes' ], counts[ 'commands' ], counts[ 'constraints' ],
+                                                        counts[ 'controls' ], counts[ 'attach' ] ) )
+
+    lines.append( '%-12s %8d %9d %12d %9d %7d' % ( 'total', totals[ 'nodes' ], totals[ 'commands' ], totals[ 'constraints' ],
+                                                    totals[ 'controls' ], totals[ 'attach' ] ) )
+
+    if graph.skipped:
+
+        lines.append( 'skipped : %s' % ', '.join( graph.skipped ) )
+
+    if verbose:
+
+        for name in order:
+
+            lines.append( '' )
+            lines.append( '%s :' % name )
+            lines.extend( '    %s' % _formatCommand( *command[ :3 ] ) for command in plans[ name ].edits() )
+
+    ( stream or sys.stdout ).write( '\n'.join( lines ) + '\n' )
+
+    return { 'plans': plans, 'order': order, 'totals': totals }
+
+def _poolContext():
+
+    # a process running maya is not forked and its workers are not spawned with the maya executable,
+    # they are spawned with mayapy
+
+    if 'maya.cmds' not in sys.modules:
+
+        return multiprocessing
+
+    context = multiprocessing.get_context( 'spawn' )
+    context.set_executable( mayapyPath() )
+
+    return context
+
+def _makeJob( job ):
+
+    return make( *job )
+
+def _depth( name, parents ):
+
+    depth = 0
+
+    while parents.get( name ):
+
+        name = parents[ name ]
+        depth += 1
+
+    return depth
+
+def _query( commandName, kwargs ):
+
+    return commandName in mirror.queryCommands or bool( kwargs.get( 'q' ) or kwargs.get( 'query' ) )
+
+def _renamed( value, names ):
+
+    if isinstance( value, str ):
+
+        node, dot, attr = value.partition( '.' )
+
+        return '|'.join( names.get( p, p ) for p in node.split( '|' ) ) + dot + attr
+
+    if isinstance( value, ( list, tuple ) ):
+
+        return type( value )( _renamed( v, names ) for v in value )
+
+    return value
+
+def _mappedResult( result, names ):
+
+    # build result copied with node names of the scene, modules and controls by their node names
+
+    if isinstance( result, dict ):
+
+        return dict( ( k, _mappedResult( v, names ) ) for k, v in result.items() )
+
+    if isinstance( result, ( str, list, tuple ) ):
+
+        return _renamed( result, names )
+
+    if hasattr( result, '__dict__' ):
+
+        mapped = copy.copy( result )
+        mapped.__dict__.update( ( k, _renamed( v, names ) ) for k, v in result.__dict__.items() if isinstance( v, str ) )
+
+        return mapped
+
+    return result
+
+def _flatten( values ):
+
+    result = []
+
+    for value in values:
+
+        if isinstance( value, ( list, tuple ) ):
+
+            result.extend( _flatten( value ) )
+
+        else:
+
+            result.append( value )
+
+    return result
+
+def _formatCommand( commandName, args, kwargs ):
+
+    arguments = [ repr( a ) for a in args ] + [ '%s = %r' % ( k, v ) for k, v in sorted( kwargs.items() ) ]
+
+    return '%s( %s )' % ( commandName, ', '.join( arguments ) )
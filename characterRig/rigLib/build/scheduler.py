@@ -0,0 +1,209 @@
+"""
+scheduler @ build
+build rig modules of a rig spec in dependency order and wire their attach constraints
+"""
+
+from ..backend import cmds as mc
+
+from ..rig import arm
+from ..rig import ikChain
+from ..rig import leg
+from ..rig import neck
+from ..rig import spine
+
+from ..utils import joint
+
+from . import mirror
+from . import spec
+
+builders = {
+    'spine': spine.Build,
+    'neck': neck.Build,
+    'arm': arm.Build,
+    'leg': leg.Build,
+    'ikChain': ikChain.build
+    }
+
+# module types reading joint hierarchy from skeleton index
+
+skeletonModuleTypes = [ 'arm', 'leg' ]
+
+def build( rigSpec, baseRig = None, rigScale = 1.0, modules = None, skeleton = None ):
+
+    """
+    build modules of rig spec
+
+    @param rigSpec : dict, rig spec
+    @param baseRig : instance of base.module.Base class
+    @param rigScale : float, default scale factor for size of controls
+    @param modules : list( str ), optional names of modules to build with their dependencies, all by default
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional, indexed from spec root joint when not given
+    @return : dict, build results by module name
+    """
+
+    graph = spec.BuildGraph( rigSpec, modules = modules )
+
+    if not skeleton and any( graph.modules[ n ][ 'type' ] in skeletonModuleTypes for n in graph.order ):
+
+        skeleton = joint.SkeletonIndex( rigSpec.get( 'rootJoint', 'root_JNT' ) )
+
+    results = {}
+    recordings = mirrorRecordings( graph )
+
+    for level in graph.levels:
+
+        for moduleName in level:
+
+            results[ moduleName ] = buildModule( graph.modules[ moduleName ], results, baseRig = baseRig,
+                                                 rigScale = rigScale, skeleton = skeleton, recordings = recordings )
+
+    return results
+
+def moduleArgs( moduleSpec, baseRig = None, rigScale = 1.0, skeleton = None ):
+
+    """
+    @param moduleSpec : dict, module entry of rig spec
+    @param baseRig : instance of base.module.Base class
+    @param rigScale : float, default scale factor for size of controls
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional
+    @return : dict, keyword arguments for module build function
+    """
+
+    kwargs = dict( moduleSpec.get( 'args', {} ) )
+    kwargs.setdefault( 'prefix', moduleSpec[ 'name' ] )
+    kwargs.setdefault( 'rigScale', rigScale )
+    kwargs[ 'baseRig' ] = baseRig
+
+    if skeleton and moduleSpec[ 'type' ] in skeletonModuleTypes:
+
+        kwargs[ 'skeleton' ] = skeleton
+
+    return kwargs
+
+def buildModule( moduleSpec, results, baseRig = None, rigScale = 1.0, skeleton = None, recordings = None ):
+
+    """
+    build one module and attach it to its drivers
+
+    @param moduleSpec : dict, module entry of rig spec
+    @param results : dict, build results of modules built so far by module name
+    @param baseRig : instance of base.module.Base class
+    @param rigScale : float, default scale factor for size of controls
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional
+    @param recordings : dict, recorded builds of mirror source modules by module name, optional
+    @return : dict, build result of module
+    """
+
+    kwargs = moduleArgs( moduleSpec, baseRig = baseRig, rigScale = rigScale, skeleton = skeleton )
+    result = runBuild( moduleSpec, kwargs, recordings = recordings )
+
+    attach( moduleSpec, result, results )
+
+    return result
+
+def mirrorRecordings( graph ):
+
+    """
+    @param graph : spec.BuildGraph, modules to build
+    @return : dict, empty recordings keyed by names of modules other modules are mirrored from
+    """
+
+    return dict( ( m[ 'mirror' ], None ) for n, m in graph.modules.items() if m.get( 'mirror' ) and n in graph.order )
+
+def runBuild( moduleSpec, kwargs, recordings = None ):
+
+    """
+    run build function of module, replaying the recorded build of its mirror source when possible
+
+    @param moduleSpec : dict, module entry of rig spec
+    @param kwargs : dict, keyword arguments for module build function
+    @param recordings : dict, recorded builds of mirror source modules by module name, filled as sources are built
+    @return : dict, build result of module
+    """
+
+    buildFunction = builders[ moduleSpec[ 'type' ] ]
+    recordings = {} if recordings is None else recordings
+    source = recordings.get( moduleSpec.get( 'mirror' ) )
+
+    if source:
+
+        result = mirrorBuild( source, kwargs )
+
+        if result:
+
+            return result
+
+    if moduleSpec[ 'name' ] not in recordings:
+
+        return buildFunction( **kwargs )
+
+    result, recorder = mirror.record( buildFunction, kwargs )
+    recordings[ moduleSpec[ 'name' ] ] = { 'kwargs': kwargs, 'result': result, 'recorder': recorder }
+
+    return result
+
+def mirrorBuild( source, kwargs ):
+
+    """
+    build module by replaying recorded build of its mirror source
+
+    @param source : dict, { 'kwargs', 'result', 'recorder' } of mirror source build
+    @param kwargs : dict, keyword arguments for module build function
+    @return : dict, build result of module, None when module can not be mirrored from source
+    """
+
+    recorder = source[ 'recorder' ]
+    sides = mirror.mirrorSides( source[ 'kwargs' ][ 'prefix' ], kwargs[ 'prefix' ] )
+
+    if not sides or not recorder.mirrorable or not mirror.matchingArgs( source[ 'kwargs' ], kwargs, sides ):
+
+        return None
+
+    sourceObjects = mirror.inputObjects( source[ 'kwargs' ] )
+    behavior = mirror.rotationMode( sourceObjects, [ mirror.mirrorName( n, sides ) for n in sourceObjects ] )
+
+    if behavior is None or mirror.missingNodes( recorder, sides ):
+
+        return None
+
+    names = mirror.replay( recorder, kwargs[ 'prefix' ], sides, behavior = behavior )
+
+    return mirror.mirrorResult( source[ 'result' ], names, sides )
+
+def attach( moduleSpec, result, results ):
+
+    """
+    constrain attach groups of built module to their drivers
+
+    @param moduleSpec : dict, module entry of rig spec
+    @param result : dict, build result of module
+    @param results : dict, build results of other modules by module name
+    @return : list( str ), names of new constraints
+    """
+
+    constraints = []
+
+    for attachSpec in moduleSpec.get( 'attach', [] ):
+
+        driver = resolveDriver( attachSpec[ 'driver' ], results )
+        constraints.extend( mc.parentConstraint( driver, result[ attachSpec[ 'grp' ] ], mo = 1 ) )
+
+    return constraints
+
+def resolveDriver( driver, results ):
+
+    """
+    @param driver : str or dict, scene object name or { "module": name, "output": key } reference
+    @param results : dict, build results by module name
+    @return : str, name of driver object
+    """
+
+    if not isinstance( driver, dict ):
+
+        return driver
+
+    output = results[ driver[ 'module' ] ][ driver[ 'output' ] ]
+
+    # controls are attached through their control object
+
+    return getattr( output, 'C', output )
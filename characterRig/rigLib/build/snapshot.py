@@ -0,0 +1,459 @@
+"""
+snapshot @ build
+compact binary snapshot of a built rig, loaded by memory mapping the file
+
+a snapshot holds the transforms below the rig top group as contiguous
+little-endian arrays, nodes are in depth first order so parents always
+come before their children :
+
+    header          magic, version, counts and byte offsets of sections
+    strings         uint32 offsets [ nodes + types + 1 ] into UTF-8 bytes, node names then type names
+    types           uint16 [ nodes ], index of node type name
+    parents         int32 [ nodes ], index of parent node, -1 for top group
+    roles           uint8 [ nodes ], role bit flags ( roleJoint, roleControl ... )
+    matrices        float32 [ nodes * 16 ], local matrices, row-major like mc.xform( q = 1, m = 1 )
+    links           int32 [ links * 3 ], constraint, target and constrained node of each constraint target
+    ikChains        int32 [ chains * 4 ], ik handle, start joint, end joint and solver index in ikSolvers of each ik handle
+
+export writes the snapshot of a built rig, Snapshot maps the file and
+reads arrays in place without running the build or opening the scene :
+
+    snapshot.export( 'hero_rig_GRP', 'hero.rigsnap' )
+
+    with snapshot.Snapshot( 'hero.rigsnap' ) as rig:
+
+        controls = [ rig.name( i ) for i in rig.withRole( snapshot.roleControl ) ]
+"""
+
+import array
+import mmap
+import re
+import struct
+import sys
+
+from ..backend import cmds as mc
+
+from ..utils import matrix
+
+magic = b'RIGSNAP\0'
+version = 2
+
+roleJoint = 1
+roleControl = 2
+roleOffset = 4
+roleConstraint = 8
+roleIkHandle = 16
+roleModule = 32
+
+# ik solvers by index, -1 for others
+
+ikSolvers = [ 'ikRPsolver', 'ikSCsolver', 'ikSplineSolver' ]
+
+# magic, version, node, type, link and ik chain counts, then byte offsets of the 8 sections and file size
+
+_header = struct.Struct( '<8sIIIII9Q' )
+_sections = [ 'stringOffsets', 'strings', 'types', 'parents', 'roles', 'matrices', 'links', 'ikChains' ]
+_formats = { 'stringOffsets': 'I', 'types': 'H', 'parents': 'i', 'roles': 'B', 'matrices': 'f', 'links': 'i', 'ikChains': 'i' }
+
+_controlRe = re.compile( r'_CTRL\d*$' )
+
+def collect( topGrp ):
+
+    """
+    read rig structure from scene with a few bulk queries
+
+    @param topGrp : str, rig top group
+    @return : dict, { 'names', 'types', 'parents', 'roles', 'matrices', 'links', 'ikChains' } lists in depth first node order
+    """
+
+    topPath = mc.ls( topGrp, l = 1 )[0]
+    descendants = mc.listRelatives( topGrp, ad = 1, f = 1 ) or []
+    shapes = set( mc.ls( descendants, s = 1, l = 1 ) or [] )
+    typeValues = mc.ls( [ topPath ] + descendants, st = 1, l = 1 )
+    nodeTypes = dict( zip( typeValues[ ::2 ], typeValues[ 1::2 ] ) )
+
+    # depth first order from paths, independent of the order listRelatives returns
+
+    childPaths = {}
+
+    for path in descendants:
+
+        if path not in shapes:
+
+            childPaths.setdefault( path.rpartition( '|' )[0], [] ).append( path )
+
+    paths = []
+    pending = [ topPath ]
+
+    while pending:
+
+        path = pending.pop()
+        paths.append( path )
+        pending.extend( reversed( sorted( childPaths.get( path, [] ) ) ) )
+
+    indices = dict( ( path, i ) for i, path in enumerate( paths ) )
+    names = [ path.rpartition( '|' )[2] for path in paths ]
+    types = [ nodeTypes[ path ] for path in paths ]
+    parents = [ indices.get( path.rpartition( '|' )[0], -1 ) for path in paths ]
+    matrices = mc.xform( paths, q = 1, m = 1 )
+
+    # rigLib names are unique, constraint targets are matched by short name
+
+    nameIndices = dict( ( name, i ) for i, name in enumerate( names ) )
+
+    roles = []
+    links = []
+    ikChains = []
+
+    for i, ( name, nodeType ) in enumerate( zip( names, types ) ):
+
+        role = 0
+
+        if nodeType == 'joint':
+
+            role |= roleJoint
+
+        if _controlRe.search( name ):
+
+            role |= roleControl
+
+        if name.endswith( '_offset_GRP' ):
+
+            role |= roleOffset
+
+        if name.endswith( '_Module_GRP' ):
+
+            role |= roleModule
+
+        if nodeType == 'ikHandle':
+
+            role |= roleIkHandle
+            ikChains.append( _ikChain( paths[i], i, nameIndices, parents, types, matrices ) )
+
+        if nodeType.endswith( 'Constraint' ):
+
+            role |= roleConstraint
+
+            # constraint nodes are children of the object they constrain
+
+            for target in getattr( mc, nodeType )( paths[i], q = 1, tl = 1 ) or []:
+
+                links.append( ( i, nameIndices.get( target.rpartition( '|' )[2], -1 ), parents[i] ) )
+
+        roles.append( role )
+
+    return { 'names': names, 'types': types, 'parents': parents, 'roles': roles, 'matrices': matrices, 'links': links,
+             'ikChains': ikChains }
+
+def write( path, rigData ):
+
+    """
+    write snapshot file from collected rig data
+
+    @param path : str, snapshot file path
+    @param rigData : dict, rig data returned by collect()
+    @return : None
+    """
+
+    nodeCount = len( rigData[ 'names' ] )
+    typeNames = sorted( set( rigData[ 'types' ] ) )
+    typeIndices = dict( ( t, i ) for i, t in enumerate( typeNames ) )
+
+    stringOffsets = [ 0 ]
+    stringBytes = []
+
+    for string in rigData[ 'names' ] + typeNames:
+
+        stringBytes.append( string.encode( 'utf-8' ) )
+        stringOffsets.append( stringOffsets[-1] + len( stringBytes[-1] ) )
+
+    sections = {
+        'stringOffsets': _packed( 'I', stringOffsets ),
+        'strings': b''.join( stringBytes ),
+        'types': _packed( 'H', [ typeIndices[ t ] for t in rigData[ 'types' ] ] ),
+        'parents': _packed( 'i', rigData[ 'parents' ] ),
+        'roles': _packed( 'B', rigData[ 'roles' ] ),
+        'matrices': _packed( 'f', rigData[ 'matrices' ] ),
+        'links': _packed( 'i', [ v for link in rigData[ 'links' ] for v in link ] ),
+        'ikChains': _packed( 'i', [ v for handle, start, end, solver in rigData[ 'ikChains' ]
+                                    for v in [ handle, start, end, ikSolvers.index( solver ) if solver in ikSolvers else -1 ] ] )
+        }
+
+    offsets = []
+    position = _header.size
+    body = []
+
+    for section in _sections:
+
+        padding = -position % 8
+        body.append( b'\0' * padding )
+        position += padding
+        offsets.append( position )
+        body.append( sections[ section ] )
+        position += len( sections[ section ] )
+
+    with open( path, 'wb' ) as snapshotFile:
+
+        snapshotFile.write( _header.pack( magic, version, nodeCount, len( typeNames ), len( rigData[ 'links' ] ), len( rigData[ 'ikChains' ] ),
+                                          *( offsets + [ position ] ) ) )
+        snapshotFile.write( b''.join( body ) )
+
+def export( topGrp, path ):
+
+    """
+    write snapshot of rig below top group
+
+    @param topGrp : str, rig top group, like characterName_rig_GRP
+    @param path : str, snapshot file path
+    @return : None
+    """
+
+    write( path, collect( topGrp ) )
+
+class Snapshot():
+
+    """
+    class reading a memory mapped rig snapshot, arrays are views on the mapped file
+    """
+
+    def __init__( self, path ):
+
+        """
+        @param path : str, snapshot file path
+        @return : None
+        """
+
+        self._file = open( path, 'rb' )
+        self._map = mmap.mmap( self._file.fileno(), 0, access = mmap.ACCESS_READ )
+
+        fields = _header.unpack_from( self._map, 0 )
+
+        if fields[0] != magic:
+
+            self.close()
+            raise ValueError( '%s is not a rig snapshot' % path )
+
+        if fields[1] != version:
+
+            self.close()
+            raise ValueError( 'rig snapshot %s has version %d, expected %d' % ( path, fields[1], version ) )
+
+        self.nodeCount, self.typeCount, self.linkCount, self.ikChainCount = fields[ 2:6 ]
+
+        offsets = dict( zip( _sections + [ 'end' ], fields[ 6: ] ) )
+        counts = { 'stringOffsets': self.nodeCount + self.typeCount + 1, 'types': self.nodeCount, 'parents': self.nodeCount,
+                   'roles': self.nodeCount, 'matrices': self.nodeCount * 16, 'links': self.linkCount * 3,
+                   'ikChains': self.ikChainCount * 4 }
+
+        self._buffer = memoryview( self._map )
+        self._strings = self._buffer[ offsets[ 'strings' ]:offsets[ 'types' ] ]
+
+        for section, typeCode in _formats.items():
+
+            setattr( self, section, self._array( offsets[ section ], counts[ section ], typeCode ) )
+
+        self._indices = None
+        self._children = None
+
+    def __enter__( self ):
+
+        return self
+
+    def __exit__( self, *args ):
+
+        self.close()
+
+    def __len__( self ):
+
+        return self.nodeCount
+
+    def close( self ):
+
+        """
+        release array views and unmap file
+        """
+
+        for attrName in list( _formats ) + [ '_strings', '_buffer' ]:
+
+            view = getattr( self, attrName, None )
+
+            if isinstance( view, memoryview ):
+
+                view.release()
+
+            setattr( self, attrName, None )
+
+        self._map.close()
+        self._file.close()
+
+    def name( self, index ):
+
+        """
+        @param index : int, node index
+        @return : str, node name
+        """
+
+        return self._string( index )
+
+    def names( self ):
+
+        """
+        @return : list( str ), all node names in node order
+        """
+
+        return [ self._string( i ) for i in range( self.nodeCount ) ]
+
+    def index( self, name ):
+
+        """
+        @param name : str, node name
+        @return : int, node index
+        """
+
+        if self._indices is None:
+
+            self._indices = dict( ( n, i ) for i, n in enumerate( self.names() ) )
+
+        if name not in self._indices:
+
+            raise ValueError( 'rig snapshot has no node %s' % name )
+
+        return self._indices[ name ]
+
+    def nodeType( self, index ):
+
+        """
+        @param index : int, node index
+        @return : str, node type
+        """
+
+        return self._string( self.nodeCount + self.types[ index ] )
+
+    def parent( self, index ):
+
+        """
+        @param index : int, node index
+        @return : int, parent node index, -1 for top group
+        """
+
+        return self.parents[ index ]
+
+    def children( self, index ):
+
+        """
+        @param index : int, node index
+        @return : list( int ), child node indices
+        """
+
+        if self._children is None:
+
+            self._children = [ [] for _ in range( self.nodeCount ) ]
+
+            for i in range( self.nodeCount ):
+
+                if self.parents[i] >= 0:
+
+                    self._children[ self.parents[i] ].append( i )
+
+        return self._children[ index ]
+
+    def withRole( self, role ):
+
+        """
+        @param role : int, role bit flags, like roleControl | roleJoint
+        @return : list( int ), indices of nodes having any of given roles
+        """
+
+        return [ i for i in range( self.nodeCount ) if self.roles[i] & role ]
+
+    def localMatrix( self, index ):
+
+        """
+        @param index : int, node index
+        @return : list( float ), local matrix of node
+        """
+
+        return list( self.matrices[ index * 16:index * 16 + 16 ] )
+
+    def worldMatrices( self ):
+
+        """
+        world matrices of all nodes relative to top group parent, in one pass over parents first order
+
+        @return : list( list( float ) ), world matrices in node order
+        """
+
+        result = []
+
+        for i in range( self.nodeCount ):
+
+            local = self.localMatrix( i )
+            result.append( matrix.multiply( local, result[ self.parents[i] ] ) if self.parents[i] >= 0 else local )
+
+        return result
+
+    def constraintLinks( self ):
+
+        """
+        @return : list( tuple( int, int, int ) ), constraint, target and constrained node indices, target is -1 outside of rig
+        """
+
+        return [ tuple( self.links[ i * 3:i * 3 + 3 ] ) for i in range( self.linkCount ) ]
+
+    def ikHandleChains( self ):
+
+        """
+        @return : list( tuple( int, int, int, str ) ), ik handle, start joint and end joint indices and solver of each ik handle,
+                  solver is None for solvers not in ikSolvers and joints are -1 outside of rig
+        """
+
+        return [ tuple( self.ikChains[ i * 4:i * 4 + 3 ] ) + ( ikSolvers[ self.ikChains[ i * 4 + 3 ] ] if self.ikChains[ i * 4 + 3 ] >= 0 else None, )
+                 for i in range( self.ikChainCount ) ]
+
+    def _string( self, index ):
+
+        return self._strings[ self.stringOffsets[ index ]:self.stringOffsets[ index + 1 ] ].tobytes().decode( 'utf-8' )
+
+    def _array( self, offset, count, typeCode ):
+
+        itemSize = struct.calcsize( typeCode )
+        view = self._buffer[ offset:offset + count * itemSize ]
+
+        if sys.byteorder == 'little':
+
+            return view.cast( typeCode )
+
+        # big endian hosts read a swapped copy
+
+        values = array.array( typeCode, view.tobytes() )
+        values.byteswap()
+        view.release()
+
+        return values
+
+def _ikChain( path, index, nameIndices, parents, types, matrices ):
+
+    # the effector sits next to the end joint, under the same parent with the same translation
+
+    startJoint = mc.ikHandle( path, q = 1, sj = 1 )
+    effector = nameIndices.get( mc.ikHandle( path, q = 1, ee = 1 ).rpartition( '|' )[2], -1 )
+    endJoint = -1
+
+    if effector >= 0:
+
+        effectorTranslate = matrices[ effector * 16 + 12:effector * 16 + 15 ]
+        siblings = [ i for i, parent in enumerate( parents ) if parent == parents[ effector ] and types[i] == 'joint' ]
+        distances = [ ( sum( ( a - b ) ** 2 for a, b in zip( matrices[ i * 16 + 12:i * 16 + 15 ], effectorTranslate ) ), i ) for i in siblings ]
+        endJoint = min( distances )[1] if distances else -1
+
+    return ( index, nameIndices.get( startJoint.rpartition( '|' )[2], -1 ), endJoint, mc.ikHandle( path, q = 1, sol = 1 ) )
+
+def _packed( typeCode, values ):
+
+    packed = array.array( typeCode, values )
+
+    if sys.byteorder != 'little':
+
+        packed.byteswap()
+
+    return packed.tobytes()
@@ -0,0 +1,226 @@
+"""
+spec @ build
+declarative rig description and its compilation into a dependency ordered build graph
+
+a rig spec is a JSON dictionary :
+
+    {
+        "rootJoint": "root_JNT",
+        "modules": [
+            {
+                "name": "neck",
+                "type": "neck",
+                "args": { "neckJoints": [ ... ], "headJoint": "head_JNT" },
+                "attach": [
+                    { "grp": "baseAttachGrp", "driver": "spine3_JNT" },
+                    { "grp": "bodyAttachGrp", "driver": { "module": "spine", "output": "bodyCtrl" } }
+                ],
+                "after": [],
+                "mirror": ""
+            }
+        ]
+    }
+
+args are passed to the module build function, prefix defaults to module name.
+attach drivers are scene objects or outputs of other modules, a module
+depends on every module its drivers reference and on modules listed in
+"after". Modules with "enabled": false are skipped together with modules
+depending on them. A module naming a "mirror" source module of the same
+type on the other side is built after it by mirroring it when both are
+built, see build.mirror
+"""
+
+import json
+
+moduleTypes = [ 'spine', 'neck', 'arm', 'leg', 'ikChain' ]
+
+def load( specPath ):
+
+    """
+    load and validate rig spec file
+
+    @param specPath : str, path of JSON rig spec
+    @return : dict, rig spec
+    """
+
+    with open( specPath ) as specFile:
+
+        rigSpec = json.load( specFile )
+
+    validate( rigSpec )
+
+    return rigSpec
+
+def validate( rigSpec ):
+
+    """
+    check rig spec structure, raise ValueError on first problem found
+
+    @param rigSpec : dict, rig spec
+    @return : None
+    """
+
+    modules = rigSpec.get( 'modules' )
+
+    if not isinstance( modules, list ):
+
+        raise ValueError( 'rig spec needs a "modules" list' )
+
+    names = [ m.get( 'name' ) for m in modules ]
+
+    for moduleSpec in modules:
+
+        moduleName = moduleSpec.get( 'name' )
+
+        if not moduleName:
+
+            raise ValueError( 'rig spec module without name : %s' % moduleSpec )
+
+        if names.count( moduleName ) > 1:
+
+            raise ValueError( 'rig spec module name used more than once : %s' % moduleName )
+
+        if moduleSpec.get( 'type' ) not in moduleTypes:
+
+            raise ValueError( 'rig spec module %s has unknown type %s' % ( moduleName, moduleSpec.get( 'type' ) ) )
+
+        if not isinstance( moduleSpec.get( 'args', {} ), dict ):
+
+            raise ValueError( 'rig spec module %s args must be a dictionary' % moduleName )
+
+        for attachSpec in moduleSpec.get( 'attach', [] ):
+
+            if 'grp' not in attachSpec or 'driver' not in attachSpec:
+
+                raise ValueError( 'rig spec module %s attach needs "grp" and "driver"' % moduleName )
+
+        mirrorSource = moduleSpec.get( 'mirror' )
+
+        if mirrorSource and mirrorSource not in names:
+
+            raise ValueError( 'rig spec module %s is mirrored from unknown module %s' % ( moduleName, mirrorSource ) )
+
+        if mirrorSource and modules[ names.index( mirrorSource ) ].get( 'type' ) != moduleSpec.get( 'type' ):
+
+            raise ValueError( 'rig spec module %s is mirrored from module %s of another type' % ( moduleName, mirrorSource ) )
+
+        for dependency in dependencies( moduleSpec ):
+
+            if dependency not in names:
+
+                raise ValueError( 'rig spec module %s depends on unknown module %s' % ( moduleName, dependency ) )
+
+def dependencies( moduleSpec ):
+
+    """
+    @param moduleSpec : dict, module entry of rig spec
+    @return : list( str ), names of modules given module depends on
+    """
+
+    result = list( moduleSpec.get( 'after', [] ) )
+
+    for attachSpec in moduleSpec.get( 'attach', [] ):
+
+        driver = attachSpec[ 'driver' ]
+
+        if isinstance( driver, dict ) and driver[ 'module' ] not in result:
+
+            result.append( driver[ 'module' ] )
+
+    return result
+
+class BuildGraph():
+
+    """
+    class holding modules of rig spec in dependency order
+    """
+
+    def __init__( self, rigSpec, modules = None ):
+
+        """
+        @param rigSpec : dict, rig spec
+        @param modules : list( str ), optional names of modules to build, their dependencies are added, all modules by default
+        @return : None
+        """
+
+        validate( rigSpec )
+
+        self.rigSpec = rigSpec
+        self.modules = dict( ( m[ 'name' ], m ) for m in rigSpec[ 'modules' ] )
+        self.dependencies = dict( ( name, dependencies( m ) ) for name, m in self.modules.items() )
+
+        specOrder = [ m[ 'name' ] for m in rigSpec[ 'modules' ] ]
+        selected = self._selectModules( modules or specOrder )
+
+        self.skipped = [ name for name in specOrder if name not in selected ]
+        self.levels = self._levels( [ name for name in specOrder if name in selected ] )
+        self.order = [ name for level in self.levels for name in level ]
+
+    def _selectModules( self, modules ):
+
+        selected = set()
+        pending = list( modules )
+
+        while pending:
+
+            name = pending.pop()
+
+            if name not in self.modules:
+
+                raise ValueError( 'unknown rig spec module : %s' % name )
+
+            if name not in selected:
+
+                selected.add( name )
+                pending.extend( self.dependencies[ name ] )
+
+        # drop disabled modules and everything depending on them
+
+        changed = True
+
+        while changed:
+
+            changed = False
+
+            for name in list( selected ):
+
+                disabled = not self.modules[ name ].get( 'enabled', True )
+
+                if disabled or any( d not in selected for d in self.dependencies[ name ] ):
+
+                    selected.discard( name )
+                    changed = True
+
+        return selected
+
+    def _levels( self, names ):
+
+        # longest path from modules without dependencies, modules of one level are independent,
+        # mirrored modules come after their mirror source
+
+        after = dict( ( name, self.dependencies[ name ] + [ m for m in [ self.modules[ name ].get( 'mirror' ) ] if m in names ] )
+                      for name in names )
+
+        depths = {}
+        remaining = list( names )
+
+        while remaining:
+
+            ready = [ name for name in remaining if all( d in depths for d in after[ name ] ) ]
+
+            if not ready:
+
+                raise ValueError( 'rig spec has dependency cycle between modules : %s' % ', '.join( remaining ) )
+
+            for name in ready:
+
+                depths[ name ] = max( [ depths[ d ] + 1 for d in after[ name ] ] or [ 0 ] )
+                remaining.remove( name )
+
+        levels = [ [] for _ in range( max( depths.values() ) + 1 ) ] if depths else []
+
+        for name in names:
+
+            levels[ depths[ name ] ].append( name )
+
+        return levels
@@ -0,0 +1,3 @@
+from .. import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'matrixArrays', 'poseGraph', 'splineIk', 'twoBoneIk' ] )
\ No newline at end of file
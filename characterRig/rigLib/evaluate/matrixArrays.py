@@ -0,0 +1,156 @@
+"""
+matrixArrays @ evaluate
+NumPy versions of utils.matrix functions working on stacks of matrices
+
+matrices follow utils.matrix conventions : row-major 4x4 with row vectors,
+so a point is transformed with p * M and a child world matrix is
+local * parentWorld. Functions take arrays of shape ( ..., 4, 4 ) for
+matrices and ( ..., 3 ) for points and vectors and broadcast over leading axes
+"""
+
+import numpy
+
+def asMatrices( values ):
+
+    """
+    @param values : list( float ) or array, flat matrix values like mc.xform( q = 1, m = 1 ) of many objects
+    @return : numpy.ndarray, matrices of shape ( ..., 4, 4 )
+    """
+
+    return numpy.asarray( values, dtype = float ).reshape( -1, 4, 4 )
+
+def multiply( a, b ):
+
+    """
+    @param a : numpy.ndarray, left matrices ( ..., 4, 4 )
+    @param b : numpy.ndarray, right matrices ( ..., 4, 4 )
+    @return : numpy.ndarray, a * b for each pair of matrices
+    """
+
+    return numpy.matmul( a, b )
+
+def rigidInverse( m ):
+
+    """
+    @param m : numpy.ndarray, matrices ( ..., 4, 4 ) with orthonormal rotation
+    @return : numpy.ndarray, inverse matrices
+    """
+
+    result = numpy.zeros_like( m )
+    rotation = numpy.swapaxes( m[ ..., :3, :3 ], -1, -2 )
+    result[ ..., :3, :3 ] = rotation
+    result[ ..., 3, :3 ] = -numpy.einsum( '...i,...ij->...j', m[ ..., 3, :3 ], rotation )
+    result[ ..., 3, 3 ] = 1.0
+
+    return result
+
+def transformPoints( points, m ):
+
+    """
+    @param points : numpy.ndarray, points ( ..., 3 )
+    @param m : numpy.ndarray, matrices ( ..., 4, 4 )
+    @return : numpy.ndarray, points transformed by matrices
+    """
+
+    return numpy.einsum( '...i,...ij->...j', points, m[ ..., :3, :3 ] ) + m[ ..., 3, :3 ]
+
+def transformVectors( vectors, m ):
+
+    """
+    @param vectors : numpy.ndarray, vectors ( ..., 3 )
+    @param m : numpy.ndarray, matrices ( ..., 4, 4 )
+    @return : numpy.ndarray, vectors transformed by matrices without translation
+    """
+
+    return numpy.einsum( '...i,...ij->...j', vectors, m[ ..., :3, :3 ] )
+
+def translations( m ):
+
+    """
+    @param m : numpy.ndarray, matrices ( ..., 4, 4 )
+    @return : numpy.ndarray, translation rows ( ..., 3 )
+    """
+
+    return m[ ..., 3, :3 ]
+
+def fromRotations( rotations, translate ):
+
+    """
+    @param rotations : numpy.ndarray, rotation matrices ( ..., 3, 3 ), rows are axes
+    @param translate : numpy.ndarray, translations ( ..., 3 )
+    @return : numpy.ndarray, matrices ( ..., 4, 4 )
+    """
+
+    shape = numpy.broadcast_shapes( rotations.shape[ :-2 ], translate.shape[ :-1 ] )
+    result = numpy.zeros( shape + ( 4, 4 ) )
+    result[ ..., :3, :3 ] = rotations
+    result[ ..., 3, :3 ] = translate
+    result[ ..., 3, 3 ] = 1.0
+
+    return result
+
+def normalize( vectors ):
+
+    """
+    @param vectors : numpy.ndarray, vectors ( ..., 3 )
+    @return : numpy.ndarray, unit vectors, zero vectors stay zero
+    """
+
+    lengths = numpy.linalg.norm( vectors, axis = -1, keepdims = True )
+
+    return vectors / numpy.where( lengths > 0.0, lengths, 1.0 )
+
+def rotations( rotate ):
+
+    """
+    vectorized utils.matrix.rotation
+
+    @param rotate : numpy.ndarray, euler angles in degrees ( ..., 3 ), xyz rotate order
+    @return : numpy.ndarray, rotation matrices ( ..., 3, 3 )
+    """
+
+    rx, ry, rz = numpy.moveaxis( numpy.radians( rotate ), -1, 0 )
+
+    cx, sx = numpy.cos( rx ), numpy.sin( rx )
+    cy, sy = numpy.cos( ry ), numpy.sin( ry )
+    cz, sz = numpy.cos( rz ), numpy.sin( rz )
+
+    rows = [ [ cy * cz, cy * sz, -sy ],
+             [ sx * sy * cz - cx * sz, sx * sy * sz + cx * cz, sx * cy ],
+             [ cx * sy * cz + sx * sz, cx * sy * sz - sx * cz, cx * cy ] ]
+
+    return numpy.stack( [ numpy.stack( row, axis = -1 ) for row in rows ], axis = -2 )
+
+def compose( translate, rotate, scale = None ):
+
+    """
+    vectorized utils.matrix.compose without joint orient
+
+    @param translate : numpy.ndarray, translate values ( ..., 3 )
+    @param rotate : numpy.ndarray, rotate values in degrees ( ..., 3 ), xyz rotate order
+    @param scale : numpy.ndarray, optional scale values ( ..., 3 )
+    @return : numpy.ndarray, local matrices ( ..., 4, 4 )
+    """
+
+    axes = rotations( rotate )
+
+    if scale is not None:
+
+        axes = axes * numpy.asarray( scale, dtype = float )[ ..., :, None ]
+
+    return fromRotations( axes, numpy.asarray( translate, dtype = float ) )
+
+def rotateAboutAxis( vectors, axis, angles ):
+
+    """
+    rotate vectors perpendicular to unit axis by angles
+
+    @param vectors : numpy.ndarray, vectors ( ..., 3 ) perpendicular to axis
+    @param axis : numpy.ndarray, unit axes ( ..., 3 )
+    @param angles : numpy.ndarray, angles in degrees ( ... )
+    @return : numpy.ndarray, rotated vectors
+    """
+
+    radians = numpy.radians( angles )[ ..., None ]
+
+    return vectors * numpy.cos( radians ) + numpy.cross( axis, vectors ) * numpy.sin( radians )
@@ -0,0 +1,527 @@
+"""
+poseGraph @ evaluate
+dirty propagation evaluator of a built rig for interactive posing
+
+the graph holds the transforms below the rig top group ( global controls,
+module groups, controls and joints ) with their parents and constraint
+links, as read by build.snapshot. World matrices are cached, setting a
+control channel marks the node and everything depending on it dirty,
+reading a matrix only evaluates dirty nodes on the way :
+
+    graph = poseGraph.PoseGraph.fromScene( 'hero_rig_GRP' )
+
+    graph.setValue( 'spine_chest_CTRL', 'rx', 30.0 )
+    graph.worldMatrix( 'spine3_JNT' )
+
+constraints keep the offset they have in the rest pose, so parent, orient
+and point constraints made with or without maintain offset evaluate the
+same way, a constrained start joint of an IK chain is constrained before
+its chain is solved. IK handles are solved when their chain is read : rotate plane
+handles of 2 bone chains by evaluate.twoBoneIk with their pole vector
+constraint, single chain handles by aiming the start joint at the handle.
+Handle twist is not read. Spline IK handles and rotate plane handles of
+longer chains are not solved, their joints follow their parents as long
+as their drivers ( handle and pole, or the cluster handles in the module
+of a spline IK handle ) keep their rest placement relative to the chain
+parent, reading those joints raises ValueError otherwise. Nodes are
+evaluated with an explicit stack, so chains of any depth evaluate
+"""
+
+import math
+
+from ..build import snapshot
+
+from ..utils import matrix
+
+from . import matrixArrays
+from . import twoBoneIk
+
+_channels = { 't': 0, 'r': 1, 's': 2 }
+_axes = { 'x': 0, 'y': 1, 'z': 2 }
+
+class PoseGraph():
+
+    """
+    class caching world matrices of rig nodes and evaluating dirty nodes when read
+    """
+
+    def __init__( self, rigData ):
+
+        """
+        @param rigData : dict, { 'names', 'types', 'parents', 'matrices', 'links', 'ikChains' } like returned by
+                         build.snapshot.collect(), without ikChains IK handles are not solved
+        @return : None
+        """
+
+        self.names = list( rigData[ 'names' ] )
+        self.types = list( rigData[ 'types' ] )
+        self.parents = list( rigData[ 'parents' ] )
+        self.indices = dict( ( n, i ) for i, n in enumerate( self.names ) )
+
+        nodeCount = len( self.names )
+        matrices = [ float( v ) for v in rigData[ 'matrices' ] ]
+
+        self.restLocals = [ matrices[ i * 16:i * 16 + 16 ] for i in range( nodeCount ) ]
+        self.restWorlds = []
+
+        for i in range( nodeCount ):
+
+            parent = self.parents[i]
+            self.restWorlds.append( matrix.multiply( self.restLocals[i], self.restWorlds[ parent ] ) if parent >= 0 else self.restLocals[i] )
+
+        # nodes depending on each node, children first then constrained nodes
+
+        self.dependents = [ [] for _ in range( nodeCount ) ]
+
+        for i, parent in enumerate( self.parents ):
+
+            if parent >= 0:
+
+                self.dependents[ parent ].append( i )
+
+        # first target of each constraint drives constrained node with its rest offset
+
+        self.constraints = {}
+
+        for constraint, target, constrained in rigData[ 'links' ]:
+
+            constraintType = self.types[ constraint ]
+
+            if target < 0 or constrained in self.constraints or constraintType not in _constraintTypes:
+
+                continue
+
+            offset = matrix.multiply( self.restWorlds[ constrained ], matrix.inverse( self.restWorlds[ target ] ) )
+            pointOffset = [ c - t for c, t in zip( matrix.translation( self.restWorlds[ constrained ] ), matrix.translation( self.restWorlds[ target ] ) ) ]
+
+            self.constraints[ constrained ] = ( constraintType, target, offset, pointOffset )
+            self.dependents[ target ].append( constrained )
+
+        # IK chains, joints they solve depend on their handle and pole
+
+        self.ikChains = []
+        self.ikJoints = {}
+
+        for handle, start, end, solver in rigData.get( 'ikChains', [] ):
+
+            chain = self._ikChain( handle, start, end, solver, rigData[ 'links' ] )
+
+            if chain:
+
+                for i in chain[ 'inputs' ]:
+
+                    self.dependents[i].append( start )
+
+                # joints of unsolved chains are checked when evaluated
+
+                for i in chain[ 'solved' ] or chain[ 'joints' ]:
+
+                    self.ikJoints.setdefault( i, len( self.ikChains ) )
+
+                self.ikChains.append( chain )
+
+        self.evaluations = 0
+
+        self.reset()
+
+    @classmethod
+    def fromScene( cls, topGrp ):
+
+        """
+        read rig below top group from scene in rest pose
+
+        @param topGrp : str, rig top group, like characterName_rig_GRP
+        @return : PoseGraph
+        """
+
+        return cls( snapshot.collect( topGrp ) )
+
+    @classmethod
+    def fromSnapshot( cls, rig ):
+
+        """
+        @param rig : build.snapshot.Snapshot, rig snapshot exported in rest pose
+        @return : PoseGraph
+        """
+
+        return cls( { 'names': rig.names(), 'types': [ rig.nodeType( i ) for i in range( len( rig ) ) ],
+                      'parents': list( rig.parents ), 'matrices': list( rig.matrices ), 'links': rig.constraintLinks(),
+                      'ikChains': rig.ikHandleChains() } )
+
+    def reset( self ):
+
+        """
+        return all nodes to rest pose
+        """
+
+        self.channelValues = {}
+        self.locals = list( self.restLocals )
+        self.worlds = list( self.restWorlds )
+        self.dirty = [ False ] * len( self.names )
+
+    def setValue( self, node, channel, value ):
+
+        """
+        set transform channel of node and mark nodes depending on it dirty
+
+        @param node : str, node name, like a control
+        @param channel : str, channel name tx, ty, tz, rx, ry, rz, sx, sy, sz, or t, r, s
+        @param value : float, channel value, rotations in degrees, list( float ) for t, r, s
+        @return : None
+        """
+
+        index = self._index( node )
+        values = self._values( index )
+        group, axis = _channel( channel )
+
+        if axis is None:
+
+            values[ group ] = [ float( v ) for v in value ]
+
+        else:
+
+            values[ group ][ axis ] = float( value )
+
+        self.locals[ index ] = matrix.compose( *values )
+        self._markDirty( index )
+
+    def value( self, node, channel ):
+
+        """
+        @param node : str, node name
+        @param channel : str, channel name tx, ty, tz, rx, ry, rz, sx, sy, sz, or t, r, s
+        @return : float, channel value, list( float ) for t, r, s
+        """
+
+        values = self._values( self._index( node ) )
+        group, axis = _channel( channel )
+
+        return list( values[ group ] ) if axis is None else values[ group ][ axis ]
+
+    def worldMatrix( self, node ):
+
+        """
+        @param node : str, node name, like a joint
+        @return : list( float ), world matrix of node, evaluated if dirty
+        """
+
+        return list( self._world( self._index( node ) ) )
+
+    def worldMatrices( self, nodes ):
+
+        """
+        @param nodes : list( str ), node names
+        @return : list( list( float ) ), world matrices of nodes
+        """
+
+        return [ self.worldMatrix( n ) for n in nodes ]
+
+    def _index( self, node ):
+
+        if node not in self.indices:
+
+            raise ValueError( 'pose graph has no node %s' % node )
+
+        return self.indices[ node ]
+
+    def _values( self, index ):
+
+        # channel values are decomposed from rest local matrix on first use
+
+        if index not in self.channelValues:
+
+            self.channelValues[ index ] = [ list( v ) for v in matrix.decompose( self.restLocals[ index ] ) ]
+
+        return self.channelValues[ index ]
+
+    def _markDirty( self, index ):
+
+        # nodes already dirty have their dependents dirty too
+
+        pending = [ index ]
+
+        while pending:
+
+            i = pending.pop()
+
+            if self.dirty[i]:
+
+                continue
+
+            self.dirty[i] = True
+            pending.extend( self.dependents[i] )
+
+    def _world( self, index ):
+
+        # dirty inputs are evaluated first with an explicit stack, a node met again before its inputs are clean is in a cycle
+
+        if not self.dirty[ index ]:
+
+            return self.worlds[ index ]
+
+        pending = [ index ]
+        expanded = set()
+
+        while pending:
+
+            i = pending[-1]
+
+            if not self.dirty[i]:
+
+                pending.pop()
+                continue
+
+            inputs = [ n for n in self._inputs( i ) if self.dirty[n] ]
+
+            if not inputs:
+
+                pending.pop()
+                self._evaluate( i )
+                continue
+
+            if i in expanded:
+
+                raise ValueError( 'pose graph has a cycle through %s' % self.names[i] )
+
+            expanded.add( i )
+            pending.extend( inputs )
+
+        return self.worlds[ index ]
+
+    def _inputs( self, index ):
+
+        chain = self.ikChains[ self.ikJoints[ index ] ] if index in self.ikJoints else None
+
+        # joints solved together depend on the chain inputs only, not on each other
+
+        if chain and index in chain[ 'solved' ]:
+
+            return chain[ 'inputs' ]
+
+        inputs = [ self.parents[ index ] ] if self.parents[ index ] >= 0 else []
+
+        if index in self.constraints:
+
+            inputs.append( self.constraints[ index ][1] )
+
+        if chain:
+
+            inputs.extend( chain[ 'inputs' ] )
+
+        return inputs
+
+    def _evaluate( self, index ):
+
+        chain = self.ikChains[ self.ikJoints[ index ] ] if index in self.ikJoints else None
+
+        if chain and index in chain[ 'solved' ]:
+
+            for i, world in zip( chain[ 'solved' ], self._solve( chain ) ):
+
+                self.worlds[i] = world
+                self.dirty[i] = False
+                self.evaluations += 1
+
+            return
+
+        parent = self.parents[ index ]
+        world = matrix.multiply( self.locals[ index ], self.worlds[ parent ] ) if parent >= 0 else self.locals[ index ]
+
+        if index in self.constraints:
+
+            world = self._constrained( world, *self.constraints[ index ] )
+
+        if chain:
+
+            self._checkUnsolved( chain )
+
+        self.worlds[ index ] = world
+        self.dirty[ index ] = False
+        self.evaluations += 1
+
+    def _ikChain( self, handle, start, end, solver, links ):
+
+        # chain joints from start to end, None when end is not below start
+
+        if start < 0 or end < 0:
+
+            return None
+
+        joints = [ end ]
+
+        while joints[-1] != start:
+
+            if self.parents[ joints[-1] ] < 0:
+
+                return None
+
+            joints.append( self.parents[ joints[-1] ] )
+
+        joints.reverse()
+
+        poles = [ target for constraint, target, constrained in links
+                  if constrained == handle and target >= 0 and self.types[ constraint ] == 'poleVectorConstraint' ]
+
+        chain = { 'name': self.names[ handle ], 'solver': solver, 'handle': handle, 'pole': poles[0] if poles else -1,
+                  'parent': self.parents[ start ], 'joints': joints, 'solved': [] }
+        chain[ 'inputs' ] = [ i for i in [ chain[ 'parent' ], handle, chain[ 'pole' ] ] if i >= 0 ]
+
+        parentWorld = self.restWorlds[ chain[ 'parent' ] ] if chain[ 'parent' ] >= 0 else matrix.identity()
+
+        if solver == 'ikRPsolver' and len( joints ) == 3:
+
+            # end joint follows mid joint by parenting
+
+            restPole = [ matrix.translation( self.restWorlds[ chain[ 'pole' ] ] ) ] if chain[ 'pole' ] >= 0 else None
+            chain[ 'limb' ] = twoBoneIk.TwoBoneIk( *[ matrixArrays.asMatrices( self.restWorlds[i] ) for i in joints ],
+                                                   restControl = matrixArrays.asMatrices( self.restWorlds[ handle ] ),
+                                                   restParent = matrixArrays.asMatrices( parentWorld ), restPole = restPole )
+            chain[ 'solved' ] = joints[ :2 ]
+
+        elif solver == 'ikSCsolver':
+
+            # end joint rest position in start joint space and in handle space
+
+            chain[ 'endOffset' ] = matrix.transformPoint( matrix.translation( self.restWorlds[ end ] ), matrix.inverse( self.restWorlds[ start ] ) )
+            chain[ 'handleOffset' ] = matrix.transformPoint( matrix.translation( self.restWorlds[ end ] ), matrix.inverse( self.restWorlds[ handle ] ) )
+            chain[ 'solved' ] = joints[ :1 ]
+
+        else:
+
+            # unsolved chains follow their parents while drivers keep their rest placement
+
+            if solver == 'ikSplineSolver':
+
+                # spline handles do not drive their chain, the clusters of its curve do
+
+                module = self._module( handle )
+                chain[ 'inputs' ] = [ i for i in chain[ 'inputs' ] if i != handle ]
+                chain[ 'inputs' ].extend( i for i, t in enumerate( self.types ) if t == 'clusterHandle' and module >= 0 and self._module( i ) == module )
+
+            inverseParent = matrix.inverse( parentWorld )
+            chain[ 'restDrivers' ] = [ ( i, matrix.multiply( self.restWorlds[i], inverseParent ) ) for i in chain[ 'inputs' ] if i != chain[ 'parent' ] ]
+
+        # constraint of start joint applies before solving, its target is an input of the chain
+
+        if start in self.constraints and self.constraints[ start ][1] not in chain[ 'inputs' ]:
+
+            chain[ 'inputs' ].append( self.constraints[ start ][1] )
+
+        return chain
+
+    def _solve( self, chain ):
+
+        # world matrices of solved joints of chain, inputs are clean
+
+        start = chain[ 'joints' ][0]
+        parentWorld = self.worlds[ chain[ 'parent' ] ] if chain[ 'parent' ] >= 0 else matrix.identity()
+        handleWorld = self.worlds[ chain[ 'handle' ] ]
+        startWorld = matrix.multiply( self.locals[ start ], parentWorld )
+
+        if start in self.constraints:
+
+            startWorld = self._constrained( startWorld, *self.constraints[ start ] )
+
+            # parent placing the constrained start joint by its local matrix, as the limb solver expects
+
+            parentWorld = matrix.multiply( matrix.inverse( self.locals[ start ] ), startWorld )
+
+        if 'limb' in chain:
+
+            pole = matrix.translation( self.worlds[ chain[ 'pole' ] ] if chain[ 'pole' ] >= 0 else startWorld )
+            solved = chain[ 'limb' ].solve( matrixArrays.asMatrices( handleWorld ), [ pole ], parents = matrixArrays.asMatrices( parentWorld ) )
+
+            return [ [ float( v ) for v in solved[ 0, i ].ravel() ] for i in range( 2 ) ]
+
+        # single chain, start joint turns by the shortest arc taking end joint towards handle
+
+        startPosition = matrix.translation( startWorld )
+        endPosition = matrix.transformPoint( chain[ 'endOffset' ], startWorld )
+        handlePosition = matrix.transformPoint( chain[ 'handleOffset' ], handleWorld )
+        arc = _shortestArc( [ e - s for e, s in zip( endPosition, startPosition ) ], [ h - s for h, s in zip( handlePosition, startPosition ) ] )
+
+        return [ matrix.withTranslation( matrix.multiply( startWorld, arc ), startPosition ) ]
+
+    def _checkUnsolved( self, chain ):
+
+        parentWorld = self.worlds[ chain[ 'parent' ] ] if chain[ 'parent' ] >= 0 else matrix.identity()
+        inverseParent = matrix.inverse( parentWorld )
+
+        for i, restRelative in chain[ 'restDrivers' ]:
+
+            relative = matrix.multiply( self.worlds[i], inverseParent )
+            size = max( [ 1.0 ] + [ abs( v ) for v in restRelative[ 12:15 ] ] )
+
+            if max( abs( a - b ) for a, b in zip( relative[ :15 ], restRelative[ :15 ] ) ) > 1e-4 * size:
+
+                raise ValueError( '%s IK of %s is not solved by pose graph and %s left its rest placement'
+                                  % ( chain[ 'solver' ], chain[ 'name' ], self.names[i] ) )
+
+    def _module( self, index ):
+
+        # nearest module top group above node, -1 outside of modules
+
+        while index >= 0 and not self.names[ index ].endswith( '_Module_GRP' ):
+
+            index = self.parents[ index ]
+
+        return index
+
+    def _constrained( self, world, constraintType, target, offset, pointOffset ):
+
+        targetWorld = self.worlds[ target ]
+
+        if constraintType == 'parentConstraint':
+
+            return matrix.multiply( offset, targetWorld )
+
+        if constraintType == 'orientConstraint':
+
+            return matrix.withTranslation( matrix.multiply( offset, targetWorld ), matrix.translation( world ) )
+
+        return matrix.withTranslation( world, [ t + o for t, o in zip( matrix.translation( targetWorld ), pointOffset ) ] )
+
+_constraintTypes = [ 'parentConstraint', 'orientConstraint', 'pointConstraint' ]
+
+def _shortestArc( fromVector, toVector ):
+
+    # row vector rotation matrix turning fromVector towards toVector about their common normal
+
+    fromLength = math.sqrt( sum( v * v for v in fromVector ) )
+    toLength = math.sqrt( sum( v * v for v in toVector ) )
+
+    if fromLength < 1e-12 or toLength < 1e-12:
+
+        return matrix.identity()
+
+    a = [ v / fromLength for v in fromVector ]
+    b = [ v / toLength for v in toVector ]
+    axis = [ a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0] ]
+    sine = math.sqrt( sum( v * v for v in axis ) )
+    cosine = sum( x * y for x, y in zip( a, b ) )
+
+    if sine < 1e-12:
+
+        # parallel vectors keep the rest orientation, opposite ones can not tell the turn axis
+
+        return matrix.identity()
+
+    x, y, z = [ v / sine for v in axis ]
+    t = 1.0 - cosine
+
+    return [ t * x * x + cosine, t * x * y + sine * z, t * x * z - sine * y, 0.0,
+             t * x * y - sine * z, t * y * y + cosine, t * y * z + sine * x, 0.0,
+             t * x * z + sine * y, t * y * z - sine * x, t * z * z + cosine, 0.0,
+             0.0, 0.0, 0.0, 1.0 ]
+
+def _channel( channel ):
+
+    if len( channel ) == 2 and channel[0] in _channels and channel[1] in _axes:
+
+        return _channels[ channel[0] ], _axes[ channel[1] ]
+
+    if channel in _channels:
+
+        return _channels[ channel ], None
+
+    raise ValueError( 'unknown transform channel %s' % channel )
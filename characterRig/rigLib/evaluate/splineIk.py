@@ -0,0 +1,241 @@
+"""
+splineIk @ evaluate
+vectorized evaluator of the spline IK chains built by rig.ikChain
+
+ikChain drives each chain curve CV by a cluster parented to a control,
+so a CV follows its control from rest. Like ikSplineSolver, the start
+joint sits at the curve start and joints keep their bone lengths, each
+joint aiming at the point of the curve found at its rest arc length.
+Curve basis and sample parameters are precomputed once, arc length
+tables of the posed curves are built for all frames at once and
+inverted by a single sorted search, so chains of hundreds of joints
+solve for many frames without a loop over frames :
+
+    chain = splineIk.SplineIk.fromScene( tailJoints, 'tail_CRV',
+                                         [ 'tail%d_CTRL1' % ( i + 1 ) for i in range( 5 ) ] )
+
+    # controls ( frames, 5, 4, 4 ) world matrices, twist ( frames ) in degrees
+
+    jointMatrices = chain.solve( controls, twist )
+
+    # jointMatrices ( frames, joints, 4, 4 ) world matrices
+
+each joint keeps its rest orientation rotated by the shortest arc from its
+rest bone direction to its new one, twist is spread linearly from start
+joint ( none ) to end joint ( full ) about bone directions
+"""
+
+import numpy
+
+from ..backend import cmds as mc
+
+from . import matrixArrays
+
+class SplineIk():
+
+    """
+    class holding rest data of a spline IK chain and solving it for stacks of control poses
+    """
+
+    def __init__( self, restJoints, restCvs, restControls, degree = 3, samplesPerSpan = 32 ):
+
+        """
+        @param restJoints : numpy.ndarray, rest world matrices of chain joints ( joints, 4, 4 )
+        @param restCvs : numpy.ndarray, rest world positions of curve CVs ( cvs, 3 )
+        @param restControls : numpy.ndarray, rest world matrices of controls carrying CV clusters ( cvs, 4, 4 )
+        @param degree : int, degree of chain curve
+        @param samplesPerSpan : int, curve samples per span in arc length tables
+        @return : None
+        """
+
+        restJoints = numpy.asarray( restJoints, dtype = float )
+        restCvs = numpy.asarray( restCvs, dtype = float )
+        restControls = numpy.asarray( restControls, dtype = float )
+
+        if restJoints.shape[0] < 2:
+
+            raise ValueError( 'spline IK chains need at least 2 joints' )
+
+        if restCvs.shape[0] < 2 or restCvs.shape[0] != restControls.shape[0]:
+
+            raise ValueError( 'spline IK needs one control per curve CV and at least 2 CVs' )
+
+        self.jointCount = restJoints.shape[0]
+
+        # CV positions in control space, clusters follow their control from rest
+
+        self.cvOffsets = matrixArrays.transformPoints( restCvs, numpy.linalg.inv( restControls ) )
+
+        # curve basis at sample parameters ( samples, cvs )
+
+        self.degree = min( degree, restCvs.shape[0] - 1 )
+        spans = restCvs.shape[0] - self.degree
+        parameters = numpy.linspace( 0.0, spans, spans * samplesPerSpan + 1 )
+        self.basis = _basis( restCvs.shape[0], self.degree, parameters )
+
+        # rest arc length of each joint along chain
+
+        restPositions = matrixArrays.translations( restJoints )
+        bones = restPositions[ 1: ] - restPositions[ :-1 ]
+        self.boneLengths = numpy.linalg.norm( bones, axis = -1 )
+        self.arcLengths = numpy.concatenate( [ [ 0.0 ], numpy.cumsum( self.boneLengths ) ] )
+
+        # rest bone directions, end joint keeps direction of last bone
+
+        restAim = matrixArrays.normalize( bones )
+        self.restAim = numpy.concatenate( [ restAim, restAim[ -1: ] ] )
+        self.restRotations = restJoints[ :, :3, :3 ].copy()
+
+    @classmethod
+    def fromScene( cls, chainJoints, chainCurve, controls, degree = 3, samplesPerSpan = 32 ):
+
+        """
+        read rest data of chain from scene in rest pose
+
+        @param chainJoints : list( str ), chain joints, start first
+        @param chainCurve : str, chain curve
+        @param controls : list( str ), controls carrying CV clusters, in CV order
+        @param degree : int, degree of chain curve, ikChain curves are cubic
+        @param samplesPerSpan : int, curve samples per span in arc length tables
+        @return : SplineIk
+        """
+
+        restJoints = matrixArrays.asMatrices( mc.xform( chainJoints, q = 1, ws = 1, m = 1 ) )
+        restCvs = numpy.asarray( mc.xform( chainCurve + '.cv[*]', q = 1, ws = 1, t = 1 ), dtype = float ).reshape( -1, 3 )
+        restControls = matrixArrays.asMatrices( mc.xform( controls, q = 1, ws = 1, m = 1 ) )
+
+        return cls( restJoints, restCvs, restControls, degree = degree, samplesPerSpan = samplesPerSpan )
+
+    def curvePoints( self, controls ):
+
+        """
+        @param controls : numpy.ndarray, world matrices of controls ( ..., cvs, 4, 4 )
+        @return : numpy.ndarray, world positions of curve samples ( ..., samples, 3 )
+        """
+
+        cvs = matrixArrays.transformPoints( self.cvOffsets, numpy.asarray( controls, dtype = float ) )
+
+        return numpy.matmul( self.basis, cvs )
+
+    def solve( self, controls, twist = None ):
+
+        """
+        solve chain for stacks of control poses
+
+        @param controls : numpy.ndarray, world matrices of controls ( ..., cvs, 4, 4 )
+        @param twist : numpy.ndarray, optional twist of end joint in degrees ( ... )
+        @return : numpy.ndarray, world matrices of chain joints ( ..., joints, 4, 4 )
+        """
+
+        points = self.curvePoints( controls )
+        leading = points.shape[ :-2 ]
+        points = points.reshape( ( -1, ) + points.shape[ -2: ] )
+        frameCount, sampleCount = points.shape[ :2 ]
+
+        # arc length tables of all frames ( frames, samples )
+
+        segments = numpy.linalg.norm( points[ :, 1: ] - points[ :, :-1 ], axis = -1 )
+        tables = numpy.concatenate( [ numpy.zeros( ( frameCount, 1 ) ), numpy.cumsum( segments, axis = -1 ) ], axis = -1 )
+
+        # one sorted search for all frames, tables are shifted apart so they stay increasing
+
+        shift = ( numpy.arange( frameCount ) * ( tables[ :, -1 ].max() + self.arcLengths[-1] + 1.0 ) )[ :, None ]
+        found = numpy.searchsorted( ( tables + shift ).ravel(), ( self.arcLengths + shift ).ravel(), side = 'right' )
+        found = found.reshape( frameCount, self.jointCount ) - numpy.arange( frameCount )[ :, None ] * sampleCount - 1
+        found = numpy.clip( found, 0, sampleCount - 2 )
+
+        # interpolate samples, past the curve end points extend along last segment
+
+        frames = numpy.arange( frameCount )[ :, None ]
+        lower = tables[ frames, found ]
+        span = tables[ frames, found + 1 ] - lower
+        weight = ( self.arcLengths - lower ) / numpy.where( span > 0.0, span, 1.0 )
+        targets = points[ frames, found ] + weight[ ..., None ] * ( points[ frames, found + 1 ] - points[ frames, found ] )
+
+        # rigid chain, each joint aims at target of next joint
+
+        positions = [ targets[ :, 0 ] ]
+
+        for i in range( self.jointCount - 1 ):
+
+            aim = matrixArrays.normalize( targets[ :, i + 1 ] - positions[-1] )
+            positions.append( positions[-1] + self.boneLengths[i] * aim )
+
+        positions = numpy.stack( positions, axis = 1 )
+        aim = matrixArrays.normalize( positions[ :, 1: ] - positions[ :, :-1 ] )
+        aim = numpy.concatenate( [ aim, aim[ :, -1: ] ], axis = 1 )
+
+        rotations = numpy.matmul( self.restRotations, _shortestArcs( self.restAim, aim ) )
+
+        if twist is not None:
+
+            angles = numpy.asarray( twist, dtype = float ).reshape( -1, 1 ) * numpy.linspace( 0.0, 1.0, self.jointCount )
+            rotations = numpy.matmul( rotations, _axisRotations( aim, angles ) )
+
+        result = matrixArrays.fromRotations( rotations, positions )
+
+        return result.reshape( leading + result.shape[ -3: ] )
+
+def _basis( cvCount, degree, parameters ):
+
+    # B-spline basis of open uniform curve like mc.curve( d = degree, p = cvs ), by Cox-de Boor recursion
+
+    spans = cvCount - degree
+    knots = numpy.concatenate( [ numpy.zeros( degree ), numpy.arange( spans + 1, dtype = float ), numpy.full( degree, float( spans ) ) ] )
+    u = parameters[ :, None ]
+
+    # degree 0, last parameter belongs to last span
+
+    basis = ( ( knots[ :-1 ] <= u ) & ( u < knots[ 1: ] ) ).astype( float )
+    lastSpan = numpy.nonzero( knots[ :-1 ] < knots[ 1: ] )[0][-1]
+    basis[ parameters >= knots[-1], lastSpan ] = 1.0
+
+    for d in range( 1, degree + 1 ):
+
+        left = knots[ d:-1 ] - knots[ :-d - 1 ]
+        right = knots[ d + 1: ] - knots[ 1:-d ]
+        leftWeight = ( u - knots[ :-d - 1 ] ) / numpy.where( left > 0.0, left, 1.0 )
+        rightWeight = ( knots[ d + 1: ] - u ) / numpy.where( right > 0.0, right, 1.0 )
+        basis = leftWeight * basis[ :, :-1 ] + rightWeight * basis[ :, 1: ]
+
+    return basis
+
+def _shortestArcs( fromVectors, toVectors ):
+
+    # row vector rotations taking unit vectors to unit vectors by the shortest arc ( ..., 3, 3 )
+
+    fromVectors, toVectors = numpy.broadcast_arrays( fromVectors, toVectors )
+    axis = numpy.cross( fromVectors, toVectors )
+    cosine = numpy.sum( fromVectors * toVectors, axis = -1 )
+
+    # opposite vectors turn half way about any perpendicular axis
+
+    opposite = cosine < -1.0 + 1e-9
+    perpendicular = numpy.cross( fromVectors, numpy.where( numpy.abs( fromVectors[ ..., :1 ] ) < 0.9, [ 1.0, 0.0, 0.0 ], [ 0.0, 1.0, 0.0 ] ) )
+    axis = numpy.where( opposite[ ..., None ], matrixArrays.normalize( perpendicular ), axis )
+    sine = numpy.where( opposite, 0.0, numpy.linalg.norm( axis, axis = -1 ) )
+    cosine = numpy.where( opposite, -1.0, cosine )
+
+    return _rotations( matrixArrays.normalize( axis ), cosine, sine )
+
+def _axisRotations( axes, angles ):
+
+    # row vector rotations about unit axes by angles in degrees ( ..., 3, 3 )
+
+    radians = numpy.radians( angles )
+
+    return _rotations( axes, numpy.cos( radians ), numpy.sin( radians ) )
+
+def _rotations( axes, cosine, sine ):
+
+    # Rodrigues formula, transposed for row vectors
+
+    x, y, z = axes[ ..., 0 ], axes[ ..., 1 ], axes[ ..., 2 ]
+    zero = numpy.zeros_like( x )
+    cross = numpy.stack( [ numpy.stack( [ zero, z, -y ], axis = -1 ),
+                           numpy.stack( [ -z, zero, x ], axis = -1 ),
+                           numpy.stack( [ y, -x, zero ], axis = -1 ) ], axis = -2 )
+    outer = axes[ ..., :, None ] * axes[ ..., None, :]
+
+    return ( cosine[ ..., None, None ] * numpy.eye( 3 ) + sine[ ..., None, None ] * cross
+             + ( 1.0 - cosine )[ ..., None, None ] * outer )
@@ -0,0 +1,215 @@
+"""
+twoBoneIk @ evaluate
+vectorized evaluator of the rotate plane 2-bone IK limbs built by rig.arm and rig.leg
+
+like ikRPsolver, the end of the chain reaches the IK handle, which is
+parented to the hand or foot control, and the chain bends in the plane
+of the start to handle vector and the pole vector ( pole control position
+minus start joint position ) rotated by twist. Each bone keeps its rest
+orientation relative to that plane, the end joint and its descendants
+follow by FK parenting. Many limbs are solved at once for many frames :
+
+    limbs = twoBoneIk.TwoBoneIk.fromScene( [
+                ( 'l_arm1_JNT', 'l_arm2_JNT', 'l_hand_JNT', 'l_arm_hand_CTRL1' ),
+                ( 'r_arm1_JNT', 'r_arm2_JNT', 'r_hand_JNT', 'r_arm_hand_CTRL1' ) ] )
+
+    # controls ( frames, 2, 4, 4 ) world matrices, poles ( frames, 2, 3 ) world positions
+
+    jointMatrices = limbs.solve( controls, poles )
+
+    # jointMatrices ( frames, 2, 3, 4, 4 ), start, mid and end joint world matrices
+"""
+
+import numpy
+
+from ..backend import cmds as mc
+
+from . import matrixArrays
+
+class TwoBoneIk():
+
+    """
+    class holding rest data of limbs and solving their IK for stacks of control poses
+    """
+
+    def __init__( self, restStart, restMid, restEnd, restControl = None, restParent = None, restPole = None ):
+
+        """
+        @param restStart : numpy.ndarray, rest world matrices of start joints ( limbs, 4, 4 )
+        @param restMid : numpy.ndarray, rest world matrices of mid joints ( limbs, 4, 4 )
+        @param restEnd : numpy.ndarray, rest world matrices of end joints ( limbs, 4, 4 )
+        @param restControl : numpy.ndarray, optional rest world matrices of controls carrying IK handles, end joint by default
+        @param restParent : numpy.ndarray, optional rest world matrices of start joint parents, identity by default
+        @param restPole : numpy.ndarray, optional rest pole positions ( limbs, 3 ), needed for straight chains only
+        @return : None
+        """
+
+        restStart, restMid, restEnd = [ numpy.asarray( m, dtype = float ) for m in [ restStart, restMid, restEnd ] ]
+        restControl = restEnd if restControl is None else numpy.asarray( restControl, dtype = float )
+        restParent = numpy.broadcast_to( numpy.eye( 4 ), restStart.shape ) if restParent is None else numpy.asarray( restParent, dtype = float )
+
+        startPos, midPos, endPos = [ matrixArrays.translations( m ) for m in [ restStart, restMid, restEnd ] ]
+
+        self.limbCount = restStart.shape[0]
+        self.restParent = restParent
+        self.upperLength = numpy.linalg.norm( midPos - startPos, axis = -1 )
+        self.lowerLength = numpy.linalg.norm( endPos - midPos, axis = -1 )
+
+        # start joint position in parent space and IK handle position in control space
+
+        self.startOffset = matrixArrays.transformPoints( startPos, numpy.linalg.inv( restParent ) )
+        self.handleOffset = matrixArrays.transformPoints( endPos, numpy.linalg.inv( restControl ) )
+
+        # end joint keeps its local matrix under mid joint
+
+        self.endLocal = matrixArrays.multiply( restEnd, numpy.linalg.inv( restMid ) )
+
+        # rest plane, up is the side the mid joint bends to
+
+        aim = matrixArrays.normalize( endPos - startPos )
+        side = midPos - startPos
+        up = side - numpy.sum( side * aim, axis = -1, keepdims = True ) * aim
+        straight = numpy.linalg.norm( up, axis = -1 ) < 1e-6 * self.upperLength
+
+        if numpy.any( straight ):
+
+            if restPole is None:
+
+                raise ValueError( 'straight limb chains need rest pole positions' )
+
+            poleSide = numpy.asarray( restPole, dtype = float ) - startPos
+            poleUp = poleSide - numpy.sum( poleSide * aim, axis = -1, keepdims = True ) * aim
+            up = numpy.where( straight[ :, None ], poleUp, up )
+
+        up = matrixArrays.normalize( up )
+        normal = numpy.cross( aim, up )
+
+        # pole direction used when pole control sits on the start to handle line, in parent space
+
+        self.restUp = matrixArrays.transformVectors( up, numpy.linalg.inv( restParent ) )
+
+        # joint rotations relative to their bone frames
+
+        upperFrame = _boneFrames( matrixArrays.normalize( midPos - startPos ), normal )
+        lowerFrame = _boneFrames( matrixArrays.normalize( endPos - midPos ), normal )
+
+        self.startRelative = numpy.matmul( restStart[ :, :3, :3 ], numpy.swapaxes( upperFrame, -1, -2 ) )
+        self.midRelative = numpy.matmul( restMid[ :, :3, :3 ], numpy.swapaxes( lowerFrame, -1, -2 ) )
+
+    @classmethod
+    def fromScene( cls, chains, poleLocators = None ):
+
+        """
+        read rest data of limbs from scene in rest pose
+
+        @param chains : list( tuple( str, str, str, str ) ), start, mid and end joints and control carrying the IK handle of each limb
+        @param poleLocators : list( str ), optional pole vector objects, needed for straight chains only
+        @return : TwoBoneIk
+        """
+
+        names = [ name for chain in chains for name in chain ]
+        restMatrices = matrixArrays.asMatrices( mc.xform( names, q = 1, ws = 1, m = 1 ) ).reshape( len( chains ), 4, 4, 4 )
+
+        parentMatrices = []
+
+        for chain in chains:
+
+            parent = mc.listRelatives( chain[0], p = 1 )
+            parentMatrices.append( mc.xform( parent[0], q = 1, ws = 1, m = 1 ) if parent else numpy.eye( 4 ).ravel() )
+
+        restPole = None
+
+        if poleLocators:
+
+            restPole = numpy.asarray( mc.xform( poleLocators, q = 1, ws = 1, rp = 1 ), dtype = float ).reshape( -1, 3 )
+
+        return cls( restMatrices[ :, 0 ], restMatrices[ :, 1 ], restMatrices[ :, 2 ], restControl = restMatrices[ :, 3 ],
+                    restParent = matrixArrays.asMatrices( parentMatrices ), restPole = restPole )
+
+    def solve( self, controls, poles, twist = None, parents = None ):
+
+        """
+        solve IK of all limbs for stacks of control poses
+
+        @param controls : numpy.ndarray, world matrices of controls carrying IK handles ( ..., limbs, 4, 4 )
+        @param poles : numpy.ndarray, world positions of pole vector controls ( ..., limbs, 3 )
+        @param twist : numpy.ndarray, optional twist in degrees ( ..., limbs )
+        @param parents : numpy.ndarray, optional world matrices of start joint parents ( ..., limbs, 4, 4 ), rest by default
+        @return : numpy.ndarray, world matrices of start, mid and end joints ( ..., limbs, 3, 4, 4 )
+        """
+
+        controls = numpy.asarray( controls, dtype = float )
+        parents = self.restParent if parents is None else numpy.asarray( parents, dtype = float )
+
+        start = matrixArrays.transformPoints( self.startOffset, parents )
+        target = matrixArrays.transformPoints( self.handleOffset, controls )
+        start, target = numpy.broadcast_arrays( start, target )
+
+        # clamp reach to what bone lengths allow
+
+        toTarget = target - start
+        distance = numpy.linalg.norm( toTarget, axis = -1 )
+        aim = toTarget / numpy.where( distance > 0.0, distance, 1.0 )[ ..., None ]
+        distance = numpy.clip( distance, numpy.abs( self.upperLength - self.lowerLength ) + 1e-9,
+                               ( self.upperLength + self.lowerLength ) * ( 1.0 - 1e-9 ) )
+
+        # rotate plane from pole vector and twist
+
+        poleSide = numpy.asarray( poles, dtype = float ) - start
+        up = poleSide - numpy.sum( poleSide * aim, axis = -1, keepdims = True ) * aim
+        upLength = numpy.linalg.norm( up, axis = -1, keepdims = True )
+        restUp = matrixArrays.transformVectors( self.restUp, parents )
+        restUp = restUp - numpy.sum( restUp * aim, axis = -1, keepdims = True ) * aim
+        up = matrixArrays.normalize( numpy.where( upLength > 1e-9, up, restUp ) )
+
+        if twist is not None:
+
+            up = matrixArrays.rotateAboutAxis( up, aim, numpy.asarray( twist, dtype = float ) )
+
+        normal = numpy.cross( aim, up )
+
+        # law of cosines for the angle at start joint
+
+        cosStart = ( self.upperLength ** 2 + distance ** 2 - self.lowerLength ** 2 ) / ( 2.0 * self.upperLength * distance )
+        cosStart = numpy.clip( cosStart, -1.0, 1.0 )
+        sinStart = numpy.sqrt( 1.0 - cosStart ** 2 )
+
+        mid = start + self.upperLength[ ..., None ] * ( cosStart[ ..., None ] * aim + sinStart[ ..., None ] * up )
+        end = start + distance[ ..., None ] * aim
+
+        upperFrame = _boneFrames( matrixArrays.normalize( mid - start ), normal )
+        lowerFrame = _boneFrames( matrixArrays.normalize( end - mid ), normal )
+
+        startMatrix = matrixArrays.fromRotations( numpy.matmul( self.startRelative, upperFrame ), start )
+        midMatrix = matrixArrays.fromRotations( numpy.matmul( self.midRelative, lowerFrame ), mid )
+        endMatrix = matrixArrays.multiply( self.endLocal, midMatrix )
+
+        return numpy.stack( [ startMatrix, midMatrix, endMatrix ], axis = -3 )
+
+def fk( parentWorld, localMatrices, parentIndices ):
+
+    """
+    evaluate joints following a parent by FK parenting, like fingers below a hand joint
+
+    @param parentWorld : numpy.ndarray, world matrices of parent ( ..., 4, 4 )
+    @param localMatrices : numpy.ndarray, local matrices of joints ( joints, 4, 4 ) or ( ..., joints, 4, 4 )
+    @param parentIndices : list( int ), index of parent of each joint, -1 for given parent, parents come first
+    @return : numpy.ndarray, world matrices of joints ( ..., joints, 4, 4 )
+    """
+
+    parentWorld = numpy.asarray( parentWorld, dtype = float )
+    localMatrices = numpy.asarray( localMatrices, dtype = float )
+    result = []
+
+    for i, parentIndex in enumerate( parentIndices ):
+
+        parentMatrix = parentWorld if parentIndex < 0 else result[ parentIndex ]
+        result.append( matrixArrays.multiply( localMatrices[ ..., i, :, : ], parentMatrix ) )
+
+    return numpy.stack( result, axis = -3 )
+
+def _boneFrames( boneDirections, normals ):
+
+    # orthonormal frames with rows bone direction, plane normal and their cross product
+
+    return numpy.stack( [ boneDirections, normals, numpy.cross( boneDirections, normals ) ], axis = -2 )
@@ -0,0 +1,43 @@
+"""
+lazy @ rigLib
+lazy loading of package submodules
+
+package __init__ modules list their submodules instead of importing them :
+
+    from .. import lazy
+
+    __getattr__, __dir__ = lazy.attach( __name__, [ 'control', 'module' ] )
+
+a submodule is imported the first time it is read as attribute of the
+package, so importing a package only loads the modules a tool uses
+"""
+
+import importlib
+
+def attach( packageName, submoduleNames ):
+
+    """
+    make module level __getattr__ and __dir__ functions loading submodules on first access
+
+    @param packageName : str, full name of package, __name__ of its __init__ module
+    @param submoduleNames : list( str ), names of submodules loaded on demand
+    @return : tuple( function, function ), __getattr__ and __dir__ functions of package
+    """
+
+    submodules = set( submoduleNames )
+
+    def __getattr__( attrName ):
+
+        if attrName in submodules:
+
+            # import_module sets the submodule as package attribute, later reads skip __getattr__
+
+            return importlib.import_module( packageName + '.' + attrName )
+
+        raise AttributeError( 'module %s has no attribute %s' % ( packageName, attrName ) )
+
+    def __dir__():
+
+        return sorted( set( vars( importlib.import_module( packageName ) ) ) | submodules )
+
+    return __getattr__, __dir__
@@ -1,5 +1,3 @@
-import ikChain
-import arm
-import leg
-import neck
-import spine
\ No newline at end of file
+from .. import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'ikChain', 'arm', 'leg', 'neck', 'spine' ] )
\ No newline at end of file
@@ -2,14 +2,21 @@
 arm @ rig
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import profiler
+from ..backend import telemetry
 
 from ..base import control
 from ..base import module
 
 from ..utils import name
 from ..utils import joint
+from ..utils import snap
 
+@telemetry.reported
+@profiler.profiled
+@batch.batchedBuild
 def Build(
             armJoints,
             topFingerJointsA,
@@ -21,7 +28,9 @@ def Build(
             scapulaJoint = '',
             prefix = 'l_arm',
             rigScale = 1.0,
-            baseRig = None
+            baseRig = None,
+            skeleton = None,
+            fingers = True
             ):
     
     """
@@ -32,6 +41,8 @@ def Build(
     @param prefix : str, prefix to name new objects
     @param rigScale : float, scale factor for size of controls
     @param baseRig : instance of base.module.Base class
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional, indexed when not given
+    @param fingers : bool, make finger controls, finger joints follow hand joint when False
     @return : dictionnary with rig module
     """
 
@@ -64,17 +75,21 @@ def Build(
     fingerCtrlListD = []
     fingerCtrlListE = []
 
-    fingerJointsListA = mc.listRelatives( topFingerJointsA, ad = 1 )
-    fingerJointsListB = mc.listRelatives( topFingerJointsB, ad = 1 )
-    fingerJointsListC = mc.listRelatives( topFingerJointsC, ad = 1 )
-    fingerJointsListD = mc.listRelatives( topFingerJointsD, ad = 1 )
-    fingerJointsListE = mc.listRelatives( topFingerJointsE, ad = 1 )
+    if not fingers :
 
-    fingerJointsListA.reverse()
-    fingerJointsListB.reverse()
-    fingerJointsListC.reverse()
-    fingerJointsListD.reverse()
-    fingerJointsListE.reverse()
+        fingerJointsListA = fingerJointsListB = fingerJointsListC = fingerJointsListD = fingerJointsListE = []
+
+    else :
+
+        if not skeleton :
+
+            skeleton = joint.SkeletonIndex( armJoints[0] )
+
+        fingerJointsListA = skeleton.descendants( topFingerJointsA )
+        fingerJointsListB = skeleton.descendants( topFingerJointsB )
+        fingerJointsListC = skeleton.descendants( topFingerJointsC )
+        fingerJointsListD = skeleton.descendants( topFingerJointsD )
+        fingerJointsListE = skeleton.descendants( topFingerJointsE )
 
     for fingerJoint in fingerJointsListA :
 
@@ -85,8 +100,7 @@ def Build(
 
     for i in range( len( fingerJointsListA ) ):
 
-        mc.delete( mc.pointConstraint( fingerJointsListA[i-1], fingerCtrlListA[i-1] ) )
-        mc.orientConstraint( fingerJointsListA[i-1], fingerCtrlListA[i-1] )
+        mc.orientConstraint( fingerJointsListA[i-1], fingerCtrlListA[i-1].Off )
 
     for fingerJoint in fingerJointsListB :
 
@@ -97,8 +111,7 @@ def Build(
 
     for i in range( len( fingerJointsListB ) ):
 
-        mc.delete( mc.pointConstraint( fingerJointsListB[i-1], fingerCtrlListB[i-1] ) )
-        mc.orientConstraint( fingerJointsListB[i-1], fingerCtrlListB[i-1] )
+        mc.orientConstraint( fingerJointsListB[i-1], fingerCtrlListB[i-1].Off )
     
     for fingerJoint in fingerJointsListC :
 
@@ -109,8 +122,7 @@ def Build(
 
     for i in range( len( fingerJointsListC ) ):
 
-        mc.delete( mc.pointConstraint( fingerJointsListC[i-1], fingerCtrlListC[i-1] ) )
-        mc.orientConstraint( fingerJointsListC[i-1], fingerCtrlListC[i-1] )
+        mc.orientConstraint( fingerJointsListC[i-1], fingerCtrlListC[i-1].Off )
     
     for fingerJoint in fingerJointsListD :
 
@@ -121,8 +133,7 @@ def Build(
 
     for i in range( len( fingerJointsListD ) ):
 
-        mc.delete( mc.pointConstraint( fingerJointsListD[i-1], fingerCtrlListD[i-1] ) )
-        mc.orientConstraint( fingerJointsListD[i-1], fingerCtrlListD[i-1] )
+        mc.orientConstraint( fingerJointsListD[i-1], fingerCtrlListD[i-1].Off )
 
     for fingerJoint in fingerJointsListE :
 
@@ -133,8 +144,14 @@ def Build(
 
     for i in range( len( fingerJointsListE ) ):
 
-        mc.delete( mc.pointConstraint( fingerJointsListE[i-1], fingerCtrlListE[i-1] ) )
-        mc.orientConstraint( fingerJointsListE[i-1], fingerCtrlListE[i-1] )
+        mc.orientConstraint( fingerJointsListE[i-1], fingerCtrlListE[i-1].Off )
+
+    # snap finger controls to finger joints
+
+    fingerJointsList = fingerJointsListA + fingerJointsListB + fingerJointsListC + fingerJointsListD + fingerJointsListE
+    fingerCtrlList = fingerCtrlListA + fingerCtrlListB + fingerCtrlListC + fingerCtrlListD + fingerCtrlListE
+
+    snap.snapMany( [ ( j, c.Off ) for j, c in zip( fingerJointsList, fingerCtrlList ) ], rotate = False )
 
     # FK parenting finger controls
 
@@ -218,4 +235,4 @@ def Build(
     mc.setAttr( poleVectorCRV + '.template', 1 )
     mc.setAttr( poleVectorCRV + '.it', 0 )
 
-    return { 'module':rigModule, 'baseAttachGRP':baseAttachGrp, 'bodyAttachGRP':bodyAttachGrp }
\ No newline at end of file
+    return { 'module':rigModule, 'baseAttachGrp':baseAttachGrp, 'bodyAttachGrp':bodyAttachGrp }
\ No newline at end of file
@@ -2,11 +2,19 @@
 ikChain @ rig
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import profiler
+from ..backend import telemetry
 
 from ..base import module
 from ..base import control
 
+from ..utils import snap
+
+@telemetry.reported
+@profiler.profiled
+@batch.batchedBuild
 def build(
         chainJoints,
         chainCurve,
@@ -53,7 +61,7 @@ def build(
 
     baseAttachGrp = mc.group( n = prefix + '_BaseAttach_GRP', em = 1, p = rigmodule.partsGrp )
 
-    mc.delete( mc.pointConstraint( chainJoints[0], baseAttachGrp ) )
+    snap.snap( chainJoints[0], baseAttachGrp, rotate = False )
 
     # make controls
 
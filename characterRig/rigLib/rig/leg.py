@@ -2,7 +2,10 @@
 leg @ rig
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import profiler
+from ..backend import telemetry
 
 from ..base import control
 from ..base import module
@@ -10,6 +13,9 @@ from ..base import module
 from ..utils import joint
 from ..utils import name
 
+@telemetry.reported
+@profiler.profiled
+@batch.batchedBuild
 def Build(
             legJoints,
             topToeJoints,
@@ -18,7 +24,8 @@ def Build(
             scapulaJoint = '',
             prefix = 'l_leg',
             rigScale = 1.0,
-            baseRig = None
+            baseRig = None,
+            skeleton = None
             ):
     
     """
@@ -29,6 +36,7 @@ def Build(
     @param prefix : str, prefix to name new objects
     @param rigScale : float, scale factor for size of controls
     @param baseRig : instance of base.module.Base class
+    @param skeleton : instance of utils.joint.SkeletonIndex class, optional, indexed when not given
     @return : dictionnary with rig module objects
     """
 
@@ -60,12 +68,16 @@ def Build(
 
     if additionnalToeJoints :
 
+        if not skeleton :
+
+            skeleton = joint.SkeletonIndex( legJoints[0] )
+
         toeIKControls = []
 
         for topToeJoint in topToeJoints :
 
             toePrefix = name.removeSuffix( topToeJoint )[ :-1 ]
-            toeEndJoint = mc.listRelatives( topToeJoint, ad = 1, type = 0 )[0]
+            toeEndJoint = skeleton.endJoint( topToeJoint )
 
             toeIKControl = control.Control( prefix = toePrefix, translateTo = toeEndJoint, scale = rigScale,
                                             parent = footCtrl.C, shape = 'circleY' )
@@ -74,7 +86,7 @@ def Build(
     
     else :
 
-        toeIKControl = control.Control( prefix = prefix + '_toe', translateTo = toeEndJoint, scale = rigScale,
+        toeIKControl = control.Control( prefix = prefix + '_toe', translateTo = legJoints[4], scale = rigScale,
                                         parent = footCtrl.C, shape = 'circleY' )
 
     # make IK handle
@@ -95,11 +107,11 @@ def Build(
         for i, topToeJoint in enumerate( topToeJoints ):
 
             toePrefix = name.removeSuffix( topToeJoint )[:-1]
-            toeJoints = joint.listHierarchy( topToeJoint )
+            toeJoints = joint.listHierarchy( topToeJoint, skeleton = skeleton )
         
             toeIK = mc.ikHandle( n = toePrefix + '_ikh', sol = 'ikSCsolver', sj = toeJoints[1], ee = toeJoints[-1] )[0]
             mc.hide( toeIK )
-            mc.parent( toeIK, toeIKControl[i].C )
+            mc.parent( toeIK, toeIKControls[i].C )
 
     # attach controls
 
@@ -119,7 +131,7 @@ def Build(
     if scapulaJoint :
 
         mc.parent( scapulaIK, scapulaCtrl.C )
-        mc.pointContraint( scapulaCtrl.C, scapulaJoint )
+        mc.pointConstraint( scapulaCtrl.C, scapulaJoint )
 
     # make pole vector connection line
 
@@ -2,7 +2,10 @@
 neck @ rig
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import profiler
+from ..backend import telemetry
 
 from ..base import control
 from ..base import module
@@ -10,6 +13,9 @@ from ..base import module
 from ..utils import joint
 from ..utils import name
 
+@telemetry.reported
+@profiler.profiled
+@batch.batchedBuild
 def Build(
         neckJoints,
         headJoint,
@@ -54,4 +60,4 @@ def Build(
     mc.orientConstraint( headCtrl.C, headJoint, mo = 1 )
     mc.orientConstraint( neckCtrl.C, neckJoints[0], mo = 1 )
 
-    return { 'module':rigModule, 'baseAttachGRP':baseAttachGrp, 'bodyAttachGRP':bodyAttachGrp }
+    return { 'module':rigModule, 'baseAttachGrp':baseAttachGrp, 'bodyAttachGrp':bodyAttachGrp }
@@ -2,11 +2,17 @@
 spine @ rig
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
+from ..backend import batch
+from ..backend import profiler
+from ..backend import telemetry
 
 from ..base import control
 from ..base import module
 
+@telemetry.reported
+@profiler.profiled
+@batch.batchedBuild
 def Build( 
             spineJoints,
             rootJoint,
@@ -1,3 +1,3 @@
-import joint
-import name
-import transform
\ No newline at end of file
+from .. import lazy
+
+__getattr__, __dir__ = lazy.attach( __name__, [ 'joint', 'matrix', 'name', 'shapeEdit', 'snap', 'transform' ] )
\ No newline at end of file
@@ -3,21 +3,26 @@ joint @ utils
 various joint utilities
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
 
-def listHierarchy( topJoint, withEndJoint = True ):
+def listHierarchy( topJoint, withEndJoint = True, skeleton = None ):
 
     """
     list joint hierarchy starting with top joint
 
     @param topJoint : str, joint to get listed with its joint hierarchy
     @param withEndJoint : bool, list hierarchy with end joint
+    @param skeleton : SkeletonIndex, optional index to read hierarchy from instead of scene
     @return : list( str ), listed joints starting with top joint
     """
 
+    if skeleton and topJoint in skeleton:
+
+        return skeleton.hierarchy( topJoint, withEndJoint = withEndJoint )
+
     listedJoints = mc.listRelatives( topJoint, type = 'joint', ad = True )
     listedJoints.append( topJoint )
-    listedJoints.reverse
+    listedJoints.reverse()
 
     completeJoints = listedJoints[:]
 
@@ -25,4 +30,224 @@ def listHierarchy( topJoint, withEndJoint = True ):
 
         completeJoints = [ j for j in listedJoints if mc.listRelatives( j, c = 1, type = 'joint' ) ]
     
-    return completeJoints
\ No newline at end of file
+    return completeJoints
+
+class SkeletonIndex():
+
+    """
+    class holding snapshot of joint hierarchy made from a single scene query,
+    joints are stored in depth first order so descendants of a joint are a
+    contiguous slice, joint names are expected to be unique
+    """
+
+    def __init__( self, rootJoint = 'root_JNT' ):
+
+        """
+        @param rootJoint : str, top joint of hierarchy to index
+        @return : None
+        """
+
+        rootName = rootJoint.split( '|' )[-1]
+        listedPaths = mc.listRelatives( rootJoint, type = 'joint', ad = True, f = True ) or []
+        listedPaths.reverse()
+
+        # parent names from full paths, listed depth first from root
+
+        parentNames = {}
+
+        for path in listedPaths:
+
+            pathNames = path.split( '|' )
+            parentNames[ pathNames[-1] ] = pathNames[-2]
+
+        childNames = { rootName: [] }
+
+        for path in listedPaths:
+
+            jointName = path.split( '|' )[-1]
+            childNames.setdefault( parentNames[ jointName ], [] ).append( jointName )
+            childNames.setdefault( jointName, [] )
+
+        # flatten depth first
+
+        self.names = []
+        self.parents = []
+        self.depths = []
+        self.children = []
+        self._subtreeEnds = []
+        self._indices = {}
+
+        stack = [ ( rootName, -1, 0 ) ]
+
+        while stack:
+
+            jointName, parentIndex, depth = stack.pop()
+            index = len( self.names )
+
+            self._indices[ jointName ] = index
+            self.names.append( jointName )
+            self.parents.append( parentIndex )
+            self.depths.append( depth )
+            self.children.append( [] )
+            self._subtreeEnds.append( index + 1 )
+
+            if parentIndex >= 0:
+
+                self.children[ parentIndex ].append( index )
+
+            for childName in reversed( childNames[ jointName ] ):
+
+                stack.append( ( childName, index, depth + 1 ) )
+
+        for index in reversed( range( len( self.names ) ) ):
+
+            parentIndex = self.parents[ index ]
+
+            if parentIndex >= 0:
+
+                self._subtreeEnds[ parentIndex ] = max( self._subtreeEnds[ parentIndex ], self._subtreeEnds[ index ] )
+
+        # world matrices of all joints in one query
+
+        worldValues = mc.xform( self.names, q = 1, ws = 1, m = 1 )
+        self.worldMatrices = [ worldValues[ i * 16:i * 16 + 16 ] for i in range( len( self.names ) ) ]
+
+    def __contains__( self, jointName ):
+
+        return jointName in self._indices
+
+    def __len__( self ):
+
+        return len( self.names )
+
+    def index( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : int, index of joint in depth first order
+        """
+
+        return self._indices[ jointName ]
+
+    def parent( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : str, parent joint name, None for root joint
+        """
+
+        parentIndex = self.parents[ self._indices[ jointName ] ]
+
+        return self.names[ parentIndex ] if parentIndex >= 0 else None
+
+    def childrenOf( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : list( str ), direct child joints
+        """
+
+        return [ self.names[ i ] for i in self.children[ self._indices[ jointName ] ] ]
+
+    def descendants( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : list( str ), all joints below given joint, depth first from top
+        """
+
+        index = self._indices[ jointName ]
+
+        return self.names[ index + 1:self._subtreeEnds[ index ] ]
+
+    def hierarchy( self, topJoint, withEndJoint = True ):
+
+        """
+        same result as listHierarchy() without querying the scene
+
+        @param topJoint : str, joint to get listed with its joint hierarchy
+        @param withEndJoint : bool, list hierarchy with end joint
+        @return : list( str ), listed joints starting with top joint
+        """
+
+        index = self._indices[ topJoint ]
+        indices = range( index, self._subtreeEnds[ index ] )
+
+        if not withEndJoint:
+
+            indices = [ i for i in indices if self.children[ i ] ]
+
+        return [ self.names[ i ] for i in indices ]
+
+    def chain( self, topJoint, withEndJoint = True ):
+
+        """
+        list joint chain from top joint following first child down to end joint
+
+        @param topJoint : str, top joint of chain
+        @param withEndJoint : bool, list chain with end joint
+        @return : list( str ), chain joints starting with top joint
+        """
+
+        index = self._indices[ topJoint ]
+        chainIndices = [ index ]
+
+        while self.children[ index ]:
+
+            index = self.children[ index ][0]
+            chainIndices.append( index )
+
+        if not withEndJoint and len( chainIndices ) > 1:
+
+            chainIndices.pop()
+
+        return [ self.names[ i ] for i in chainIndices ]
+
+    def endJoints( self, jointName = None ):
+
+        """
+        @param jointName : str, optional joint to list end joints below, root by default
+        @return : list( str ), joints without child joints
+        """
+
+        index = self._indices[ jointName ] if jointName else 0
+
+        return [ self.names[ i ] for i in range( index, self._subtreeEnds[ index ] ) if not self.children[ i ] ]
+
+    def endJoint( self, topJoint ):
+
+        """
+        @param topJoint : str, top joint of chain
+        @return : str, last joint listed below top joint, the end joint for a simple chain
+        """
+
+        index = self._indices[ topJoint ]
+
+        return self.names[ self._subtreeEnds[ index ] - 1 ]
+
+    def depth( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : int, number of joints above given joint
+        """
+
+        return self.depths[ self._indices[ jointName ] ]
+
+    def worldMatrix( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : list( float ), world matrix at time of indexing
+        """
+
+        return self.worldMatrices[ self._indices[ jointName ] ]
+
+    def position( self, jointName ):
+
+        """
+        @param jointName : str, joint name
+        @return : list( float ), world position at time of indexing
+        """
+
+        return self.worldMatrices[ self._indices[ jointName ] ][ 12:15 ]
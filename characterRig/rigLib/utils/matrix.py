@@ -0,0 +1,221 @@
+"""
+matrix @ utils
+pure python 4x4 matrix utilities following maya conventions
+
+matrices are flat lists of 16 floats, row-major with row vectors
+( same layout as mc.xform( q = 1, m = 1 ) ), so a point is transformed
+with p * M and a child world matrix is local * parentWorld
+"""
+
+import math
+
+def identity():
+
+    """
+    @return : list( float ), 4x4 identity matrix
+    """
+
+    return [ 1.0, 0.0, 0.0, 0.0,
+             0.0, 1.0, 0.0, 0.0,
+             0.0, 0.0, 1.0, 0.0,
+             0.0, 0.0, 0.0, 1.0 ]
+
+def multiply( a, b ):
+
+    """
+    multiply two matrices
+
+    @param a : list( float ), left matrix
+    @param b : list( float ), right matrix
+    @return : list( float ), a * b
+    """
+
+    result = [ 0.0 ] * 16
+
+    for row in range( 4 ):
+
+        r = row * 4
+        a0, a1, a2, a3 = a[ r ], a[ r + 1 ], a[ r + 2 ], a[ r + 3 ]
+
+        for col in range( 4 ):
+
+            result[ r + col ] = a0 * b[ col ] + a1 * b[ 4 + col ] + a2 * b[ 8 + col ] + a3 * b[ 12 + col ]
+
+    return result
+
+def inverse( m ):
+
+    """
+    invert matrix with gauss-jordan elimination
+
+    @param m : list( float ), matrix to invert
+    @return : list( float ), inverted matrix
+    """
+
+    rows = [ list( m[ i * 4:i * 4 + 4 ] ) + [ 1.0 if i == j else 0.0 for j in range( 4 ) ] for i in range( 4 ) ]
+
+    for col in range( 4 ):
+
+        pivot = max( range( col, 4 ), key = lambda r: abs( rows[r][col] ) )
+
+        if abs( rows[ pivot ][ col ] ) < 1e-12:
+
+            raise ValueError( 'matrix is not invertible' )
+
+        rows[ col ], rows[ pivot ] = rows[ pivot ], rows[ col ]
+
+        pivotValue = rows[ col ][ col ]
+        rows[ col ] = [ v / pivotValue for v in rows[ col ] ]
+
+        for r in range( 4 ):
+
+            if r == col:
+
+                continue
+
+            factor = rows[ r ][ col ]
+
+            if factor:
+
+                rows[ r ] = [ v - factor * p for v, p in zip( rows[ r ], rows[ col ] ) ]
+
+    return [ v for row in rows for v in row[ 4: ] ]
+
+def rotation( rotate ):
+
+    """
+    make rotation matrix for xyz rotate order
+
+    @param rotate : list( float ), euler angles in degrees
+    @return : list( float ), rotation matrix
+    """
+
+    rx, ry, rz = [ math.radians( v ) for v in rotate ]
+
+    cx, sx = math.cos( rx ), math.sin( rx )
+    cy, sy = math.cos( ry ), math.sin( ry )
+    cz, sz = math.cos( rz ), math.sin( rz )
+
+    return [ cy * cz,                  cy * sz,                  -sy,     0.0,
+             sx * sy * cz - cx * sz,   sx * sy * sz + cx * cz,   sx * cy, 0.0,
+             cx * sy * cz + sx * sz,   cx * sy * sz - sx * cz,   cx * cy, 0.0,
+             0.0,                      0.0,                      0.0,     1.0 ]
+
+def compose( translate = ( 0.0, 0.0, 0.0 ), rotate = ( 0.0, 0.0, 0.0 ), scale = ( 1.0, 1.0, 1.0 ), jointOrient = None ):
+
+    """
+    compose local matrix from transform channels
+
+    @param translate : list( float ), translate values
+    @param rotate : list( float ), rotate values in degrees, xyz rotate order
+    @param scale : list( float ), scale values
+    @param jointOrient : list( float ), optional joint orient in degrees
+    @return : list( float ), local matrix
+    """
+
+    m = rotation( rotate )
+
+    if jointOrient and any( jointOrient ):
+
+        m = multiply( m, rotation( jointOrient ) )
+
+    for row in range( 3 ):
+
+        for col in range( 3 ):
+
+            m[ row * 4 + col ] *= scale[ row ]
+
+    m[ 12 ], m[ 13 ], m[ 14 ] = translate
+
+    return m
+
+def decompose( m, jointOrient = None ):
+
+    """
+    decompose matrix into transform channels
+
+    @param m : list( float ), matrix without shear
+    @param jointOrient : list( float ), optional joint orient to remove from rotation
+    @return : tuple( list( float ), list( float ), list( float ) ), translate, rotate in degrees and scale
+    """
+
+    translate = [ m[ 12 ], m[ 13 ], m[ 14 ] ]
+    axes = [ m[ row * 4:row * 4 + 3 ] for row in range( 3 ) ]
+    scale = [ math.sqrt( sum( v * v for v in axis ) ) for axis in axes ]
+
+    rot = identity()
+
+    for row in range( 3 ):
+
+        for col in range( 3 ):
+
+            rot[ row * 4 + col ] = axes[ row ][ col ] / scale[ row ] if scale[ row ] else 0.0
+
+    if jointOrient and any( jointOrient ):
+
+        rot = multiply( rot, inverse( rotation( jointOrient ) ) )
+
+    return translate, eulerFromRotation( rot ), scale
+
+def eulerFromRotation( m ):
+
+    """
+    extract xyz euler angles from rotation matrix
+
+    @param m : list( float ), orthonormal rotation matrix
+    @return : list( float ), euler angles in degrees
+    """
+
+    sy = -m[ 2 ]
+    sy = max( -1.0, min( 1.0, sy ) )
+    ry = math.asin( sy )
+
+    if abs( sy ) < 1.0 - 1e-9:
+
+        rx = math.atan2( m[ 6 ], m[ 10 ] )
+        rz = math.atan2( m[ 1 ], m[ 0 ] )
+
+    else:
+
+        rx = math.atan2( -m[ 9 ], m[ 5 ] )
+        rz = 0.0
+
+    return [ math.degrees( rx ), math.degrees( ry ), math.degrees( rz ) ]
+
+def transformPoint( point, m ):
+
+    """
+    transform point by matrix
+
+    @param point : list( float ), point to transform
+    @param m : list( float ), matrix
+    @return : list( float ), transformed point
+    """
+
+    x, y, z = point
+
+    return [ x * m[ 0 ] + y * m[ 4 ] + z * m[ 8 ] + m[ 12 ],
+             x * m[ 1 ] + y * m[ 5 ] + z * m[ 9 ] + m[ 13 ],
+             x * m[ 2 ] + y * m[ 6 ] + z * m[ 10 ] + m[ 14 ] ]
+
+def translation( m ):
+
+    """
+    @param m : list( float ), matrix
+    @return : list( float ), translation part of matrix
+    """
+
+    return [ m[ 12 ], m[ 13 ], m[ 14 ] ]
+
+def withTranslation( m, translate ):
+
+    """
+    @param m : list( float ), matrix
+    @param translate : list( float ), new translation
+    @return : list( float ), copy of matrix with replaced translation
+    """
+
+    result = list( m )
+    result[ 12 ], result[ 13 ], result[ 14 ] = translate
+
+    return result
@@ -0,0 +1,127 @@
+"""
+shapeEdit @ utils
+bulk edits of control curve shapes with NumPy, without temporary deformers
+
+CVs of all curve shapes of the given objects are read into one array of
+object space points, transformed by a single matrix product and written
+back with one setAttr per shape. Matrices follow utils.matrix
+conventions, row-major 4x4 with row vectors :
+
+    # flatten a circle control, rotated about the center of its CVs in world space
+
+    shapeEdit.transform( 'global1_CTRL', matrix.compose( rotate = [ 0, 90, 0 ] ), worldSpace = True )
+
+    # scale all shapes of a sphere control
+
+    shapeEdit.transform( 'l_arm_hand_CTRL1', matrix.compose( scale = [ 2, 2, 2 ] ) )
+
+transforms are done about a pivot, the center of the bounding box of the
+CVs like a cluster made on them, unless a pivot point is given
+"""
+
+import numpy
+
+from ..backend import cmds as mc
+
+def curveShapes( objects ):
+
+    """
+    @param objects : str or list( str ), curve transforms or curve shapes
+    @return : list( str ), curve shapes of objects, in order
+    """
+
+    objects = [ objects ] if isinstance( objects, str ) else objects
+    result = []
+
+    for obj in objects:
+
+        if mc.nodeType( obj ) == 'nurbsCurve':
+
+            result.append( obj )
+
+        else:
+
+            result.extend( mc.listRelatives( obj, s = 1, type = 'nurbsCurve', f = 1 ) or [] )
+
+    return result
+
+def read( shapes ):
+
+    """
+    @param shapes : list( str ), curve shapes
+    @return : tuple( numpy.ndarray, list( int ) ), object space CV positions of all shapes ( cvs, 3 ) and number of CVs per shape
+    """
+
+    values = [ mc.xform( s + '.cv[*]', q = 1, os = 1, t = 1 ) for s in shapes ]
+    counts = [ len( v ) // 3 for v in values ]
+
+    return numpy.asarray( [ x for v in values for x in v ], dtype = float ).reshape( -1, 3 ), counts
+
+def write( shapes, points, counts ):
+
+    """
+    @param shapes : list( str ), curve shapes
+    @param points : numpy.ndarray, object space CV positions of all shapes ( cvs, 3 )
+    @param counts : list( int ), number of CVs per shape
+    @return : None
+    """
+
+    start = 0
+
+    for shape, count in zip( shapes, counts ):
+
+        values = [ float( v ) for v in points[ start:start + count ].ravel() ]
+        mc.setAttr( '%s.cv[0:%d]' % ( shape, count - 1 ), *values )
+        start += count
+
+def transform( objects, m, worldSpace = False, pivot = None ):
+
+    """
+    transform CVs of all curve shapes of objects by matrix in one operation
+
+    @param objects : str or list( str ), curve transforms or curve shapes
+    @param m : list( float ) or numpy.ndarray, 4x4 matrix, like utils.matrix.compose() makes
+    @param worldSpace : bool, apply matrix in world space, object space of each shape when False
+    @param pivot : list( float ), optional pivot in the same space, center of CVs bounding box by default
+    @return : None
+    """
+
+    shapes = curveShapes( objects )
+
+    if not shapes:
+
+        raise RuntimeError( 'no curve shapes to edit on %s' % objects )
+
+    points, counts = read( shapes )
+    m = numpy.asarray( m, dtype = float ).reshape( 4, 4 )
+
+    # shape to world matrix of each CV, shapes carry the world matrix of their transform
+
+    if worldSpace:
+
+        shapeMatrices = _shapeMatrices( shapes, counts )
+        points = numpy.einsum( 'ni,nij->nj', _homogeneous( points ), shapeMatrices )[ :, :3 ]
+
+    if pivot is None:
+
+        pivot = ( points.min( axis = 0 ) + points.max( axis = 0 ) ) * 0.5
+
+    pivot = numpy.asarray( pivot, dtype = float )
+    points = numpy.matmul( _homogeneous( points - pivot ), m )[ :, :3 ] + pivot
+
+    if worldSpace:
+
+        points = numpy.einsum( 'ni,nij->nj', _homogeneous( points ), numpy.linalg.inv( shapeMatrices ) )[ :, :3 ]
+
+    write( shapes, points, counts )
+
+def _shapeMatrices( shapes, counts ):
+
+    transforms = [ mc.listRelatives( s, p = 1, f = 1 )[0] for s in shapes ]
+    worldValues = numpy.asarray( mc.xform( transforms, q = 1, ws = 1, m = 1 ), dtype = float ).reshape( -1, 4, 4 )
+
+    return numpy.repeat( worldValues, counts, axis = 0 )
+
+def _homogeneous( points ):
+
+    return numpy.concatenate( [ points, numpy.ones( ( len( points ), 1 ) ) ], axis = 1 )
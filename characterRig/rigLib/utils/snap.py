@@ -0,0 +1,70 @@
+"""
+snap @ utils
+match transforms by setting world matrices directly instead of creating and deleting constraints
+"""
+
+from ..backend import cmds as mc
+
+from . import matrix
+
+def snap( source, target, translate = True, rotate = True, scale = False ):
+
+    """
+    match target world transform to source, like a deleted point, orient or parent constraint
+
+    @param source : str, reference object to match
+    @param target : str, transform object to move
+    @param translate : bool, match position of source rotate pivot
+    @param rotate : bool, match world rotation
+    @param scale : bool, match world scale
+    @return : None
+    """
+
+    snapMany( [ ( source, target ) ], translate = translate, rotate = rotate, scale = scale )
+
+def snapMany( pairs, translate = True, rotate = True, scale = False ):
+
+    """
+    match many targets to their sources in one pass, all source and target
+    values are queried first and targets are set afterwards in given order,
+    so sources must not be children of targets snapped before them, and
+    channels not matched while matching others keep their queried world value,
+    rotation and scale are always taken from world matrices, so rotate order
+    and joint orient of sources and targets do not change the result
+
+    @param pairs : list( tuple( str, str ) ), list of ( source, target ) pairs
+    @param translate : bool, match position of source rotate pivot
+    @param rotate : bool, match world rotation
+    @param scale : bool, match world scale
+    @return : None
+    """
+
+    translateOnly = translate and not ( rotate or scale )
+    values = []
+
+    for source, target in pairs:
+
+        if translateOnly:
+
+            values.append( mc.xform( source, q = 1, ws = 1, rp = 1 ) )
+
+        else:
+
+            sourceT, sourceR, sourceS = matrix.decompose( mc.xform( source, q = 1, ws = 1, m = 1 ) )
+            targetT, targetR, targetS = matrix.decompose( mc.xform( target, q = 1, ws = 1, m = 1 ) )
+
+            values.append( matrix.compose(
+                                        translate = mc.xform( source, q = 1, ws = 1, rp = 1 ) if translate else targetT,
+                                        rotate = sourceR if rotate else targetR,
+                                        scale = sourceS if scale else targetS
+                                        ) )
+
+    for ( source, target ), value in zip( pairs, values ):
+
+        if translateOnly:
+
+            mc.xform( target, ws = 1, t = value )
+
+        else:
+
+            mc.xform( target, ws = 1, m = value )
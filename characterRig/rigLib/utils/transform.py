@@ -4,9 +4,10 @@ tranform @ utils
 Function to manipulate and create tranforms
 """
 
-import maya.cmds as mc
+from ..backend import cmds as mc
 
 from .import name
+from . import snap
 
 def makeOffsetGrp( object, prefix = '' ):
 
@@ -22,7 +23,7 @@ def makeOffsetGrp( object, prefix = '' ):
 
         prefix = name.removeSuffix( object )
 
-    offsetGrp = mc.group( n = prefix + _offset_GRP, em = 1 )
+    offsetGrp = mc.group( n = prefix + '_offset_GRP', em = 1 )
 
     objectParent = mc.listRelatives( object, p = 1 )
 
@@ -32,8 +33,7 @@ def makeOffsetGrp( object, prefix = '' ):
 
     # match object tranform
 
-    mc.delete( mc.parentContraint( object, offsetGrp ) )
-    mc.delete( mc.scaleConstraint( object, offsetGrp ) )
+    snap.snap( object, offsetGrp, scale = True )
 
     # parent object under group
 